@@ -1,15 +1,36 @@
 # build_rag_index.py  (프로젝트 루트)
+import os
+
+from rag.embedder import EmbeddingModel
 from rag.vectordb import RAGVectorStore
+from src.app.rag.page_cache import PageTextCache  # rag 패키지가 저장소 루트를 경로에 추가함
 
 if __name__ == "__main__":
     pdf_dir = "./project_pdfs"       # 여기에 PDF 모아두기
     db_dir = "./chroma_db"
 
-    vs = RAGVectorStore(db_dir=db_dir, collection_name="project_docs")
+    # 아래 최적화는 모두 환경변수로 켤 때만 사용 (기본은 기존과 같은 800자 청크 색인)
+    # - RAG_EMBED_CACHE_DIR : reset=True 재색인이어도 바뀌지 않은 청크는 디스크 캐시에서 바로 가져옴
+    # - RAG_PAGE_CACHE_PATH : 청크 설정만 바꿔 다시 돌릴 때 PDF를 다시 파싱하지 않음
+    # - RAG_CHUNKER=tokens  : 모델 입력 한도(128 토큰)에 맞춰 자름
+    # - RAG_DEDUP_THRESHOLD : 준중복 청크 제거 (예: 0.85)
+    embedder = EmbeddingModel()
+    page_cache_path = os.getenv("RAG_PAGE_CACHE_PATH")
+    page_cache = PageTextCache(page_cache_path) if page_cache_path else None
+    dedup_threshold = os.getenv("RAG_DEDUP_THRESHOLD")
+    vs = RAGVectorStore(db_dir=db_dir, collection_name="project_docs", embedding_model=embedder)
     n_chunks = vs.build_from_pdf_dir(
         pdf_dir=pdf_dir,
         chunk_size=800,
         chunk_overlap=200,
         reset=True,
+        chunk_by_tokens=os.getenv("RAG_CHUNKER", "chars") == "tokens",
+        workers=int(os.getenv("RAG_INDEX_WORKERS", "1")),
+        page_cache=page_cache,
+        dedup_threshold=float(dedup_threshold) if dedup_threshold else None,
     )
     print(f"색인 완료! 총 {n_chunks}개 청크가 저장되었습니다.")
+    if embedder.cache is not None:
+        print(f"임베딩 캐시: {embedder.cache.stats()}")
+    if page_cache is not None:
+        print(f"페이지 캐시: {page_cache.stats()}")
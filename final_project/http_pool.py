@@ -0,0 +1,29 @@
+# http_pool.py
+from __future__ import annotations
+
+import os
+
+import httpx
+
+import rag  # noqa: F401  (rag/__init__.py가 저장소 루트를 import 경로에 추가)
+from src.app.net import http_pool as _shared
+
+# OpenAI(llm_node) + Google 검색(web_search)이 같이 쓰는 keep-alive 커넥션 풀
+# 구현은 src/app/net/http_pool.py와 공유하고, 설정만 환경변수에서 읽어 넘김
+http_pool_stats = _shared.http_pool_stats
+
+
+def _pool_params() -> dict:
+    return {
+        "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        "max_keepalive": int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        "keepalive_expiry_s": float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60")),
+        "connect_timeout_s": float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "5")),
+        "timeout_s": float(os.getenv("HTTP_TIMEOUT_S", "60")),
+        # HTTP/2는 h2 패키지가 있고 HTTP_HTTP2=1일 때만 (기본은 HTTP/1.1 keep-alive)
+        "http2": os.getenv("HTTP_HTTP2", "0").strip().lower() in ("1", "true", "yes", "on"),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    return _shared.get_http_client(**_pool_params())
@@ -5,17 +5,16 @@ from pathlib import Path
 from datetime import datetime
 import uuid
 
-import chromadb
-from chromadb.config import Settings
-
+from rag.backends import VectorStore, open_vector_store
 from rag.embedder import EmbeddingModel  # RAG에서 쓰던 모델 재사용
 
 
 class MemoryStore:
     """
-    Long-term Memory용 Vector DB (Chroma Persistent)
+    Long-term Memory용 Vector DB (RAGVectorStore와 같은 벡터 저장소 백엔드 사용)
     - content: 메모리 텍스트
     - metadata: memory_type, importance, tags, created_at 등
+    backend: chroma | numpy (None이면 VECTOR_BACKEND 환경변수, 기본 chroma)
     """
 
     def __init__(
@@ -23,18 +22,12 @@ class MemoryStore:
         db_dir: str | Path = "./memory_db",
         collection_name: str = "long_term_memory",
         embedding_model: Optional[EmbeddingModel] = None,
+        backend: Optional[str] = None,
     ) -> None:
         self.db_dir = Path(db_dir)
         self.collection_name = collection_name
         self.embedding_model = embedding_model or EmbeddingModel()
-
-        self.client = chromadb.PersistentClient(
-            path=str(self.db_dir),
-            settings=Settings(allow_reset=False),
-        )
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name,
-        )
+        self.store: VectorStore = open_vector_store(self.db_dir, self.collection_name, backend=backend)
 
     # -----------------------------
     # 메모리 쓰기
@@ -58,12 +51,13 @@ class MemoryStore:
             "created_at": now,
         }
 
-        self.collection.add(
-            documents=[content],
-            embeddings=emb,
+        self.store.upsert_batch(
             ids=[mem_id],
+            embeddings=emb,
+            documents=[content],
             metadatas=[metadata],
         )
+        self.store.flush()
         return mem_id
 
     # -----------------------------
@@ -75,31 +69,22 @@ class MemoryStore:
         top_k: int = 5,
         memory_type: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        query_emb = self.embedding_model.embed([query])
+        query_emb = self.embedding_model.embed_query(query)
 
         where: Dict[str, Any] = {}
         if memory_type:
             # 특정 타입만 필터링 (예: profile 메모리만)
             where["memory_type"] = memory_type
 
-        results = self.collection.query(
-            query_embeddings=query_emb,
-            n_results=top_k,
-            where=where if where else None,
-            include=["documents", "metadatas", "distances"],
-        )
-
-        docs = results.get("documents", [[]])[0]
-        metas = results.get("metadatas", [[]])[0]
-        dists = results.get("distances", [[]])[0]
+        hits = self.store.query_batch(query_emb, top_k, where=where if where else None)[0]
 
         out: List[Dict[str, Any]] = []
-        for text, meta, dist in zip(docs, metas, dists):
+        for h in hits:
             out.append(
                 {
-                    "content": text,
-                    "metadata": meta,
-                    "distance": float(dist),
+                    "content": h.document,
+                    "metadata": h.metadata,
+                    "distance": float(h.distance),
                 }
             )
         return out
@@ -3,10 +3,12 @@ from typing import Dict, Any
 from openai import OpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 
+from http_pool import get_http_client
 from state import State
 from tools import register_default_tools
 
-client = OpenAI()
+# 검색 tool과 같은 keep-alive 풀 사용
+client = OpenAI(http_client=get_http_client())
 _tool_registry = register_default_tools()
 _tools_for_openai = _tool_registry.list_openai_tools()
 
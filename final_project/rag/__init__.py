@@ -0,0 +1,9 @@
+# rag/__init__.py
+# 벡터 저장소 / 임베더 레지스트리 / 양자화 / 중복 제거는 저장소 루트 src/app 구현을 그대로 씀
+# final_project는 자기 디렉토리에서 실행되므로 저장소 루트를 import 경로 끝에 추가
+import sys
+from pathlib import Path
+
+_REPO_ROOT = str(Path(__file__).resolve().parents[2])
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
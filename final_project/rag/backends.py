@@ -0,0 +1,33 @@
+# rag/backends.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+# 구현은 src/app/vectorstore와 공유 (rag/__init__.py가 저장소 루트를 경로에 추가)
+from src.app.vectorstore.base import VectorStore
+from src.app.vectorstore.chroma_store import ChromaVectorStore
+from src.app.vectorstore.numpy_store import NumpyVectorStore
+
+
+def open_vector_store(
+    path: str | Path,
+    name: str,
+    backend: Optional[str] = None,
+    space: str = "l2",
+    numpy_dtype: Optional[str] = None,
+) -> VectorStore:
+    """
+    backend (None이면 VECTOR_BACKEND 환경변수, 기본 chroma)
+    - chroma: Chroma PersistentClient(path) 컬렉션 name
+    - numpy : path/numpy/name 아래 in-process 정확 검색 저장소
+    space: 기존 RAGVectorStore / MemoryStore 컬렉션이 Chroma 기본값(l2)으로 만들어져 있어 기본 l2
+    """
+    backend = backend or os.getenv("VECTOR_BACKEND", "chroma")
+    if backend == "chroma":
+        return ChromaVectorStore(path, name, space=space)
+    if backend == "numpy":
+        numpy_dtype = numpy_dtype or os.getenv("VECTOR_NUMPY_DTYPE", "float32")
+        return NumpyVectorStore(Path(path) / "numpy", name, dtype=numpy_dtype, space=space)
+    raise ValueError(f"지원하지 않는 벡터 저장소: {backend} (chroma | numpy)")
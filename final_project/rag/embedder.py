@@ -1,27 +1,88 @@
 # rag/embedder.py
 from __future__ import annotations
-from typing import List
+from typing import List, Optional
+from pathlib import Path
+import os
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from src.app.embedding.query_cache import encode_queries, encode_query
+from src.app.embedding.quantize import cache_model_name
+from src.app.embedding.registry import get_embedder_registry
+from src.app.rag import chunking
+from src.app.rag.embed_cache import EmbeddingCache, encode_with_cache
+
 
 class EmbeddingModel:
     """
     멀티링궐 문장 임베딩 래퍼
     - 기본 모델: paraphrase-multilingual-MiniLM-L12-v2
       (영/한 모두 지원, 비교적 가벼움)
+    - cache_dir 를 주면(또는 RAG_EMBED_CACHE_DIR 환경변수) 디스크 임베딩 캐시 사용
+      → 같은 텍스트는 다시 인코딩하지 않음 (reset=True 재색인 시 I/O만 발생)
+    - quantize="int8"(또는 RAG_EMBEDDER_QUANTIZE=int8)이면 CPU 동적 int8 양자화 모델 사용
+      (양자화된 모듈은 RAG_QUANTIZED_MODEL_DIR, 기본 ./quantized_models 에 캐시)
+    - SentenceTransformer는 프로세스 전역 레지스트리에서 가져옴
+      → MemoryStore / RAGVectorStore가 각자 EmbeddingModel을 만들어도 가중치는 1벌
+    - 질의 임베딩은 src/app과 같은 프로세스 전역 LRU 사용
+      (QUERY_EMBED_CACHE=0이면 끔, 크기는 QUERY_EMBED_CACHE_SIZE, 기본 4096)
     """
 
     def __init__(
         self,
         model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
         normalize: bool = True,
+        cache_dir: Optional[str | Path] = None,
+        cache_max_mb: int = 1024,
+        quantize: Optional[str] = None,
+        device: Optional[str] = None,
     ) -> None:
-        self.model = SentenceTransformer(model_name)
+        quantize = (quantize or os.getenv("RAG_EMBEDDER_QUANTIZE", "none")).lower()
+        self.model: SentenceTransformer = get_embedder_registry().get(
+            model_name,
+            device=device or os.getenv("RAG_EMBEDDER_DEVICE", "cpu"),
+            quantize=quantize,
+            cache_dir=Path(os.getenv("RAG_QUANTIZED_MODEL_DIR", "./quantized_models")),
+        )
+        # 캐시 키: int8 벡터는 fp32 벡터와 섞이지 않도록 모델 이름에 모드를 붙임
+        self.model_name = cache_model_name(model_name, quantize)
+        self.quantize = quantize
         self.normalize = normalize
+        self.query_cache = os.getenv("QUERY_EMBED_CACHE", "1").strip().lower() in ("1", "true", "yes", "on")
+        self.query_cache_size = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "4096"))
+
+        cache_dir = cache_dir or os.getenv("RAG_EMBED_CACHE_DIR")
+        self.cache: Optional[EmbeddingCache] = None
+        if cache_dir:
+            self.cache = EmbeddingCache(
+                cache_dir,
+                model_name=self.model_name,
+                normalize=normalize,
+                max_bytes=cache_max_mb * 1024 * 1024,
+            )
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    def token_budget(self) -> int:
+        """
+        인코더가 실제로 보는 토큰 수 (max_seq_length - special token - 여유 2개)
+        이보다 긴 청크는 뒤쪽이 잘려서 검색되지 않음
+        """
+        return chunking.token_budget(self.model)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is not None:
+            return encode_with_cache(
+                self.model,
+                texts,
+                self.cache,
+                normalize_embeddings=self.normalize,
+                show_progress_bar=False,
+            ).tolist()
+
         emb = self.model.encode(
             texts,
             normalize_embeddings=self.normalize,
@@ -30,3 +91,31 @@ class EmbeddingModel:
         if isinstance(emb, np.ndarray):
             return emb.tolist()
         return emb
+
+    def embed_query(self, text: str) -> List[List[float]]:
+        """
+        검색 질의 1개 임베딩 (embed([text])와 같은 형태)
+        - 프로세스 전역 LRU 사용 → 메모리 검색 / RAG 검색이 같은 질문을 한 번만 인코딩
+        """
+        vec = encode_query(
+            self.model,
+            self.model_name,
+            text,
+            normalize=self.normalize,
+            cache_size=self.query_cache_size,
+            enabled=self.query_cache,
+        )
+        return [vec.tolist()]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """검색 질의 여러 개를 한 번에 임베딩 (캐시에 없는 것만 배치 encode)"""
+        if not texts:
+            return []
+        return encode_queries(
+            self.model,
+            self.model_name,
+            texts,
+            normalize=self.normalize,
+            cache_size=self.query_cache_size,
+            enabled=self.query_cache,
+        ).tolist()
@@ -1,11 +1,22 @@
 # rag/loader.py
 from __future__ import annotations
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Callable, Optional, Tuple, TypeVar
 from pathlib import Path
 
+import numpy as np
 from pypdf import PdfReader
 
+from src.app.rag.chunking import token_window_spans
+from src.app.rag.manifest import file_sha256
+from src.app.rag.page_cache import PageTextCache
+
+T = TypeVar("T")
+
 
 @dataclass
 class TextChunk:
@@ -14,73 +25,298 @@ class TextChunk:
     metadata: Dict[str, Any]
 
 
-def read_pdf_text(pdf_path: Path) -> str:
-    """단일 PDF에서 모든 페이지 텍스트를 합쳐서 반환"""
+def iter_pdf_pages(pdf_path: Path) -> Iterator[str]:
+    """단일 PDF의 페이지 텍스트를 한 페이지씩 반환 (읽기 실패한 페이지는 건너뜀)"""
     reader = PdfReader(str(pdf_path))
-    texts = []
     for page in reader.pages:
         try:
-            texts.append(page.extract_text() or "")
+            text = page.extract_text() or ""
         except Exception:
             continue
-    return "\n".join(texts)
+        yield text
 
 
-def split_text(
-    text: str,
+def read_pdf_pages(pdf_path: Path) -> List[str]:
+    """단일 PDF의 페이지 텍스트 리스트 (프로세스 풀 작업 단위)"""
+    return list(iter_pdf_pages(pdf_path))
+
+
+def read_pdf_text(pdf_path: Path) -> str:
+    """단일 PDF에서 모든 페이지 텍스트를 합쳐서 반환"""
+    return "\n".join(iter_pdf_pages(pdf_path))
+
+
+def _ordered_map(fn: Callable[[Path], T], pdf_paths: List[Path], workers: int) -> Iterator[T]:
+    """
+    fn(pdf_path)를 프로세스 풀로 병렬 실행하고 입력 순서대로 반환
+    - 결과가 한꺼번에 쌓이지 않도록 동시에 띄우는 작업 수는 workers * 2 로 제한
+    """
+    it = iter(pdf_paths)
+    with ProcessPoolExecutor(max_workers=min(workers, len(pdf_paths))) as pool:
+        pending = deque(pool.submit(fn, p) for p in islice(it, workers * 2))
+        while pending:
+            result = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(pool.submit(fn, nxt))
+            yield result
+
+
+def _cached_page_lists(pdf_paths: List[Path], workers: int, cache: PageTextCache) -> Iterator[List[str]]:
+    """
+    페이지 캐시(파일 해시 기준)에 있으면 그대로, 없는 파일만 파싱(workers > 1이면 프로세스 풀)해서 캐시에 저장
+    - 동시에 띄우는 작업 수는 workers * 2 로 제한, 입력 순서 유지
+    """
+    if workers <= 1 or len(pdf_paths) <= 1:
+        for pdf_path in pdf_paths:
+            sha = file_sha256(pdf_path)
+            pages = cache.get_pages(sha)
+            if pages is None:
+                pages = read_pdf_pages(pdf_path)
+                cache.put_pages(sha, pages)
+            yield pages
+        return
+
+    it = iter(pdf_paths)
+    with ProcessPoolExecutor(max_workers=min(workers, len(pdf_paths))) as pool:
+        pending: deque = deque()
+
+        def fill() -> None:
+            for pdf_path in islice(it, workers * 2 - len(pending)):
+                sha = file_sha256(pdf_path)
+                pages = cache.get_pages(sha)
+                pending.append((sha, pages if pages is not None else pool.submit(read_pdf_pages, pdf_path)))
+
+        fill()
+        while pending:
+            sha, item = pending.popleft()
+            if not isinstance(item, list):
+                item = item.result()
+                cache.put_pages(sha, item)
+            fill()
+            yield item
+
+
+def iter_pdf_page_lists(
+    pdf_paths: List[Path],
+    workers: int = 1,
+    page_cache: Optional[PageTextCache] = None,
+) -> Iterator[Iterable[str]]:
+    """
+    파일마다 페이지 iterable을 반환
+    - workers <= 1: 페이지를 실제로 소비할 때 한 장씩 파싱 (파일 전체를 들고 있지 않음)
+    - workers > 1 : 파일 단위로 병렬 파싱한 페이지 리스트
+    - page_cache  : 캐시에 있는 파일은 파싱하지 않음 (청크 설정만 바꾼 재색인은 pypdf를 안 탐)
+    """
+    if page_cache is not None:
+        yield from _cached_page_lists(pdf_paths, workers, page_cache)
+        return
+    if workers <= 1 or len(pdf_paths) <= 1:
+        for pdf_path in pdf_paths:
+            yield iter_pdf_pages(pdf_path)
+        return
+    yield from _ordered_map(read_pdf_pages, pdf_paths, workers)
+
+
+class _PageOffsets:
+    """
+    이어 붙인 전체 텍스트의 글자 위치 → 페이지 번호(1부터)
+    (스트리밍 분리기가 버퍼를 잘라내도 전체 기준 위치로 찾음)
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.total = 0
+
+    def add(self, piece: str) -> None:
+        if self.starts:
+            self.total += 1  # "\n"
+        self.starts.append(self.total)
+        self.total += len(piece)
+
+    def page(self, offset: int) -> int:
+        return max(1, bisect_right(self.starts, offset))
+
+    def span(self, raw: str, start: int) -> Tuple[int, int]:
+        # 청크 앞뒤 공백(페이지 구분 "\n" 포함)은 strip 되므로 페이지 계산에서 제외
+        start += len(raw) - len(raw.lstrip())
+        end = start + len(raw.strip())
+        return self.page(start), self.page(max(start, end - 1))
+
+
+def split_text_spans_stream(
+    pieces: Iterable[str],
     chunk_size: int = 800,
     chunk_overlap: int = 200,
-) -> List[str]:
+) -> Iterator[Tuple[str, int, int]]:
     """
-    아주 단순한 청크 분리기:
-    - 글자 단위로 자름
-    - overlap을 주어서 문맥이 조금씩 겹치게
+    글자 수 기준 청크 분리기 (chunk_size 글자, 이웃 청크와 chunk_overlap 글자 겹침)
+    → 청크마다 (청크, 시작 페이지, 끝 페이지) — pieces 하나가 페이지 하나
+    - 전체 텍스트("\\n".join(pieces))를 만들지 않고 '아직 잘리지 않은 꼬리 + 현재 페이지'만 버퍼에 유지
     """
-    chunks: List[str] = []
-    start = 0
-    n = len(text)
+    step = max(1, chunk_size - chunk_overlap)
+    buf = ""
+    base = 0  # buf[0]의 전체 텍스트 기준 위치
+    offsets = _PageOffsets()
+    first = True
 
-    while start < n:
-        end = min(start + chunk_size, n)
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        if end == n:
-            break
-        start = end - chunk_overlap  # overlap 만큼 뒤로
-    return chunks
+    for piece in pieces:
+        buf = piece if first else buf + "\n" + piece
+        first = False
+        offsets.add(piece)
 
+        pos = 0
+        # 뒤에 글자가 더 남아 있을 때만 잘라냄 (마지막 청크는 끝에서 처리)
+        while len(buf) - pos > chunk_size:
+            raw = buf[pos:pos + chunk_size]
+            chunk = raw.strip()
+            if chunk:
+                yield (chunk, *offsets.span(raw, base + pos))
+            pos += step
+        buf = buf[pos:]
+        base += pos
 
-def load_pdfs_from_dir(
+    chunk = buf.strip()
+    if chunk:
+        yield (chunk, *offsets.span(buf, base))
+
+
+def _token_windows(
+    text: str,
+    tokenizer: Any,
+    max_tokens: int,
+    overlap: int,
+    final: bool,
+) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    text를 max_tokens 토큰 창으로 자름 → (청크 글자 구간들, 아직 자르지 않은 꼬리 시작 위치)
+    final=False면 텍스트 끝에 닿는 마지막 창은 다음 페이지와 이어 붙이도록 남겨 둔다.
+    창 계산은 src/app 색인과 같은 chunking.token_window_spans
+    """
+    offs = tokenizer(
+        text,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        verbose=False,
+    )["offset_mapping"]
+    spans = token_window_spans(offs, max_tokens, overlap)
+    if len(spans) == 0:
+        return [], len(text)
+    if final:
+        return [tuple(s) for s in spans.tolist()], len(text)
+
+    # 텍스트 끝(마지막 토큰)까지 닿는 첫 창부터는 꼬리로 남김
+    tail = int(np.argmax(spans[:, 1] >= offs[-1][1]))
+    return [tuple(s) for s in spans[:tail].tolist()], int(spans[tail, 0])
+
+
+def split_tokens_spans_stream(
+    pieces: Iterable[str],
+    tokenizer: Any,
+    max_tokens: int,
+    overlap_tokens: int = 16,
+    flush_chars: int = 20000,
+) -> Iterator[Tuple[str, int, int]]:
+    """
+    임베더 토크나이저 기준 스트리밍 청크 분리기 → 청크마다 (청크, 시작 페이지, 끝 페이지)
+    - 각 청크는 max_tokens 토큰 이하 → 인코더(max_seq_length)에서 잘려 버려지는 부분 없음
+    - 버퍼가 flush_chars를 넘을 때만 토크나이즈해서 페이지마다 재토크나이즈하지 않음
+    - pieces 하나가 페이지 하나
+    """
+    overlap = max(0, min(int(overlap_tokens), max_tokens - 1))
+    buf = ""
+    base = 0  # buf[0]의 전체 텍스트 기준 위치
+    offsets = _PageOffsets()
+    first = True
+
+    def emit(final: bool) -> Iterator[Tuple[str, int, int]]:
+        nonlocal buf, base
+        spans, tail = _token_windows(buf, tokenizer, max_tokens, overlap, final=final)
+        for s, e in spans:
+            c = buf[s:e].strip()
+            if c:
+                yield (c, *offsets.span(buf[s:e], base + s))
+        buf = buf[tail:]
+        base += tail
+
+    for piece in pieces:
+        buf = piece if first else buf + "\n" + piece
+        first = False
+        offsets.add(piece)
+        if len(buf) < flush_chars:
+            continue
+        yield from emit(final=False)
+
+    if buf:
+        yield from emit(final=True)
+
+
+def iter_pdf_chunks(
     pdf_dir: str | Path,
     chunk_size: int = 800,
     chunk_overlap: int = 200,
-) -> List[TextChunk]:
+    workers: int = 1,
+    tokenizer: Optional[Any] = None,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = 16,
+    page_cache: Optional[PageTextCache] = None,
+) -> Iterator[TextChunk]:
     """
-    pdf_dir 안의 모든 PDF 파일을 읽어서 TextChunk 리스트로 반환
-    id 형식: {파일이름}_{chunk_index}
-    metadata: {"source": 파일명, "chunk_index": i}
+    pdf_dir 안의 PDF를 page → chunk 순서로 흘려보내는 generator
+    (메모리에는 현재 페이지와 청크 버퍼만 유지)
+    id / metadata 형식은 load_pdfs_from_dir와 동일
+    tokenizer/max_tokens를 주면 글자 수 대신 토큰 수 기준으로 자름
+    page_cache를 주면 캐시에 있는 PDF는 파싱하지 않음
     """
     pdf_dir = Path(pdf_dir)
-    chunks: List[TextChunk] = []
-
-    for pdf_path in sorted(pdf_dir.glob("*.pdf")):
-        raw_text = read_pdf_text(pdf_path)
-        if not raw_text.strip():
-            continue
-
-        split_chunks = split_text(
-            raw_text,
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-        )
+    pdf_paths = sorted(pdf_dir.glob("*.pdf"))
 
-        for i, c in enumerate(split_chunks):
+    page_lists = iter_pdf_page_lists(pdf_paths, workers=workers, page_cache=page_cache)
+    for pdf_path, pages in zip(pdf_paths, page_lists):
+        if tokenizer is not None and max_tokens:
+            split_chunks = split_tokens_spans_stream(
+                pages,
+                tokenizer,
+                max_tokens=max_tokens,
+                overlap_tokens=overlap_tokens,
+            )
+        else:
+            split_chunks = split_text_spans_stream(
+                pages,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            )
+        for i, (c, page, page_end) in enumerate(split_chunks):
             cid = f"{pdf_path.stem}_{i}"
             meta = {
                 "source": pdf_path.name,
                 "chunk_index": i,
+                "page": page,
+                "page_end": page_end,
             }
-            chunks.append(TextChunk(id=cid, text=c, metadata=meta))
+            yield TextChunk(id=cid, text=c, metadata=meta)
 
-    return chunks
+
+def load_pdfs_from_dir(
+    pdf_dir: str | Path,
+    chunk_size: int = 800,
+    chunk_overlap: int = 200,
+    workers: int = 1,
+    page_cache: Optional[PageTextCache] = None,
+) -> List[TextChunk]:
+    """
+    pdf_dir 안의 모든 PDF 파일을 읽어서 TextChunk 리스트로 반환
+    id 형식: {파일이름}_{chunk_index}
+    metadata: {"source": 파일명, "chunk_index": i, "page": 시작 페이지, "page_end": 끝 페이지}
+    workers: PDF 텍스트 추출 프로세스 수
+    page_cache: PDF 페이지 텍스트 캐시 (있으면 재실행 시 파싱 생략)
+    """
+    return list(
+        iter_pdf_chunks(
+            pdf_dir,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            workers=workers,
+            page_cache=page_cache,
+        )
+    )
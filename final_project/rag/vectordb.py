@@ -1,19 +1,31 @@
 # rag/vectordb.py
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from itertools import islice
 from pathlib import Path
 
-import chromadb
-from chromadb.config import Settings
+from src.app.rag.dedup import NearDupIndex
+from src.app.rag.page_cache import PageTextCache
 
-from .loader import load_pdfs_from_dir, TextChunk
+from .backends import VectorStore, open_vector_store
+from .loader import iter_pdf_chunks, TextChunk
 from .embedder import EmbeddingModel
 
 
+def _batched(items: Iterable[TextChunk], size: int) -> Iterator[List[TextChunk]]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
 class RAGVectorStore:
     """
-    - PDF 디렉토리 → 청크 → 임베딩 → Chroma Persistent 컬렉션에 저장
-    - 쿼리 → 임베딩 → ANN 검색 → 상위 k개 문서 반환
+    - PDF 디렉토리 → 청크 → 임베딩 → 벡터 저장소(Chroma | NumPy)에 저장
+    - 쿼리 → 임베딩 → 벡터 검색 → 상위 k개 문서 반환
+    backend: chroma | numpy (None이면 VECTOR_BACKEND 환경변수, 기본 chroma)
     """
 
     def __init__(
@@ -21,18 +33,12 @@ class RAGVectorStore:
         db_dir: str | Path = "./chroma_db",
         collection_name: str = "project_docs",
         embedding_model: Optional[EmbeddingModel] = None,
+        backend: Optional[str] = None,
     ) -> None:
         self.db_dir = Path(db_dir)
         self.collection_name = collection_name
         self.embedding_model = embedding_model or EmbeddingModel()
-
-        self.client = chromadb.PersistentClient(
-            path=str(self.db_dir),
-            settings=Settings(allow_reset=False),
-        )
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name,
-        )
+        self.store: VectorStore = open_vector_store(self.db_dir, self.collection_name, backend=backend)
 
     # -----------------------
     # 색인 구축
@@ -43,38 +49,85 @@ class RAGVectorStore:
         chunk_size: int = 800,
         chunk_overlap: int = 200,
         reset: bool = False,
+        workers: int = 1,
+        batch_size: int = 256,
+        chunk_by_tokens: bool = False,
+        overlap_tokens: int = 16,
+        page_cache: Optional[PageTextCache] = None,
+        dedup_threshold: Optional[float] = None,
     ) -> int:
         """
         pdf_dir 안 PDF들을 읽어서 전체 컬렉션을 다시 구성.
         reset=True면 기존 컬렉션을 비우고 새로 생성.
+        workers: PDF 텍스트 추출 프로세스 수
+        batch_size: 한 번에 임베딩/upsert할 chunk 수
+            (page → chunk → batch 단위로 흘려보내므로 메모리 사용량은 batch 크기에 비례)
+        chunk_by_tokens: True면 chunk_size 대신 임베더 max_seq_length에 맞춘 토큰 단위로 자름
+        page_cache: PDF 페이지 텍스트 캐시 (청크 설정만 바꾼 재색인은 PDF 파싱 생략)
+        dedup_threshold: 이번 빌드에서 이미 색인한 청크와 추정 Jaccard(MinHash LSH)가 이 값 이상이면
+            임베딩/저장하지 않고 대표 청크 metadata(dup_sources, dup_count)에 출처만 남김 (None이면 끔, 기본; 0.85 권장)
         반환: 색인된 chunk 개수
         """
         if reset:
-            self.client.delete_collection(self.collection_name)
-            self.collection = self.client.create_collection(self.collection_name)
+            self.store.reset()
+
+        batch_size = max(1, int(batch_size))
 
-        chunks: List[TextChunk] = load_pdfs_from_dir(
+        chunks = iter_pdf_chunks(
             pdf_dir,
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
+            workers=workers,
+            tokenizer=self.embedding_model.tokenizer if chunk_by_tokens else None,
+            max_tokens=self.embedding_model.token_budget() if chunk_by_tokens else None,
+            overlap_tokens=overlap_tokens,
+            page_cache=page_cache,
         )
-        if not chunks:
-            return 0
-
-        texts = [c.text for c in chunks]
-        ids = [c.id for c in chunks]
-        metadatas = [c.metadata for c in chunks]
-        embeddings = self.embedding_model.embed(texts)
-
-        # Chroma add
-        self.collection.add(
-            documents=texts,
-            embeddings=embeddings,
-            ids=ids,
-            metadatas=metadatas,
-        )
 
-        return len(chunks)
+        dedup = NearDupIndex(threshold=dedup_threshold) if dedup_threshold is not None else None
+        if dedup is not None:
+            chunks = self._skip_near_duplicates(chunks, dedup)
+
+        total = 0
+        for n_batch, batch in enumerate(_batched(chunks, batch_size), start=1):
+            texts = [c.text for c in batch]
+            embeddings = self.embedding_model.embed(texts)
+
+            # upsert (재실행해도 같은 id는 덮어씀)
+            self.store.upsert_batch(
+                ids=[c.id for c in batch],
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=[c.metadata for c in batch],
+            )
+
+            total += len(batch)
+            print(
+                f"[INDEX] batch {n_batch}: +{len(batch)} chunks "
+                f"(total {total}, {batch[-1].metadata.get('source', '')})"
+            )
+
+        if dedup is not None:
+            ids = dedup.linked_ids()
+            if ids:
+                hits = self.store.get(ids=ids)
+                metas = []
+                for h in hits:
+                    labels = dedup.duplicate_labels(h.id)
+                    metas.append({**h.metadata, "dup_sources": "; ".join(labels), "dup_count": len(labels)})
+                self.store.update_metadatas([h.id for h in hits], metas)
+            print(f"[INDEX] dedup: {dedup.stats(dim=self.embedding_model.model.get_sentence_embedding_dimension())}")
+
+        self.store.flush()
+        return total
+
+    @staticmethod
+    def _skip_near_duplicates(chunks: Iterable[TextChunk], dedup: NearDupIndex) -> Iterator[TextChunk]:
+        """준중복 청크는 흘려보내지 않고 dedup 링크로만 기록"""
+        for c in chunks:
+            label = f"{c.metadata.get('source', '')} p.{c.metadata.get('page', '?')}"
+            if dedup.check(c.id, c.text, label) is None:
+                yield c
 
     # -----------------------
     # 검색
@@ -88,25 +141,36 @@ class RAGVectorStore:
         query_text와 가장 유사한 문서 청크 top_k개 반환
         반환 형식: [{ "text": ..., "metadata": ..., "distance": ... }, ...]
         """
-        query_emb = self.embedding_model.embed([query_text])
+        return self.query_many([query_text], top_k=top_k)[0]
 
-        results = self.collection.query(
-            query_embeddings=query_emb,
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"],
-        )
+    def query_many(
+        self,
+        query_texts: List[str],
+        top_k: int = 5,
+        batch_size: int = 256,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        여러 질의를 한 번에 검색 (평가용 질문 수천 개 등)
+        - 임베딩은 배치 encode 한 번, 벡터 검색은 batch_size 질의씩 묶어서 호출
+        반환: 질의 순서대로 query()와 같은 형식의 리스트
+        """
+        query_texts = list(query_texts)
+        if not query_texts:
+            return []
 
-        docs = results.get("documents", [[]])[0]
-        metas = results.get("metadatas", [[]])[0]
-        dists = results.get("distances", [[]])[0]
-
-        out: List[Dict[str, Any]] = []
-        for text, meta, dist in zip(docs, metas, dists):
-            out.append(
-                {
-                    "text": text,
-                    "metadata": meta,
-                    "distance": float(dist),
-                }
-            )
+        query_embs = self.embedding_model.embed_queries(query_texts)
+
+        out: List[List[Dict[str, Any]]] = []
+        for s in range(0, len(query_embs), batch_size):
+            for hits in self.store.query_batch(query_embs[s:s + batch_size], top_k):
+                out.append(
+                    [
+                        {
+                            "text": h.document,
+                            "metadata": h.metadata,
+                            "distance": float(h.distance),
+                        }
+                        for h in hits
+                    ]
+                )
         return out
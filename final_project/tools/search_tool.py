@@ -1,9 +1,9 @@
 # tools/search_tool.py
 import os
 from typing import Dict, Any
-import requests
 from pydantic import BaseModel, Field, conint
 
+from http_pool import get_http_client
 from .tool_spec import ToolSpec
 
 
@@ -38,7 +38,7 @@ def google_web_search(input: WebSearchInput) -> Dict[str, Any]:
     }
 
     try:
-        resp = requests.get(
+        resp = get_http_client().get(
             "https://www.googleapis.com/customsearch/v1",
             params=params,
             timeout=10,
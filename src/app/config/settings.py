@@ -14,10 +14,62 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parents[3]
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """'1/true/yes/on' 이면 True (대소문자 무시)"""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str) -> int | None:
+    """설정 안 했거나 빈 값이면 None"""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return None
+    return int(raw)
+
+
 class Settings(BaseModel):
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
     openai_temperature: float = 0.2
+    # True면 llm_node가 chat_raw_stream으로 토큰을 받아 LangGraph custom stream으로 흘려보냄 (기본 꺼짐)
+    openai_stream: bool = False
+    # 비동기 그래프 노드가 블로킹 작업(임베딩/벡터 검색/동기 tool/reflection)을 넘기는 스레드 풀 크기
+    blocking_workers: int = 32
+    # temperature 0 호출(chat_raw / reflection) 응답을 SQLite에 캐시 (기본 꺼짐)
+    llm_cache: bool = False
+    llm_cache_path: Path | None = None
+    llm_cache_ttl_s: float = 7 * 24 * 3600
+    llm_cache_max_entries: int = 10000
+    llm_cache_max_mb: float = 256
+    # True면 temperature > 0 호출도 캐시 (재현용 데모/테스트)
+    llm_cache_force: bool = False
+    # 턴 예산 / 재시도 / hedge (src/app/llm/resilience.py)
+    # - llm_turn_budget_s: 한 턴(llm → tool → llm ...)의 LLM 호출 전체 마감, 0이면 없음 (기본 없음)
+    # - llm_request_timeout_s: 요청 1번의 최대 시간 (남은 턴 예산이 더 짧으면 그쪽, 기본은 openai SDK 기본값 600초)
+    llm_turn_budget_s: float = 0
+    llm_request_timeout_s: float = 600
+    llm_max_retries: int = 2
+    llm_retry_base_ms: float = 250
+    llm_retry_max_ms: float = 4000
+    # hedge: 지연 안에 응답(스트림은 첫 조각)이 없으면 같은 요청을 1번 더 보내고 늦은 쪽 취소
+    # - llm_hedge_delay_ms 0 = 관측 p95 사용 (샘플이 모이기 전에는 llm_hedge_default_delay_ms)
+    llm_hedge: bool = False
+    llm_hedge_delay_ms: float = 0
+    llm_hedge_default_delay_ms: float = 2000
+    llm_hedge_workers: int = 16
+
+    # --- 외부 HTTP 커넥션 풀 (src/app/net/http_pool.py: OpenAI + Google 검색 공용) ---
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    http_keepalive_expiry_s: float = 60
+    http_connect_timeout_s: float = 5
+    http_timeout_s: float = 60
+    # HTTP/2 (h2 패키지 필요: pip install 'httpx[http2]', 없으면 HTTP/1.1 keep-alive로 자동 전환)
+    # 기본 끔: HTTP/2는 요청을 연결 1개에 다중화하므로 LLM hedge 요청이 느린 연결을 그대로 같이 탐
+    http_http2: bool = False
 
     # --- Google 검색 ---
     google_search_api_key: str | None = None
@@ -28,6 +80,95 @@ class Settings(BaseModel):
     rag_db_dir: Path
     rag_collection_name: str = "course_rag"
     rag_embedding_model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    # 임베더 device (RAG / 메모리가 같은 인스턴스를 쓰도록 공통), 양자화 시 cpu 고정
+    rag_embedder_device: str = "cpu"
+    # 임베더 양자화 (CPU 전용): none | int8(nn.Linear 동적 양자화, 디스크에 캐시)
+    rag_embedder_quantize: str = "none"
+    rag_quantized_model_dir: Path | None = None
+    # PDF 텍스트 추출 프로세스 수 (1이면 단일 프로세스)
+    rag_index_workers: int = 1
+    # 청크 방식: chars(800자 고정) | tokens(임베더 토크나이저/max_seq_length 기준)
+    # 바꾸면 manifest 설정이 달라져 다음 index_cli 실행 때 전체 재색인
+    rag_chunker: str = "chars"
+    rag_chunk_overlap_tokens: int = 16
+    # 검색 방식: vector | hybrid(벡터 + BM25, RRF 결합)
+    rag_search_mode: str = "vector"
+    rag_rrf_k: int = 60
+    # PDF 페이지 텍스트 캐시 (파일 해시 + 페이지 + 추출기 버전, SQLite/zlib) → 재청크 시 파싱 생략 (기본 꺼짐)
+    rag_page_cache: bool = False
+    rag_page_cache_path: Path | None = None
+    # 색인 시점 준중복 청크 제거 (MinHash LSH, 추정 Jaccard >= threshold면 임베딩 생략 + 대표 청크에 출처 기록)
+    # 기본 꺼짐, 켜거나 끄면 다음 index_cli 실행 때 전체 재색인
+    rag_dedup: bool = False
+    rag_dedup_threshold: float = 0.85
+    # 벡터 저장소: chroma | numpy(in-process 정확 검색, ~20만 청크 이하 권장)
+    #            | snapshot(index_cli --export-snapshot 번들, 읽기 전용 mmap)
+    rag_backend: str = "chroma"
+    rag_numpy_dtype: str = "float32"   # float32 | float16
+    # rag_backend=snapshot일 때 색인/스냅샷 내보내기에 쓰는 원본 저장소: chroma | numpy
+    rag_snapshot_source: str = "chroma"
+    # 장기 메모리 벡터 저장소: chroma | numpy
+    memory_backend: str = "chroma"
+    # Chroma HNSW 파라미터 (RAG / 메모리 컬렉션 공통, 컬렉션 생성 시 적용)
+    # None이면 metadata에 넣지 않음 → Chroma 기본값 (M 16 / construction_ef 100 / search_ef 100)
+    hnsw_m: int | None = None
+    hnsw_construction_ef: int | None = None
+    hnsw_search_ef: int | None = None
+
+    # --- 임베딩 micro-batching (동시 요청의 encode를 한 배치로, 한가할 때는 대기 없음, 기본 꺼짐) ---
+    embed_batching: bool = False
+    embed_batch_max_wait_ms: float = 2.0
+    embed_batch_max_size: int = 32
+
+    # --- 임베딩 worker 프로세스 풀 (0이면 서버 프로세스 안에서 encode) ---
+    embed_workers: int = 0
+    embed_worker_threads: int = 1   # worker당 torch 스레드 수
+
+    # --- 질의 임베딩 LRU (RAG / 메모리 공용, 0이면 끔) ---
+    query_embed_cache: bool = True
+    query_embed_cache_size: int = 4096
+
+    # --- rag_search 결과 캐시 (질의 임베딩 cosine 거리 기준, 0이면 끔) ---
+    rag_result_cache_size: int = 256
+    rag_result_cache_ttl_s: float = 600.0
+    rag_result_cache_max_distance: float = 0.05
+
+    # --- cross-encoder 재정렬 (후보 N개 → top_k, 시간 예산 초과 시 벡터 순서) ---
+    rag_rerank: bool = False
+    rag_rerank_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+    rag_rerank_candidates: int = 20
+    rag_rerank_budget_ms: float = 300.0
+    rag_rerank_batch_size: int = 16
+    rag_rerank_max_length: int = 256
+    # format_rag_answer가 LLM에 넘기는 최대 청크 수 (재정렬 시 줄여서 프롬프트 토큰 절약)
+    rag_answer_max_hits: int = 5
+
+    # --- 임베딩 디스크 캐시 (색인 시 같은 청크 재임베딩 방지, 기본 꺼짐) ---
+    rag_embed_cache: bool = False
+    rag_embed_cache_dir: Path | None = None
+    rag_embed_cache_max_mb: int = 1024
+    rag_embed_cache_dtype: str = "float32"   # float32 | float16
+
+    def http_pool_params(self) -> dict:
+        """net.http_pool.get_http_client / get_async_http_client 인자"""
+        return {
+            "max_connections": self.http_max_connections,
+            "max_keepalive": self.http_max_keepalive,
+            "keepalive_expiry_s": self.http_keepalive_expiry_s,
+            "connect_timeout_s": self.http_connect_timeout_s,
+            "timeout_s": self.http_timeout_s,
+            "http2": self.http_http2,
+            "hedge": self.llm_hedge,
+        }
+
+    def hnsw_params(self) -> dict:
+        """Chroma 컬렉션 metadata용 (hnsw:M / hnsw:construction_ef / hnsw:search_ef), HNSW_* 로 지정한 값만"""
+        params = {
+            "M": self.hnsw_m,
+            "construction_ef": self.hnsw_construction_ef,
+            "search_ef": self.hnsw_search_ef,
+        }
+        return {k: v for k, v in params.items() if v is not None}
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -60,12 +201,75 @@ class Settings(BaseModel):
             openai_api_key=api_key,
             openai_model=model,
             openai_temperature=temperature,
+            openai_stream=_env_flag("OPENAI_STREAM", False),
+            blocking_workers=int(os.getenv("BLOCKING_WORKERS", "32")),
+            llm_cache=_env_flag("LLM_CACHE", False),
+            llm_cache_path=Path(os.getenv("LLM_CACHE_PATH") or BASE_DIR / "data" / "llm_cache.sqlite3"),
+            llm_cache_ttl_s=float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600))),
+            llm_cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            llm_cache_max_mb=float(os.getenv("LLM_CACHE_MAX_MB", "256")),
+            llm_cache_force=_env_flag("LLM_CACHE_FORCE", False),
+            llm_turn_budget_s=float(os.getenv("LLM_TURN_BUDGET_S", "0")),
+            llm_request_timeout_s=float(os.getenv("LLM_REQUEST_TIMEOUT_S", "600")),
+            llm_max_retries=int(os.getenv("LLM_MAX_RETRIES", "2")),
+            llm_retry_base_ms=float(os.getenv("LLM_RETRY_BASE_MS", "250")),
+            llm_retry_max_ms=float(os.getenv("LLM_RETRY_MAX_MS", "4000")),
+            llm_hedge=_env_flag("LLM_HEDGE", False),
+            llm_hedge_delay_ms=float(os.getenv("LLM_HEDGE_DELAY_MS", "0")),
+            llm_hedge_default_delay_ms=float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "2000")),
+            llm_hedge_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")),
+            http_max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            http_max_keepalive=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            http_keepalive_expiry_s=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_S", "60")),
+            http_connect_timeout_s=float(os.getenv("HTTP_CONNECT_TIMEOUT_S", "5")),
+            http_timeout_s=float(os.getenv("HTTP_TIMEOUT_S", "60")),
+            http_http2=_env_flag("HTTP_HTTP2", False),
             google_search_api_key=google_key,
             google_search_cx=google_cx,
             rag_pdf_dir=rag_pdf_dir,
             rag_db_dir=rag_db_dir,
             rag_collection_name=os.getenv("RAG_COLLECTION_NAME", "course_rag"),
             rag_embedding_model_name=emb_model_name,
+            rag_embedder_device=os.getenv("RAG_EMBEDDER_DEVICE", "cpu"),
+            rag_embedder_quantize=os.getenv("RAG_EMBEDDER_QUANTIZE", "none").lower(),
+            rag_quantized_model_dir=Path(os.getenv("RAG_QUANTIZED_MODEL_DIR") or rag_db_dir / "quantized_models"),
+            rag_index_workers=int(os.getenv("RAG_INDEX_WORKERS", "1")),
+            rag_chunker=os.getenv("RAG_CHUNKER", "chars"),
+            rag_chunk_overlap_tokens=int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "16")),
+            rag_search_mode=os.getenv("RAG_SEARCH_MODE", "vector"),
+            rag_rrf_k=int(os.getenv("RAG_RRF_K", "60")),
+            rag_page_cache=_env_flag("RAG_PAGE_CACHE", False),
+            rag_page_cache_path=Path(os.getenv("RAG_PAGE_CACHE_PATH") or rag_db_dir / "page_cache.sqlite3"),
+            rag_dedup=_env_flag("RAG_DEDUP", False),
+            rag_dedup_threshold=float(os.getenv("RAG_DEDUP_THRESHOLD", "0.85")),
+            rag_backend=os.getenv("RAG_BACKEND", "chroma"),
+            rag_numpy_dtype=os.getenv("RAG_NUMPY_DTYPE", "float32"),
+            rag_snapshot_source=os.getenv("RAG_SNAPSHOT_SOURCE", "chroma"),
+            memory_backend=os.getenv("MEMORY_BACKEND", "chroma"),
+            hnsw_m=_env_int("HNSW_M"),
+            hnsw_construction_ef=_env_int("HNSW_CONSTRUCTION_EF"),
+            hnsw_search_ef=_env_int("HNSW_SEARCH_EF"),
+            embed_batching=_env_flag("EMBED_BATCHING", False),
+            embed_batch_max_wait_ms=float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "2")),
+            embed_batch_max_size=int(os.getenv("EMBED_BATCH_MAX_SIZE", "32")),
+            embed_workers=int(os.getenv("EMBED_WORKERS", "0")),
+            embed_worker_threads=int(os.getenv("EMBED_WORKER_THREADS", "1")),
+            query_embed_cache=_env_flag("QUERY_EMBED_CACHE", True),
+            query_embed_cache_size=int(os.getenv("QUERY_EMBED_CACHE_SIZE", "4096")),
+            rag_result_cache_size=int(os.getenv("RAG_RESULT_CACHE_SIZE", "256")),
+            rag_result_cache_ttl_s=float(os.getenv("RAG_RESULT_CACHE_TTL_S", "600")),
+            rag_result_cache_max_distance=float(os.getenv("RAG_RESULT_CACHE_MAX_DISTANCE", "0.05")),
+            rag_rerank=_env_flag("RAG_RERANK", False),
+            rag_rerank_model=os.getenv("RAG_RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"),
+            rag_rerank_candidates=int(os.getenv("RAG_RERANK_CANDIDATES", "20")),
+            rag_rerank_budget_ms=float(os.getenv("RAG_RERANK_BUDGET_MS", "300")),
+            rag_rerank_batch_size=int(os.getenv("RAG_RERANK_BATCH_SIZE", "16")),
+            rag_rerank_max_length=int(os.getenv("RAG_RERANK_MAX_LENGTH", "256")),
+            rag_answer_max_hits=int(os.getenv("RAG_ANSWER_MAX_HITS", "5")),
+            rag_embed_cache=_env_flag("RAG_EMBED_CACHE", False),
+            rag_embed_cache_dir=Path(os.getenv("RAG_EMBED_CACHE_DIR") or rag_db_dir / "embed_cache"),
+            rag_embed_cache_max_mb=int(os.getenv("RAG_EMBED_CACHE_MAX_MB", "1024")),
+            rag_embed_cache_dtype=os.getenv("RAG_EMBED_CACHE_DTYPE", "float32"),
         )
 
 
@@ -0,0 +1,198 @@
+# src/app/embedding/batcher.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 배치로 합쳐도 결과가 같은 encode 인자만 허용 (그 외 인자가 오면 모델을 바로 호출)
+_BATCHABLE_KWARGS = {"normalize_embeddings", "show_progress_bar", "convert_to_numpy", "batch_size"}
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    normalize: bool
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """
+    SentenceTransformer.encode 호환 프록시 (동시 요청 micro-batching)
+
+    - 여러 스레드 / 코루틴의 encode([질의]) 요청을 모아 forward 1번으로 처리하고 각자에게 벡터를 돌려줌
+    - 한가할 때는 기다리지 않음: 큐에 요청이 1개뿐이고 직전 배치도 1개였으면 바로 실행 (p50 유지)
+    - 바쁠 때(직전 배치가 2개 이상이거나 큐가 쌓임)만 max_wait_ms 동안 max_batch 개까지 더 모음
+      (forward 도중 도착한 요청은 다음 배치로 자연스럽게 합쳐짐)
+    - max_batch 이상의 큰 입력(색인)이나 배치 불가 인자는 모델을 바로 호출
+    - tokenizer / max_seq_length 등 나머지 속성은 원래 모델로 위임
+    """
+
+    def __init__(self, model: Any, max_wait_ms: float = 2.0, max_batch: int = 32) -> None:
+        self.model = model
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+
+        self._queue: Deque[_Request] = deque()
+        self._cond = threading.Condition()
+        self._last_batch = 1
+        self._worker: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        self.direct = 0
+        self.max_seen = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # __init__에서 만든 속성이 아니면 모델 속성 (tokenizer, max_seq_length, ...)
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    # ---------- public ----------
+    def encode(self, sentences: Any, **kwargs: Any) -> Any:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if (
+            not texts
+            or len(texts) >= self.max_batch
+            or not set(kwargs) <= _BATCHABLE_KWARGS
+            or kwargs.get("convert_to_numpy", True) is False
+        ):
+            with self._cond:
+                self.direct += 1
+            return self.model.encode(sentences, **kwargs)
+
+        out = self.submit(texts, normalize=bool(kwargs.get("normalize_embeddings", False))).result()
+        return out[0] if single else out
+
+    async def aencode(self, sentences: Any, **kwargs: Any) -> Any:
+        """코루틴용 encode (이벤트 루프를 막지 않고 배치 결과를 기다림)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts or len(texts) >= self.max_batch or not set(kwargs) <= _BATCHABLE_KWARGS:
+            return await asyncio.to_thread(self.encode, sentences, **kwargs)
+        fut = self.submit(texts, normalize=bool(kwargs.get("normalize_embeddings", False)))
+        out = await asyncio.wrap_future(fut)
+        return out[0] if single else out
+
+    def submit(self, texts: List[str], normalize: bool = False) -> Future:
+        req = _Request(texts=list(texts), normalize=normalize)
+        with self._cond:
+            self._ensure_worker()
+            self._queue.append(req)
+            self.requests += 1
+            self._cond.notify()
+        return req.future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "items": self.items,
+                "batches": self.batches,
+                "direct_calls": self.direct,
+                "avg_batch": self.items / self.batches if self.batches else 0.0,
+                "max_batch_seen": self.max_seen,
+                "queued": len(self._queue),
+                "max_wait_ms": self.max_wait_s * 1000.0,
+                "max_batch": self.max_batch,
+            }
+
+    # ---------- worker ----------
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+            self._worker.start()
+
+    def _queued_items(self) -> int:
+        return sum(len(r.texts) for r in self._queue)
+
+    def _take_batch(self) -> List[_Request]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            busy = self._last_batch > 1 or len(self._queue) > 1
+            if busy and self.max_wait_s > 0:
+                deadline = time.perf_counter() + self.max_wait_s
+                while self._queued_items() < self.max_batch:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+
+            # normalize 설정이 같은 요청끼리만 한 배치로
+            norm = self._queue[0].normalize
+            batch: List[_Request] = []
+            n = 0
+            rest: Deque[_Request] = deque()
+            while self._queue:
+                r = self._queue.popleft()
+                if r.normalize == norm and (not batch or n + len(r.texts) <= self.max_batch):
+                    batch.append(r)
+                    n += len(r.texts)
+                else:
+                    rest.append(r)
+            self._queue = rest
+
+            self._last_batch = n
+            self.batches += 1
+            self.items += n
+            self.max_seen = max(self.max_seen, n)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            texts = [t for r in batch for t in r.texts]
+            try:
+                emb = np.asarray(
+                    self.model.encode(
+                        texts,
+                        batch_size=len(texts),
+                        normalize_embeddings=batch[0].normalize,
+                        show_progress_bar=False,
+                        convert_to_numpy=True,
+                    ),
+                    dtype=np.float32,
+                )
+            except Exception as e:
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+
+            pos = 0
+            for r in batch:
+                r.future.set_result(emb[pos:pos + len(r.texts)])
+                pos += len(r.texts)
+
+
+# ---------- one batcher per model instance ----------
+_batchers: Dict[int, Tuple[Any, MicroBatcher]] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model: Any, max_wait_ms: float = 2.0, max_batch: int = 32) -> MicroBatcher:
+    """
+    같은 모델 인스턴스(레지스트리 공유)에는 같은 배처 → RAG / 메모리 요청도 한 배치로 합쳐짐
+    """
+    with _batchers_lock:
+        hit = _batchers.get(id(model))
+        if hit is None or hit[0] is not model:
+            hit = (model, MicroBatcher(model, max_wait_ms=max_wait_ms, max_batch=max_batch))
+            _batchers[id(model)] = hit
+        return hit[1]
+
+
+def batcher_stats() -> List[Dict[str, Any]]:
+    with _batchers_lock:
+        items = list(_batchers.values())
+    return [b.stats() for _, b in items]
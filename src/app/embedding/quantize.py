@@ -0,0 +1,253 @@
+# src/app/embedding/quantize.py
+from __future__ import annotations
+
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+QUANTIZE_MODES = ("none", "int8")
+
+
+def cache_model_name(model_name: str, quantize: str = "none") -> str:
+    """
+    임베딩 캐시(질의 LRU / 디스크 캐시)용 모델 이름
+    - int8 벡터는 fp32와 미세하게 다르므로 같은 키를 쓰지 않는다
+    """
+    return model_name if quantize in ("", "none") else f"{model_name}@{quantize}"
+
+
+def _transformer_module(model: SentenceTransformer) -> Any:
+    # SentenceTransformer = [Transformer, Pooling, (Normalize)] → 0번이 HF 모델을 감싼 모듈
+    return model[0]
+
+
+def _cache_file(cache_dir: Path, model_name: str) -> Path:
+    import torch
+
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    # packed 가중치 형식은 torch 버전에 따라 달라질 수 있음 → 버전을 파일명에 포함
+    ver = re.sub(r"[^0-9A-Za-z.]+", "_", torch.__version__)
+    return Path(cache_dir) / f"{safe}.int8.torch{ver}.pt"
+
+
+def _plain_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    양자화 state_dict → 일반 텐서만 담은 dict
+    - qint8 텐서 / torch.dtype / qscheme 객체는 pickle 시 sys.modules 전체를 뒤지는데,
+      그 과정에서 transformers 지연 import가 깨지는 환경이 있음 → int8 값 + scale로 풀어서 저장
+    """
+    import torch
+
+    out: Dict[str, Any] = {}
+    for k, v in state.items():
+        if isinstance(v, tuple):  # Linear._packed_params: (qint8 weight, bias)
+            w, b = v
+            if w.qscheme() != torch.per_tensor_affine:
+                raise ValueError(f"per-tensor 양자화만 캐시 가능: {k} ({w.qscheme()})")
+            out[k + ".int8"] = w.int_repr()
+            out[k + ".scale"] = torch.tensor(w.q_scale(), dtype=torch.float64)
+            out[k + ".zero_point"] = torch.tensor(w.q_zero_point(), dtype=torch.int64)
+            if b is not None:
+                out[k + ".bias"] = b.detach()
+        elif isinstance(v, torch.Tensor):
+            out[k] = v
+    return out
+
+
+def _load_plain_state(qmodel: Any, plain: Dict[str, Any]) -> None:
+    import torch
+
+    state = qmodel.state_dict()
+    for k, v in list(state.items()):
+        if isinstance(v, tuple):
+            # packed 가중치는 load_state_dict가 모양을 확인하지 않음 → 구조가 다른 캐시를 여기서 거름
+            if tuple(plain[k + ".int8"].shape) != tuple(v[0].shape):
+                raise ValueError(f"{k}: 캐시 {tuple(plain[k + '.int8'].shape)} != 모델 {tuple(v[0].shape)}")
+            w = torch._make_per_tensor_quantized_tensor(
+                plain[k + ".int8"], float(plain[k + ".scale"]), int(plain[k + ".zero_point"]),
+            )
+            state[k] = (w, plain.get(k + ".bias"))
+        elif isinstance(v, torch.Tensor):
+            state[k] = plain[k]
+    qmodel.load_state_dict(state)
+
+
+def _swap_int8_linears(module: Any) -> List[tuple]:
+    """
+    nn.Linear → 빈 동적 int8 Linear로 교체 (가중치는 _load_plain_state로 채움, fp32→int8 변환 없음)
+    반환: 되돌리기용 (부모 모듈, 이름, 원래 Linear) 목록
+    """
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicLinear
+
+    swapped: List[tuple] = []
+    for parent in list(module.modules()):
+        for name, child in list(parent.named_children()):
+            # quantize_dynamic({nn.Linear})과 같은 기준: 하위 클래스(MHA out_proj 등)는 그대로 둠
+            if type(child) is torch.nn.Linear:
+                setattr(parent, name, DynamicLinear(
+                    child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8,
+                ))
+                swapped.append((parent, name, child))
+    return swapped
+
+
+def _load_cached_int8(module: Any, path: Path) -> bool:
+    """캐시된 int8 가중치로 바로 양자화 모듈 구성 (실패하면 원래 fp32 Linear로 되돌리고 False)"""
+    import torch
+
+    try:
+        plain = torch.load(path, map_location="cpu")
+    except Exception as e:
+        print(f"[QUANT] 캐시 읽기 실패, 다시 양자화: {path} ({e})")
+        return False
+    swapped = _swap_int8_linears(module)
+    try:
+        _load_plain_state(module, plain)
+    except Exception as e:
+        for parent, name, child in swapped:
+            setattr(parent, name, child)
+        print(f"[QUANT] 캐시가 모델과 맞지 않음, 다시 양자화: {path} ({e})")
+        return False
+    return True
+
+
+def quantize_int8(
+    model: SentenceTransformer,
+    model_name: str,
+    cache_dir: Optional[Path] = None,
+) -> SentenceTransformer:
+    """
+    transformer의 nn.Linear를 동적 int8 양자화(torch.ao.quantization.quantize_dynamic)로 교체 (CPU 전용)
+    - 가중치는 int8로 저장, 활성값은 배치마다 동적으로 스케일 → 보정 데이터 불필요
+    - cache_dir가 있으면 양자화된 가중치(int8 값 + scale)를 저장해 두고, 다음 로드부터는
+      quantize_dynamic 없이 빈 int8 Linear에 캐시 값을 바로 넣음
+    """
+    import torch
+
+    module = _transformer_module(model)
+    qmodel = module.auto_model.to("cpu")
+
+    path = _cache_file(cache_dir, model_name) if cache_dir is not None else None
+    cached = path is not None and path.exists() and _load_cached_int8(qmodel, path)
+    if not cached:
+        qmodel = torch.ao.quantization.quantize_dynamic(qmodel, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        # 캐시가 없거나 모델과 맞지 않았으면 새로 저장
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(path.name + ".tmp")
+                torch.save(_plain_state(qmodel.state_dict()), tmp)
+                tmp.replace(path)
+            except Exception as e:
+                print(f"[QUANT] 캐시 저장 실패: {path} ({e})")
+
+    qmodel.eval()
+    module.auto_model = qmodel
+    return model
+
+
+def load_sentence_embedder(
+    model_name: str,
+    device: Optional[str] = None,
+    quantize: str = "none",
+    cache_dir: Optional[Path] = None,
+) -> SentenceTransformer:
+    """
+    SentenceTransformer 로드 (+ quantize="int8"이면 CPU 동적 양자화)
+    - 양자화 커널은 CPU 전용 → int8이면 device를 cpu로 고정
+    """
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"지원하지 않는 양자화 모드: {quantize} ({' | '.join(QUANTIZE_MODES)})")
+    if quantize == "none":
+        return SentenceTransformer(model_name, device=device)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    return quantize_int8(model, model_name, cache_dir)
+
+
+def module_size_mb(model: SentenceTransformer) -> float:
+    """가중치 텐서 크기 합 (양자화 Linear는 int8 가중치 기준)"""
+    state = _plain_state(model.state_dict())
+    return sum(v.numel() * v.element_size() for v in state.values()) / (1024 * 1024)
+
+
+def _encode_timed(model: SentenceTransformer, texts: List[str], batch_size: int) -> tuple[np.ndarray, float]:
+    model.encode(texts[:batch_size], batch_size=batch_size, show_progress_bar=False)  # 첫 호출 비용 제외
+    t0 = time.perf_counter()
+    emb = model.encode(
+        texts, batch_size=batch_size, normalize_embeddings=True,
+        convert_to_numpy=True, show_progress_bar=False,
+    )
+    return np.asarray(emb, dtype=np.float32), time.perf_counter() - t0
+
+
+def _query_latency_ms(model: SentenceTransformer, queries: List[str]) -> np.ndarray:
+    lat = np.empty(len(queries), dtype=np.float64)
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        model.encode([q], show_progress_bar=False)
+        lat[i] = (time.perf_counter() - t0) * 1000.0
+    return lat
+
+
+def _topk(q: np.ndarray, d: np.ndarray, k: int) -> np.ndarray:
+    scores = q @ d.T
+    k = min(k, d.shape[0])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def quantization_report(
+    model_name: str,
+    docs: List[str],
+    queries: List[str],
+    cache_dir: Optional[Path] = None,
+    top_k: int = 10,
+    batch_size: int = 32,
+) -> Dict[str, Any]:
+    """
+    fp32 vs int8 비교 (CPU)
+    - cosine: 같은 텍스트의 fp32 / int8 임베딩 cosine (평균 / 최소)
+    - recall@k: fp32 질의·문서 검색 결과 대비 int8 질의·문서 검색 결과 겹침
+    - docs_per_s: 배치 인코딩 처리량, query_p50_ms: 질의 1개 인코딩 지연
+    - size_mb: 모델 가중치 크기
+    """
+    fp32 = load_sentence_embedder(model_name, device="cpu")
+    int8 = load_sentence_embedder(model_name, quantize="int8", cache_dir=cache_dir)
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    embs: Dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for name, model in (("fp32", fp32), ("int8", int8)):
+        d_emb, d_sec = _encode_timed(model, docs, batch_size)
+        q_emb, _ = _encode_timed(model, queries, batch_size)
+        lat = _query_latency_ms(model, queries[:100])
+        embs[name] = (d_emb, q_emb)
+        rows[name] = {
+            "docs_per_s": len(docs) / max(d_sec, 1e-9),
+            "query_p50_ms": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+            "size_mb": module_size_mb(model),
+        }
+
+    d32, q32 = embs["fp32"]
+    d8, q8 = embs["int8"]
+    cos = np.sum(d32 * d8, axis=1)
+    truth = _topk(q32, d32, top_k)
+    got = _topk(q8, d8, top_k)
+    recall = float(np.mean([len(set(g) & set(t)) / len(t) for g, t in zip(got.tolist(), truth.tolist())]))
+
+    return {
+        "model": model_name,
+        "docs": len(docs),
+        "queries": len(queries),
+        "cosine_mean": float(cos.mean()),
+        "cosine_min": float(cos.min()),
+        f"recall@{top_k}": recall,
+        "fp32": rows["fp32"],
+        "int8": rows["int8"],
+        "speedup_batch": rows["int8"]["docs_per_s"] / max(rows["fp32"]["docs_per_s"], 1e-9),
+        "speedup_query": rows["fp32"]["query_p50_ms"] / max(rows["int8"]["query_p50_ms"], 1e-9),
+    }
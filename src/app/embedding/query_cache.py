@@ -0,0 +1,150 @@
+# src/app/embedding/query_cache.py
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 정규화: NFC + 공백 정리 (토크나이즈 결과가 바뀌지 않는 범위만)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class QueryEmbeddingCache:
+    """
+    질의 임베딩 LRU (프로세스 전역, thread-safe)
+    key = (모델명, normalize 여부, 정규화된 질의)
+    → memory_read_node 와 rag_search (final_project는 MemoryStore / RAGVectorStore) 가 같은 질문을 각각 인코딩하지 않도록 공유
+    """
+
+    def __init__(self, max_items: int = 4096) -> None:
+        self.max_items = int(max_items)
+        self._items: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._items.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: Hashable, vec: np.ndarray) -> None:
+        if self.max_items <= 0:
+            return
+        vec = np.array(vec, dtype=np.float32)
+        vec.setflags(write=False)  # 공유 객체라 호출 측에서 수정 못 하게
+        with self._lock:
+            self._items[key] = vec
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache(max_items: int = 4096) -> QueryEmbeddingCache:
+    """
+    프로세스 전역 질의 임베딩 LRU
+    설정은 호출 측이 넘김 (src/app은 settings, final_project는 환경변수) → 크기가 바뀌면 그 값으로 맞춤
+    """
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryEmbeddingCache(max_items=max_items)
+        elif _query_cache.max_items != int(max_items):
+            _query_cache.max_items = int(max_items)
+        return _query_cache
+
+
+def encode_queries(
+    embedder: Any,
+    model_name: str,
+    texts: List[str],
+    normalize: bool = False,
+    cache_size: int = 4096,
+    enabled: bool = True,
+) -> np.ndarray:
+    """
+    embedder.encode(texts) 결과(float32 행렬)를 반환하되, 캐시에 없는 질의만 인코딩
+    (같은 배치 안 중복 질의도 한 번만 인코딩)
+    cache_size / enabled: 전역 LRU 크기 / 사용 여부 (enabled=False 또는 cache_size<=0이면 매번 인코딩)
+    """
+    cache = get_query_cache(cache_size) if enabled and cache_size > 0 else None
+    keys: List[Tuple[str, bool, str]] = [(model_name, normalize, normalize_query(t)) for t in texts]
+
+    found: Dict[Tuple[str, bool, str], np.ndarray] = {}
+    todo: Dict[Tuple[str, bool, str], str] = {}
+    for key, text in zip(keys, texts):
+        if key in found or key in todo:
+            continue
+        vec = cache.get(key) if cache is not None else None
+        if vec is None:
+            todo[key] = text
+        else:
+            found[key] = vec
+
+    if todo:
+        vecs = np.asarray(
+            embedder.encode(
+                list(todo.values()),
+                normalize_embeddings=normalize,
+                show_progress_bar=False,
+            ),
+            dtype=np.float32,
+        )
+        for key, vec in zip(todo.keys(), vecs):
+            if cache is not None:
+                cache.put(key, vec)
+            found[key] = vec
+
+    if not keys:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([found[k] for k in keys])
+
+
+def encode_query(
+    embedder: Any,
+    model_name: str,
+    text: str,
+    normalize: bool = False,
+    cache_size: int = 4096,
+    enabled: bool = True,
+) -> np.ndarray:
+    return encode_queries(
+        embedder, model_name, [text], normalize=normalize, cache_size=cache_size, enabled=enabled
+    )[0]
+
+
+def query_cache_stats() -> Dict[str, Any]:
+    with _query_cache_lock:
+        cache = _query_cache
+    if cache is None:
+        return {"size": 0, "max_items": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+    return cache.stats()
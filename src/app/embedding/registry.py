@@ -0,0 +1,172 @@
+# src/app/embedding/registry.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sentence_transformers import SentenceTransformer
+
+from src.app.embedding.quantize import load_sentence_embedder, module_size_mb
+
+EmbedderKey = Tuple[str, str, str]  # (model_name, device, quantize)
+
+
+def _rss_mb() -> Optional[float]:
+    # Linux 전용 (/proc), 그 외 환경에서는 None
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class _Entry:
+    model: SentenceTransformer
+    load_s: float
+    weights_mb: float
+    rss_delta_mb: Optional[float]
+    loaded_at: float
+    users: Set[str] = field(default_factory=set)
+
+
+class EmbedderRegistry:
+    """
+    프로세스 전역 임베더 레지스트리
+    - (모델명, device, 양자화) 당 SentenceTransformer 1개만 로드 → RAG / 메모리가 같은 가중치를 공유
+    - 같은 키를 여러 스레드가 동시에 요청해도 로드는 한 번 (키별 lock)
+    - 모델별 로드 시간 / 가중치 크기 / 로드 전후 RSS 증가량 기록
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[EmbedderKey, _Entry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[EmbedderKey, threading.Lock] = {}
+
+    @staticmethod
+    def make_key(model_name: str, device: Optional[str] = None, quantize: str = "none") -> EmbedderKey:
+        quantize = (quantize or "none").lower()
+        # int8 동적 양자화는 CPU 전용 → device를 cpu로 맞춰야 같은 키로 묶임
+        device = "cpu" if quantize != "none" else (device or "cpu")
+        return (model_name, device, quantize)
+
+    def get(
+        self,
+        model_name: str,
+        device: Optional[str] = None,
+        quantize: str = "none",
+        cache_dir: Optional[Path] = None,
+        user: Optional[str] = None,
+    ) -> SentenceTransformer:
+        key = self.make_key(model_name, device, quantize)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if entry is None:
+            with key_lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._load(key, cache_dir)
+                    with self._lock:
+                        self._entries[key] = entry
+        if user:
+            entry.users.add(user)
+        return entry.model
+
+    def _load(self, key: EmbedderKey, cache_dir: Optional[Path]) -> _Entry:
+        model_name, device, quantize = key
+        rss0 = _rss_mb()
+        t0 = time.perf_counter()
+        model = load_sentence_embedder(model_name, device=device, quantize=quantize, cache_dir=cache_dir)
+        load_s = time.perf_counter() - t0
+        rss1 = _rss_mb()
+        entry = _Entry(
+            model=model,
+            load_s=load_s,
+            weights_mb=module_size_mb(model),
+            rss_delta_mb=(rss1 - rss0) if rss0 is not None and rss1 is not None else None,
+            loaded_at=time.time(),
+        )
+        print(f"[EMBED] loaded {model_name} device={device} quantize={quantize} "
+              f"in {load_s:.2f}s ({entry.weights_mb:.0f} MB weights)")
+        return entry
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._entries.items())
+        return [
+            {
+                "model": name,
+                "device": device,
+                "quantize": quantize,
+                "load_s": round(e.load_s, 3),
+                "weights_mb": round(e.weights_mb, 1),
+                "rss_delta_mb": round(e.rss_delta_mb, 1) if e.rss_delta_mb is not None else None,
+                "users": sorted(e.users),
+            }
+            for (name, device, quantize), e in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+
+# ---------- process-wide singleton ----------
+_registry: Optional[EmbedderRegistry] = None
+
+
+def get_embedder_registry() -> EmbedderRegistry:
+    global _registry
+    if _registry is None:
+        _registry = EmbedderRegistry()
+    return _registry
+
+
+def embedder_stats() -> List[Dict[str, Any]]:
+    return get_embedder_registry().stats()
+
+
+def get_shared_embedder(
+    model_name: str,
+    device: Optional[str] = None,
+    quantize: str = "none",
+    cache_dir: Optional[Path] = None,
+    user: Optional[str] = None,
+    batching: bool = False,
+    max_wait_ms: float = 2.0,
+    max_batch: int = 32,
+    workers: int = 0,
+    threads_per_worker: int = 1,
+) -> Any:
+    """
+    레지스트리 모델 (+ batching=True면 모델당 1개인 MicroBatcher 프록시, encode 호환)
+    - workers > 0: 모델을 이 프로세스에 올리지 않고 로컬 임베딩 worker 프로세스 풀 클라이언트를 사용
+    """
+    if workers > 0:
+        from src.app.embedding.worker_pool import get_worker_pool
+
+        model = get_worker_pool(
+            model_name,
+            device=device,
+            quantize=quantize,
+            cache_dir=cache_dir,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+        )
+    else:
+        model = get_embedder_registry().get(
+            model_name, device=device, quantize=quantize, cache_dir=cache_dir, user=user,
+        )
+    if not batching:
+        return model
+    from src.app.embedding.batcher import get_batcher
+
+    return get_batcher(model, max_wait_ms=max_wait_ms, max_batch=max_batch)
@@ -0,0 +1,417 @@
+# src/app/embedding/worker_pool.py
+from __future__ import annotations
+
+import atexit
+import itertools
+import multiprocessing as mp
+import pickle
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_conns
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 큰 입력(색인)은 이 크기로 잘라 여러 worker에 나눠 보냄
+_SPLIT_ITEMS = 64
+# worker가 처리 중에 죽은 요청은 다른 worker에 한 번 더 보냄 (같은 입력으로 또 죽으면 에러)
+_MAX_ATTEMPTS = 2
+
+
+def _worker_main(
+    model_name: str,
+    device: Optional[str],
+    quantize: str,
+    cache_dir: Optional[str],
+    threads: int,
+    loader: Optional[Callable[..., Any]],
+    conn: Any,
+) -> None:
+    """
+    임베딩 worker 프로세스
+    - 모델은 시작할 때 1번만 로드 (loader: 테스트용 대체 로더, 기본은 load_sentence_embedder)
+    - 부모와는 전용 Pipe 1개로만 통신 (send는 바로 써지고 다른 worker와 잠금을 공유하지 않음)
+    - 결과 벡터는 부모가 만든 shared memory 블록에 바로 씀 (pickle 리스트 전송 없음)
+    """
+    import torch
+
+    if loader is None:
+        from src.app.embedding.quantize import load_sentence_embedder as loader
+
+    torch.set_num_threads(max(1, threads))
+    model = loader(
+        model_name,
+        device=device,
+        quantize=quantize,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+    )
+    dim = int(model.get_sentence_embedding_dimension())
+    info = {
+        "dim": dim,
+        "max_seq_length": int(getattr(model, "max_seq_length", 0) or 128),
+        # 부모 프로세스의 토큰 청커용 (fast tokenizer는 가볍고 pickle 가능)
+        # 어느 worker의 ready가 먼저 와도 되도록 모든 worker가 보냄
+        "tokenizer": pickle.dumps(model.tokenizer),
+    }
+    conn.send(("ready", info))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        task_id, texts, normalize, shm_name = task
+        try:
+            emb = model.encode(
+                texts,
+                batch_size=max(1, len(texts)),
+                normalize_embeddings=normalize,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                out = np.ndarray((len(texts), dim), dtype=np.float32, buffer=shm.buf)
+                out[:] = emb
+                del out
+            finally:
+                shm.close()
+            conn.send(("done", task_id))
+        except Exception as e:
+            conn.send(("error", (task_id, repr(e))))
+
+
+@dataclass
+class _Task:
+    fut: Future
+    shm: shared_memory.SharedMemory
+    texts: List[str]
+    normalize: bool
+    attempts: int = 1
+
+
+class EmbeddingWorkerPool:
+    """
+    로컬 임베딩 worker 프로세스 풀 클라이언트 (SentenceTransformer.encode 호환)
+
+    - 토크나이즈 / forward가 서버 프로세스의 GIL과 이벤트 루프를 점유하지 않음
+    - 요청마다 (n, dim) float32 shared memory 블록을 만들고 worker가 그 자리에 결과를 씀
+    - 큰 입력은 _SPLIT_ITEMS 단위로 나눠 여러 worker가 병렬 처리
+    - 부모가 쉬고 있는 worker에 요청을 1개씩 직접 보냄 → 어느 worker가 무엇을 처리 중인지 항상 앎
+      (공유 Queue는 worker가 잠금을 잡은 채 죽으면 풀 전체가 멈출 수 있어서 worker별 Pipe 사용)
+    - worker가 죽으면 다시 띄우고, 그 worker가 잡고 있던 요청은 한 번 더 보냄 (_MAX_ATTEMPTS)
+    - encode는 task_timeout_s 안에 결과가 없으면 TimeoutError (worker가 멈춘 경우 등)
+    - MicroBatcher로 감싸면 동시 질의를 모아서 보냄 (get_shared_embedder)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: Optional[str] = None,
+        quantize: str = "none",
+        cache_dir: Optional[Path] = None,
+        workers: int = 2,
+        threads_per_worker: int = 1,
+        start_timeout_s: float = 300.0,
+        task_timeout_s: float = 120.0,
+        loader: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        self.model_name = model_name
+        self._args = (
+            model_name, device, quantize, str(cache_dir) if cache_dir else None, int(threads_per_worker), loader,
+        )
+        self.n_workers = max(1, int(workers))
+        self.task_timeout_s = float(task_timeout_s)
+
+        # fork는 torch 스레드 / 부모의 잠금 상태를 복사하므로 spawn 사용
+        self._ctx = mp.get_context("spawn")
+        self._procs: Dict[int, Any] = {}  # slot -> process
+        self._conns: Dict[int, Any] = {}  # slot -> 부모 쪽 Pipe 끝
+
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, _Task] = {}
+        self._queue: Deque[int] = deque()   # 아직 보내지 않은 task id
+        self._idle: Set[int] = set()        # 요청을 받을 수 있는 slot
+        self._busy: Dict[int, int] = {}     # slot -> 처리 중인 task id
+        self._ready = threading.Event()
+        self._closed = False
+        self.info: Dict[str, Any] = {}
+        self._tokenizer: Any = None
+
+        self.tasks = 0
+        self.items = 0
+        self.restarts = 0
+        self.retried = 0
+        self.timeouts = 0
+
+        for slot in range(self.n_workers):
+            self._spawn(slot)
+        self._listener = threading.Thread(target=self._listen, name="embed-pool-results", daemon=True)
+        self._listener.start()
+        atexit.register(self.close)
+
+        if not self._ready.wait(start_timeout_s):
+            self.close()
+            raise RuntimeError(f"임베딩 worker 시작 시간 초과 ({start_timeout_s:.0f}s)")
+
+    # ---------- 프로세스 관리 ----------
+    def _spawn(self, slot: int) -> None:
+        parent, child = self._ctx.Pipe()
+        p = self._ctx.Process(
+            target=_worker_main,
+            args=(*self._args, child),
+            name=f"embed-worker-{slot}",
+            daemon=True,
+        )
+        p.start()
+        # 부모 쪽 child 끝을 닫아야 worker가 죽었을 때 parent.recv()가 EOFError
+        child.close()
+        self._procs[slot] = p
+        self._conns[slot] = parent
+
+    def _restart(self, slot: int) -> None:
+        """죽은 worker 정리 → 잡고 있던 요청 재시도 → 같은 slot에 새 worker"""
+        p = self._procs[slot]
+        p.join(timeout=1)
+        print(f"[EMBED] worker {slot} 종료됨 (exitcode={p.exitcode}) → 재시작")
+        with self._lock:
+            self._idle.discard(slot)
+            lost = self._busy.pop(slot, None)
+            conn = self._conns.pop(slot)
+        conn.close()
+        if lost is not None:
+            self._retry(lost, slot)
+        self.restarts += 1
+        with self._lock:
+            self._spawn(slot)
+
+    def _retry(self, task_id: int, slot: int) -> None:
+        """죽은 worker가 잡고 있던 요청 → 아직 시도 횟수가 남았으면 다시 큐 맨 앞에, 아니면 에러"""
+        with self._lock:
+            task = self._pending.get(task_id)
+            if task is None:
+                return
+            task.attempts += 1
+            again = task.attempts <= _MAX_ATTEMPTS
+            if again:
+                self.retried += 1
+                self._queue.appendleft(task_id)
+        if again:
+            self._dispatch()
+        else:
+            self._finish(task_id, RuntimeError(f"임베딩 worker {slot}가 처리 중에 종료됨 (재시도 후에도 실패)"))
+
+    def _dispatch(self) -> None:
+        """쉬는 worker에 대기 중인 요청을 1개씩 보냄"""
+        with self._lock:
+            while self._queue and self._idle and not self._closed:
+                task_id = self._queue.popleft()
+                task = self._pending.get(task_id)
+                if task is None:  # timeout 등으로 이미 끝난 요청
+                    continue
+                slot = self._idle.pop()
+                try:
+                    self._conns[slot].send((task_id, task.texts, task.normalize, task.shm.name))
+                except (OSError, ValueError):
+                    # 보내는 사이에 죽은 worker → 요청은 되돌리고, slot은 listener가 재시작
+                    self._queue.appendleft(task_id)
+                    continue
+                self._busy[slot] = task_id
+
+    def _listen(self) -> None:
+        while not self._closed:
+            by_conn = {conn: slot for slot, conn in self._conns.items()}
+            try:
+                ready = wait_conns(list(by_conn), timeout=1.0)
+            except (OSError, ValueError):
+                continue
+            for conn in ready:
+                slot = by_conn[conn]
+                try:
+                    kind, payload = conn.recv()
+                except (EOFError, OSError):
+                    if not self._closed:
+                        self._restart(slot)
+                    continue
+                self._handle(slot, kind, payload)
+            self._dispatch()
+
+    def _handle(self, slot: int, kind: str, payload: Any) -> None:
+        if kind == "ready":
+            if not self.info:
+                self.info = payload
+            with self._lock:
+                self._idle.add(slot)
+            self._ready.set()
+            return
+        with self._lock:
+            self._busy.pop(slot, None)
+            self._idle.add(slot)
+        if kind == "done":
+            self._finish(payload, None)
+        elif kind == "error":
+            tid, msg = payload
+            self._finish(tid, RuntimeError(f"임베딩 worker 오류: {msg}"))
+
+    def _finish(self, task_id: int, error: Optional[BaseException]) -> None:
+        with self._lock:
+            item = self._pending.pop(task_id, None)
+        if item is None:
+            return
+        try:
+            if error is None:
+                dim = int(self.info["dim"])
+                # 블록은 곧 해제하므로 복사본을 돌려줌
+                item.fut.set_result(
+                    np.ndarray((len(item.texts), dim), dtype=np.float32, buffer=item.shm.buf).copy()
+                )
+            else:
+                item.fut.set_exception(error)
+        finally:
+            item.shm.close()
+            item.shm.unlink()
+
+    # ---------- encode ----------
+    def submit(self, texts: List[str], normalize: bool = False) -> Future:
+        return self._submit(texts, normalize)[1]
+
+    def _submit(self, texts: List[str], normalize: bool) -> Tuple[int, Future]:
+        if self._closed:
+            raise RuntimeError("임베딩 worker 풀이 닫혔습니다")
+        texts = list(texts)
+        dim = int(self.info["dim"])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(texts) * dim * 4))
+        task = _Task(fut=Future(), shm=shm, texts=texts, normalize=bool(normalize))
+        task_id = next(self._ids)
+        with self._lock:
+            self._pending[task_id] = task
+            self._queue.append(task_id)
+            self.tasks += 1
+            self.items += len(texts)
+        self._dispatch()
+        return task_id, task.fut
+
+    def encode(self, sentences: Any, **kwargs: Any) -> np.ndarray:
+        """
+        SentenceTransformer.encode 호환 (numpy float32만 반환)
+        normalize_embeddings 외의 인자(batch_size, show_progress_bar 등)는 worker 쪽 기본값 사용
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        dim = int(self.info["dim"])
+        if not texts:
+            return np.zeros((0, dim), dtype=np.float32)
+
+        normalize = bool(kwargs.get("normalize_embeddings", False))
+        subs = [self._submit(texts[s:s + _SPLIT_ITEMS], normalize) for s in range(0, len(texts), _SPLIT_ITEMS)]
+        deadline = time.monotonic() + self.task_timeout_s
+        try:
+            parts = [f.result(timeout=max(0.0, deadline - time.monotonic())) for _, f in subs]
+        except FutureTimeout:
+            self.timeouts += 1
+            err = TimeoutError(f"임베딩 worker 응답 없음 ({self.task_timeout_s:.0f}s)")
+            tids = {tid for tid, _ in subs}
+            for tid in tids:
+                self._finish(tid, err)
+            # 아직 그 요청을 붙잡고 있는 worker는 멈춘 것으로 보고 종료 → listener가 새로 띄움
+            with self._lock:
+                stuck = [slot for slot, tid in self._busy.items() if tid in tids]
+            for slot in stuck:
+                self._procs[slot].terminate()
+            raise err from None
+        out = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return out[0] if single else out
+
+    # ---------- SentenceTransformer 호환 속성 ----------
+    @property
+    def tokenizer(self) -> Any:
+        if self._tokenizer is None:
+            self._tokenizer = pickle.loads(self.info["tokenizer"])
+        return self._tokenizer
+
+    @property
+    def max_seq_length(self) -> int:
+        return int(self.info.get("max_seq_length", 128))
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.info["dim"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+            busy = len(self._busy)
+        return {
+            "model": self.model_name,
+            "workers": self.n_workers,
+            "alive": sum(p.is_alive() for p in self._procs.values()),
+            "busy": busy,
+            "tasks": self.tasks,
+            "items": self.items,
+            "pending": pending,
+            "restarts": self.restarts,
+            "retried": self.retried,
+            "timeouts": self.timeouts,
+        }
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for conn in list(self._conns.values()):
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for p in self._procs.values():
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for conn in self._conns.values():
+            conn.close()
+        with self._lock:
+            tids = list(self._pending)
+        for tid in tids:
+            self._finish(tid, RuntimeError("임베딩 worker 풀이 닫혔습니다"))
+
+
+# ---------- one pool per (model, device, quantize) ----------
+_pools: Dict[Tuple[str, Optional[str], str], EmbeddingWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(
+    model_name: str,
+    device: Optional[str] = None,
+    quantize: str = "none",
+    cache_dir: Optional[Path] = None,
+    workers: int = 2,
+    threads_per_worker: int = 1,
+) -> EmbeddingWorkerPool:
+    key = (model_name, device, quantize)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = EmbeddingWorkerPool(
+                model_name,
+                device=device,
+                quantize=quantize,
+                cache_dir=cache_dir,
+                workers=workers,
+                threads_per_worker=threads_per_worker,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def worker_pool_stats() -> List[Dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [p.stats() for p in pools]
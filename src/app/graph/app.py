@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from typing import Any, List
+
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 
 from src.app.graph.state import AgentState
 from src.app.graph.nodes import (
+    allm_node,
+    amemory_read_node,
+    areflection_node,
+    atool_node,
     llm_node,
     tool_node,
     memory_read_node,
@@ -18,13 +24,37 @@ def route_after_llm(state: AgentState):
     return "tool" if state.get("tool_calls") else "reflection"
 
 
-def build_app(enable_interrupt: bool = False):
+def final_answer(messages: List[Any]) -> str:
+    """
+    그래프 결과 messages에서 마지막 assistant 답변
+    - reflection이 system 메시지를 덧붙일 수 있으므로 마지막 메시지가 아니라 마지막 assistant를 찾는다
+    """
+    for m in reversed(messages or []):
+        role = m.get("role") if isinstance(m, dict) else getattr(m, "type", "")
+        if role in ("assistant", "ai"):
+            content = m.get("content", "") if isinstance(m, dict) else getattr(m, "content", "")
+            if content:
+                return content if isinstance(content, str) else str(content)
+    return ""
+
+
+def build_app(enable_interrupt: bool = False, use_async: bool = False):
+    """
+    use_async=True: 비동기 노드로 구성 → ainvoke / astream 전용
+      (LLM은 AsyncOpenAI, 블로킹 작업은 graph/blocking.py의 제한된 스레드 풀)
+    """
     g = StateGraph(AgentState)
 
-    g.add_node("memory_read", memory_read_node)
-    g.add_node("llm", llm_node)
-    g.add_node("tool", tool_node)
-    g.add_node("reflection", reflection_node)
+    if use_async:
+        g.add_node("memory_read", amemory_read_node)
+        g.add_node("llm", allm_node)
+        g.add_node("tool", atool_node)
+        g.add_node("reflection", areflection_node)
+    else:
+        g.add_node("memory_read", memory_read_node)
+        g.add_node("llm", llm_node)
+        g.add_node("tool", tool_node)
+        g.add_node("reflection", reflection_node)
 
     g.add_edge(START, "memory_read")
     g.add_edge("memory_read", "llm")
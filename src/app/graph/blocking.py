@@ -0,0 +1,65 @@
+# src/app/graph/blocking.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from src.app.config.settings import settings
+
+T = TypeVar("T")
+
+# 비동기 노드에서 블로킹 라이브러리(임베딩, Chroma, requests, LangChain 동기 호출 등)를 돌리는 전용 풀
+# - asyncio 기본 executor와 분리해서 크기를 settings.blocking_workers로 제한
+# - 풀이 꽉 차면 작업은 큐에서 기다리고, 이벤트 루프는 계속 다른 대화를 처리
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "running": 0, "max_running": 0}
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.blocking_workers),
+                thread_name_prefix="graph-blocking",
+            )
+        return _executor
+
+
+def _tracked(fn: Callable[[], T]) -> T:
+    with _stats_lock:
+        _stats["running"] += 1
+        _stats["max_running"] = max(_stats["max_running"], _stats["running"])
+    try:
+        return fn()
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    fn(*args, **kwargs)를 제한된 스레드 풀에서 실행하고 결과를 await
+    - contextvars를 복사해서 넘김 → LangGraph config / stream writer가 스레드 안에서도 보임
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    with _stats_lock:
+        _stats["submitted"] += 1
+    return await loop.run_in_executor(get_blocking_executor(), _tracked, call)
+
+
+def blocking_stats() -> Dict[str, Any]:
+    ex = _executor
+    with _stats_lock:
+        out = dict(_stats)
+    out["max_workers"] = max(1, settings.blocking_workers)
+    out["queued"] = ex._work_queue.qsize() if ex is not None else 0
+    return out
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from typing import Any, Dict, List, Optional
 
-from src.app.llm.client import chat_raw
+from langchain_core.runnables import RunnableConfig
+
+from src.app.config.settings import settings
+from src.app.graph.blocking import run_blocking
+from src.app.llm.client import achat_raw, achat_raw_stream, chat_raw, chat_raw_stream
 from src.app.tools.__base__ import registry
 
 # ⚠️ 중요: @tool 데코레이터가 import 시점에 registry 등록을 수행하므로 반드시 import
@@ -164,11 +169,65 @@ def _to_message_dict(resp: Any) -> Dict[str, Any]:
     return {"role": "assistant", "content": str(resp)}
 
 
+def _stream_writer() -> Any:
+    """LangGraph custom stream writer (그래프 밖에서 직접 호출하면 None)"""
+    try:
+        from langgraph.config import get_stream_writer
+
+        return get_stream_writer()
+    except Exception:
+        return None
+
+
+def _chat_streaming(
+    messages: List[Dict[str, Any]],
+    tools: List[Dict[str, Any]],
+    step: int,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    chat_raw_stream으로 호출하면서 content 조각을 custom 채널로 내보냄
+    - APP.stream(..., stream_mode="custom")에서 {"type": "token", "node": "llm", "step": n, "text": ...}
+    - invoke / updates 모드에서는 writer가 조각을 버리므로 결과만 동일하게 돌아옴
+    """
+    writer = _stream_writer()
+    msg: Dict[str, Any] = {"role": "assistant", "content": None}
+    for ev in chat_raw_stream(messages=messages, tools=tools, tool_choice="auto", deadline=deadline):
+        if ev["type"] == "token":
+            if writer is not None:
+                writer({"type": "token", "node": "llm", "step": step, "text": ev["text"]})
+        elif ev["type"] == "message":
+            msg = ev["message"]
+            if writer is not None:
+                writer({"type": "llm_done", "node": "llm", "step": step, "ttft_s": ev["ttft_s"], "total_s": ev["total_s"]})
+    return msg
+
+
+async def _achat_streaming(
+    messages: List[Dict[str, Any]],
+    tools: List[Dict[str, Any]],
+    step: int,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """_chat_streaming의 비동기 버전 (achat_raw_stream)"""
+    writer = _stream_writer()
+    msg: Dict[str, Any] = {"role": "assistant", "content": None}
+    async for ev in achat_raw_stream(messages=messages, tools=tools, tool_choice="auto", deadline=deadline):
+        if ev["type"] == "token":
+            if writer is not None:
+                writer({"type": "token", "node": "llm", "step": step, "text": ev["text"]})
+        elif ev["type"] == "message":
+            msg = ev["message"]
+            if writer is not None:
+                writer({"type": "llm_done", "node": "llm", "step": step, "ttft_s": ev["ttft_s"], "total_s": ev["total_s"]})
+    return msg
+
+
 # =====================================================
 # LangGraph Nodes
 # =====================================================
 
-def llm_node(state: Dict[str, Any]) -> Dict[str, Any]:
+def _llm_messages(state: Dict[str, Any]) -> List[Dict[str, Any]]:
     # ===============================
     # 1️⃣ messages 정규화
     # ===============================
@@ -205,18 +264,10 @@ def llm_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # ===============================
     # 2️⃣ OpenAI 메시지 sanitize
     # ===============================
-    messages = _sanitize_openai_messages(messages)
+    return _sanitize_openai_messages(messages)
 
-    # ===============================
-    # 3️⃣ LLM 호출
-    # ===============================
-    resp = chat_raw(
-        messages=messages,
-        tools=registry.list_openai_tools(),
-        tool_choice="auto",
-    )
-    msg = _to_message_dict(resp)
 
+def _llm_update(state: Dict[str, Any], msg: Dict[str, Any]) -> Dict[str, Any]:
     # ===============================
     # 4️⃣ tool_calls 처리 (기존 로직 유지)
     # ===============================
@@ -238,6 +289,87 @@ def llm_node(state: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def _turn_deadline(config: Optional[RunnableConfig]) -> Optional[float]:
+    """
+    이번 호출의 LLM 마감 시각 = config["configurable"]["deadline"] (resilience.turn_deadline())
+    state에 두면 checkpointer가 저장해서, deadline을 안 넘긴 다음 invoke가 지난 마감 시각을 다시 씀
+    """
+    return ((config or {}).get("configurable") or {}).get("deadline")
+
+
+def llm_node(state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    messages = _llm_messages(state)
+
+    # ===============================
+    # 3️⃣ LLM 호출
+    # ===============================
+    # 턴 예산: 이번 invoke config의 deadline (없으면 요청별 timeout만)
+    deadline = _turn_deadline(config)
+    if settings.openai_stream:
+        msg = _chat_streaming(messages, registry.list_openai_tools(), int(state.get("steps", 0)) + 1, deadline)
+    else:
+        resp = chat_raw(
+            messages=messages,
+            tools=registry.list_openai_tools(),
+            tool_choice="auto",
+            deadline=deadline,
+        )
+        msg = _to_message_dict(resp)
+    return _llm_update(state, msg)
+
+
+async def allm_node(state: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """llm_node의 비동기 버전 (AsyncOpenAI, 응답을 기다리는 동안 스레드를 잡지 않음)"""
+    messages = _llm_messages(state)
+    deadline = _turn_deadline(config)
+    if settings.openai_stream:
+        msg = await _achat_streaming(messages, registry.list_openai_tools(), int(state.get("steps", 0)) + 1, deadline)
+    else:
+        resp = await achat_raw(
+            messages=messages,
+            tools=registry.list_openai_tools(),
+            tool_choice="auto",
+            deadline=deadline,
+        )
+        msg = _to_message_dict(resp)
+    return _llm_update(state, msg)
+
+
+def _batch_rag_search(tool_calls: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    한 step에 rag_search 호출이 여러 개면 한 번에 배치 검색 → {tool_call_id: content}
+    (인자 파싱 실패 / 검색 실패 시 빈 dict → 기존처럼 호출별로 실행)
+    """
+    calls = [tc for tc in tool_calls if tc["function"]["name"] == rag_tools.RAG_TOOL_NAME]
+    if len(calls) < 2:
+        return {}
+
+    try:
+        items = [
+            rag_tools.RagQueryInput(**json.loads(tc["function"]["arguments"] or "{}"))
+            for tc in calls
+        ]
+        contents = rag_tools.rag_search_many(items)
+    except Exception:
+        return {}
+    return {tc["id"]: c for tc, c in zip(calls, contents)}
+
+
+def _invoke_tool(name: str, args: str) -> str:
+    try:
+        result = registry.invoke(name, args)
+        return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+    except Exception as e:
+        return f"[tool_error] {e}"
+
+
+def _tool_message(tc: Dict[str, Any], content: str) -> Dict[str, Any]:
+    return {
+        "role": "tool",
+        "tool_call_id": tc["id"],
+        "name": tc["function"]["name"],
+        "content": content,
+    }
 
 
 def tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -248,28 +380,47 @@ def tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     tool_calls = [_normalize_one_tool_call(tc) for tc in tool_calls_any]
     tool_messages: List[Dict[str, Any]] = []
 
+    batched = _batch_rag_search(tool_calls)
+
     for tc in tool_calls:
         fn = tc["function"]
-        name = fn["name"]
-        args = fn["arguments"]
         tcid = tc["id"]
 
-        try:
-            result = registry.invoke(name, args)
-            content = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
-        except Exception as e:
-            content = f"[tool_error] {e}"
+        if tcid in batched:
+            content = batched[tcid]
+        else:
+            content = _invoke_tool(fn["name"], fn["arguments"])
 
-        tool_messages.append({
-            "role": "tool",
-            "tool_call_id": tcid,
-            "name": name,
-            "content": content,
-        })
+        tool_messages.append(_tool_message(tc, content))
 
     return {"messages": tool_messages, "tool_calls": None}
 
 
+async def atool_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    tool_node의 비동기 버전
+    - tool 구현은 동기(requests / 임베딩 / 벡터 검색)라 blocking 풀에서 실행
+    - 한 step의 tool_calls는 동시에 실행 (결과 순서는 tool_calls 순서 유지)
+    """
+    tool_calls_any = state.get("tool_calls")
+    if not tool_calls_any:
+        return {"tool_calls": None}
+
+    tool_calls = [_normalize_one_tool_call(tc) for tc in tool_calls_any]
+    batched = await run_blocking(_batch_rag_search, tool_calls)
+
+    async def one(tc: Dict[str, Any]) -> str:
+        if tc["id"] in batched:
+            return batched[tc["id"]]
+        return await run_blocking(_invoke_tool, tc["function"]["name"], tc["function"]["arguments"])
+
+    contents = await asyncio.gather(*(one(tc) for tc in tool_calls))
+    return {
+        "messages": [_tool_message(tc, c) for tc, c in zip(tool_calls, contents)],
+        "tool_calls": None,
+    }
+
+
 # =====================================================
 # ✅ 추가된 노드들 (이번 수정의 핵심)
 # =====================================================
@@ -306,34 +457,12 @@ def memory_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def reflection_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    messages = state.get("messages", [])
-    if not messages:
-        return {}
-
-    # reflection 생략 조건
-    if state.get("steps", 0) <= 1:
-        # 🔥 아무 것도 하지 말고 그대로 종료
-        return {
-            "messages": []   # add_messages → 기존 메시지 유지
-        }
-    try:
-        # 지연 import (reflection 안 쓸 땐 비용 0)
-        from src.app.memory.reflection import build_snippet, run_memory_extractor
-        from src.app.memory.store import write_memory
-        from src.app.config.settings import settings
-        from langchain_openai import ChatOpenAI
-    except Exception as e:
-        # 환경 문제로 reflection이 불가능해도 전체 그래프는 계속
-        return {
-            "messages": [{
-                "role": "system",
-                "content": f"[reflection skipped: import error] {e}",
-            }]
-        }
+def _reflection_snippet(messages: List[Any]) -> Optional[str]:
+    """extractor에 넘길 스니펫 (최근 user / assistant 발화가 없으면 None)"""
+    from src.app.memory.reflection import build_snippet
 
     # ✅ 2. messages 정규화 (HumanMessage / dict 혼합 방지)
-    messages = _normalize_messages(state.get("messages", []))
+    messages = _normalize_messages(messages)
 
     # 최근 user / assistant 발화 추출
     user_msg = next(
@@ -346,38 +475,25 @@ def reflection_node(state: Dict[str, Any]) -> Dict[str, Any]:
     )
 
     if not user_msg or not final_answer:
-        return {}
+        return None
 
     # ✅ 3. extractor에 넘길 스니펫 구성
-    snippet = build_snippet(
+    return build_snippet(
         history=messages,
         user_message=user_msg,
         final_answer=final_answer,
     )
 
-    # ✅ 4. Reflection 판단용 LLM (temperature 0 고정)
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0,
-    )
-
-    try:
-        result = run_memory_extractor(llm, snippet)
-    except Exception as e:
-        # reflection 판단 실패 → 조용히 skip
-        return {
-            "messages": [{
-                "role": "system",
-                "content": f"[reflection skipped: extractor error] {e}",
-            }]
-        }
 
+def _write_reflection(result: Dict[str, Any]) -> Dict[str, Any]:
     # ✅ 5. 저장할 가치 없으면 종료
     if not result.get("should_write_memory"):
         return {}
 
-    # ✅ 6. Memory write
+    # ✅ 6. Memory write (임베딩 + 벡터 저장 → 비동기 그래프에서는 blocking 풀에서 호출)
     try:
+        from src.app.memory.store import write_memory
+
         write_memory(
             content=result["content"],
             memory_type=result["memory_type"],
@@ -394,3 +510,79 @@ def reflection_node(state: Dict[str, Any]) -> Dict[str, Any]:
 
     # reflection 자체는 사용자에게 직접 출력할 필요 없음
     return {}
+
+
+def _reflection_skipped(reason: str, e: Exception) -> Dict[str, Any]:
+    return {
+        "messages": [{
+            "role": "system",
+            "content": f"[reflection skipped: {reason}] {e}",
+        }]
+    }
+
+
+def reflection_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    messages = state.get("messages", [])
+    if not messages:
+        return {}
+
+    # reflection 생략 조건
+    if state.get("steps", 0) <= 1:
+        # 🔥 아무 것도 하지 말고 그대로 종료
+        return {
+            "messages": []   # add_messages → 기존 메시지 유지
+        }
+    try:
+        # 지연 import (reflection 안 쓸 땐 비용 0)
+        from src.app.memory.reflection import extract_memory
+        from src.app.config.settings import settings
+    except Exception as e:
+        # 환경 문제로 reflection이 불가능해도 전체 그래프는 계속
+        return _reflection_skipped("import error", e)
+
+    snippet = _reflection_snippet(messages)
+    if snippet is None:
+        return {}
+
+    # ✅ 4. Reflection 판단 (chat_raw, temperature 0 고정 → 응답 캐시 대상)
+    try:
+        result = extract_memory(snippet, model=settings.openai_model)
+    except Exception as e:
+        # reflection 판단 실패 → 조용히 skip
+        return _reflection_skipped("extractor error", e)
+
+    return _write_reflection(result)
+
+
+async def amemory_read_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """memory_read_node의 비동기 버전 (임베딩 + 벡터 검색은 blocking 풀에서)"""
+    if state.get("memory_checked"):
+        return {}
+    return await run_blocking(memory_read_node, state)
+
+
+async def areflection_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """reflection_node의 비동기 버전 (extractor는 achat_raw, 메모리 쓰기(임베딩 + 벡터 저장)만 blocking 풀에서)"""
+    messages = state.get("messages", [])
+    if not messages:
+        return {}
+    if state.get("steps", 0) <= 1:
+        return {"messages": []}
+    try:
+        from src.app.memory.reflection import aextract_memory
+        from src.app.config.settings import settings
+    except Exception as e:
+        return _reflection_skipped("import error", e)
+
+    snippet = _reflection_snippet(messages)
+    if snippet is None:
+        return {}
+
+    try:
+        result = await aextract_memory(snippet, model=settings.openai_model)
+    except Exception as e:
+        return _reflection_skipped("extractor error", e)
+
+    if not result.get("should_write_memory"):
+        return {}
+    return await run_blocking(_write_reflection, result)
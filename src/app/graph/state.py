@@ -12,4 +12,7 @@ class AgentState(TypedDict):
     steps: int
 
     memory_checked: bool
-    rag_checked: bool
\ No newline at end of file
+    rag_checked: bool
+
+    # 이번 턴 LLM 호출 마감 시각은 state가 아니라 invoke config로 넘김
+    # (config["configurable"]["deadline"] = resilience.turn_deadline(), checkpoint에 남지 않음)
\ No newline at end of file
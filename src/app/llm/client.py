@@ -1,11 +1,18 @@
 # src/app/llm/client.py
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import itertools
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletion
 
 from src.app.config.settings import settings  # ← 새로 추가
+from src.app.llm.resilience import acall_with_policy, call_with_policy
+from src.app.llm.response_cache import LLMResponseCache, get_response_cache, request_key
+from src.app.net.http_pool import get_async_http_client, get_http_client
 
 # ---- 기본 설정 ----
 
@@ -22,6 +29,7 @@ You are a helpful AI assistant that can use tools with a ReAct-style loop.
 """
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
 
 
 def get_client() -> OpenAI:
@@ -31,21 +39,35 @@ def get_client() -> OpenAI:
     """
     global _client
     if _client is None:
-        _client = OpenAI(api_key=settings.openai_api_key)
+        # 재시도는 resilience.call_with_policy가 턴 예산 안에서 직접 함 (SDK 기본 재시도와 겹치지 않게 0)
+        # 연결은 net/http_pool의 공용 풀 (검색 tool과 keep-alive 연결 / 한도 공유)
+        _client = OpenAI(api_key=settings.openai_api_key, max_retries=0, http_client=get_http_client(**settings.http_pool_params()))
     return _client
 
 
-def chat_raw(
-    messages: List[Dict[str, Any]],
-    *,
-    model: str = DEFAULT_MODEL,
-    temperature: float = DEFAULT_TEMPERATURE,
-    tools: Optional[List[Dict[str, Any]]] = None,
-    tool_choice: Optional[Any] = "auto",
-    max_tokens: Optional[int] = None,
-) -> Any:
-    client = get_client()
+def get_async_client() -> AsyncOpenAI:
+    """
+    비동기 그래프(ainvoke / astream)용 AsyncOpenAI 클라이언트 (전역 1개)
+    - 요청을 기다리는 동안 스레드를 잡지 않음 → 한 worker가 많은 대화를 동시에 처리
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=0,
+            http_client=get_async_http_client(**settings.http_pool_params()),
+        )
+    return _async_client
 
+
+def _chat_params(
+    messages: List[Dict[str, Any]],
+    model: str,
+    temperature: float,
+    tools: Optional[List[Dict[str, Any]]],
+    tool_choice: Optional[Any],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
     params: Dict[str, Any] = {
         "model": model,
         "messages": messages,
@@ -59,9 +81,369 @@ def chat_raw(
 
     if max_tokens is not None:
         params["max_tokens"] = max_tokens
+    return params
+
+
+# ---------- 응답 캐시 ----------
+def _response_cache(params: Dict[str, Any], cache: Optional[bool]) -> Optional[LLMResponseCache]:
+    """
+    이 요청에 쓸 응답 캐시 (안 쓰면 None)
+    - cache=None: settings.llm_cache가 켜져 있고 temperature 0일 때만 (LLM_CACHE_FORCE면 temperature 무시)
+    - cache=True / False: 호출자가 강제
+    """
+    if cache is None:
+        cache = settings.llm_cache and (params.get("temperature") == 0 or settings.llm_cache_force)
+    return get_response_cache() if cache else None
+
+
+def _completion_payload(key: str, model: str, ev: Dict[str, Any]) -> Dict[str, Any]:
+    """스트리밍으로 조립한 message 이벤트 → 캐시에 넣을 ChatCompletion 모양 dict"""
+    return {
+        "id": f"chatcmpl-cache-{key[:16]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": ev["message"],
+            "finish_reason": ev["finish_reason"] or "stop",
+            "logprobs": None,
+        }],
+        "usage": ev["usage"],
+    }
+
+
+def _cached_events(payload: Dict[str, Any], t0: float) -> List[Dict[str, Any]]:
+    """캐시된 ChatCompletion dict → 스트리밍 이벤트 (content 전체를 token 1개로)"""
+    choice = payload["choices"][0]
+    m = choice["message"]
+    msg: Dict[str, Any] = {"role": "assistant", "content": m.get("content")}
+    if m.get("tool_calls"):
+        msg["tool_calls"] = [
+            {"id": tc["id"], "type": tc.get("type", "function"), "function": dict(tc["function"])}
+            for tc in m["tool_calls"]
+        ]
+    events: List[Dict[str, Any]] = []
+    if msg["content"]:
+        events.append({"type": "token", "text": msg["content"]})
+    elapsed = time.perf_counter() - t0
+    events.append({
+        "type": "message",
+        "message": msg,
+        "finish_reason": choice.get("finish_reason"),
+        "usage": payload.get("usage"),
+        "ttft_s": elapsed,
+        "total_s": elapsed,
+        "cached": True,
+    })
+    return events
+
+
+def chat_raw(
+    messages: List[Dict[str, Any]],
+    *,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Any] = "auto",
+    max_tokens: Optional[int] = None,
+    cache: Optional[bool] = None,
+    deadline: Optional[float] = None,
+) -> Any:
+    """
+    cache: None이면 settings 기준(temperature 0만), True/False면 강제
+    - 캐시 hit / 동시 중복 요청도 ChatCompletion 객체로 돌려줌 (resp.choices[0].message 그대로 사용 가능)
+    deadline: 턴 마감 시각(time.time() 기준, graph state["deadline"]) → 요청 timeout / 재시도 / hedge가 이 안에서만
+    """
+    client = get_client()
+    params = _chat_params(messages, model, temperature, tools, tool_choice, max_tokens)
+
+    def create() -> Any:
+        return call_with_policy(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **params),
+            kind="complete",
+            deadline=deadline,
+        )
+
+    rc = _response_cache(params, cache)
+    if rc is None:
+        return create()
+
+    payload = rc.call(request_key(params), lambda: create().model_dump(mode="json"), model=model)
+    return ChatCompletion.model_validate(payload)
+
+
+async def achat_raw(
+    messages: List[Dict[str, Any]],
+    *,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Any] = "auto",
+    max_tokens: Optional[int] = None,
+    cache: Optional[bool] = None,
+    deadline: Optional[float] = None,
+) -> Any:
+    """chat_raw의 비동기 버전 (AsyncOpenAI)"""
+    client = get_async_client()
+    params = _chat_params(messages, model, temperature, tools, tool_choice, max_tokens)
+
+    async def create() -> Any:
+        return await acall_with_policy(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **params),
+            kind="complete",
+            deadline=deadline,
+        )
+
+    rc = _response_cache(params, cache)
+    if rc is None:
+        return await create()
+
+    # SQLite 조회는 로컬 파일 1건이라 루프에서 바로, 진행 중인 같은 요청은 Future를 await
+    key = request_key(params)
+    payload, fut, owner = rc.claim(key)
+    if payload is None and not owner:
+        payload = await asyncio.wrap_future(fut)
+    elif payload is None:
+        try:
+            resp = await create()
+        except BaseException as e:
+            rc.resolve(key, None, e)
+            raise
+        payload = resp.model_dump(mode="json")
+        rc.resolve(key, payload, model=model)
+    return ChatCompletion.model_validate(payload)
+
+
+def _merge_tool_call_delta(acc: Dict[int, Dict[str, Any]], tc: Any) -> None:
+    """
+    스트리밍 tool_calls 조각을 index 기준으로 이어 붙임
+    - id / type / function.name은 보통 첫 조각에만 옴
+    - function.arguments는 JSON 문자열이 여러 조각으로 나뉘어 옴 → 그대로 이어 붙임
+    """
+    idx = getattr(tc, "index", None)
+    if idx is None:
+        idx = len(acc)
+    cur = acc.setdefault(idx, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+    if getattr(tc, "id", None):
+        cur["id"] = tc.id
+    if getattr(tc, "type", None):
+        cur["type"] = tc.type
+    fn = getattr(tc, "function", None)
+    if fn is not None:
+        if getattr(fn, "name", None):
+            cur["function"]["name"] += fn.name
+        if getattr(fn, "arguments", None):
+            cur["function"]["arguments"] += fn.arguments
+
+
+def chat_raw_stream(
+    messages: List[Dict[str, Any]],
+    *,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Any] = "auto",
+    max_tokens: Optional[int] = None,
+    cache: Optional[bool] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    chat_raw의 스트리밍 버전 (stream=True)
+
+    yield 하는 이벤트:
+    - {"type": "token", "text": ...}                 : content 조각 (도착하는 대로)
+    - {"type": "message", "message": {...}, ...}      : 마지막 1번, 조립된 assistant 메시지
+      (role / content / tool_calls — chat_raw 응답의 choices[0].message와 같은 모양의 dict)
+      + finish_reason, usage, ttft_s(첫 조각까지 걸린 시간), total_s
+    - 응답 캐시 hit면 content 전체를 token 1개로 보내고 message에 "cached": True
+    - 재시도 / hedge는 첫 조각을 받기 전까지만 (이미 내보낸 토큰은 되돌릴 수 없음)
+    """
+    client = get_client()
+    params = _stream_params(messages, model, temperature, tools, tool_choice, max_tokens)
+    rc = _response_cache(params, cache)
+    key = ""
+    if rc is not None:
+        t0 = time.perf_counter()
+        key = request_key(params)
+        payload, fut, owner = rc.claim(key)
+        if not owner:
+            yield from _cached_events(payload if payload is not None else fut.result(), t0)
+            return
+
+    acc = _StreamAccumulator()
+    try:
+        stream, it, first = call_with_policy(
+            lambda timeout: _open_stream(client, params, timeout),
+            kind="first_chunk",
+            deadline=deadline,
+            close_loser=lambda opened: opened[0].close(),
+        )
+        try:
+            for chunk in itertools.chain([first] if first is not None else [], it):
+                text = acc.add(chunk)
+                if text:
+                    yield {"type": "token", "text": text}
+        finally:
+            close = getattr(stream, "close", None)
+            if callable(close):
+                close()
+    except BaseException as e:
+        if rc is not None:
+            rc.resolve(key, None, e)
+        raise
+    ev = acc.result()
+    if rc is not None:
+        rc.resolve(key, _completion_payload(key, model, ev), model=model)
+    yield ev
+
+
+async def achat_raw_stream(
+    messages: List[Dict[str, Any]],
+    *,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Any] = "auto",
+    max_tokens: Optional[int] = None,
+    cache: Optional[bool] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """chat_raw_stream의 비동기 버전 (이벤트 형식 / 캐시 동작 동일)"""
+    client = get_async_client()
+    params = _stream_params(messages, model, temperature, tools, tool_choice, max_tokens)
+    rc = _response_cache(params, cache)
+    key = ""
+    if rc is not None:
+        t0 = time.perf_counter()
+        key = request_key(params)
+        payload, fut, owner = rc.claim(key)
+        if not owner:
+            if payload is None:
+                payload = await asyncio.wrap_future(fut)
+            for ev in _cached_events(payload, t0):
+                yield ev
+            return
+
+    acc = _StreamAccumulator()
+    try:
+        stream, ait, first = await acall_with_policy(
+            lambda timeout: _aopen_stream(client, params, timeout),
+            kind="first_chunk",
+            deadline=deadline,
+            close_loser=_aclose_opened,
+        )
+        try:
+            if first is not None:
+                text = acc.add(first)
+                if text:
+                    yield {"type": "token", "text": text}
+            async for chunk in ait:
+                text = acc.add(chunk)
+                if text:
+                    yield {"type": "token", "text": text}
+        finally:
+            close = getattr(stream, "close", None)
+            if callable(close):
+                await close()
+    except BaseException as e:
+        if rc is not None:
+            rc.resolve(key, None, e)
+        raise
+    ev = acc.result()
+    if rc is not None:
+        rc.resolve(key, _completion_payload(key, model, ev), model=model)
+    yield ev
+
+
+def _open_stream(client: OpenAI, params: Dict[str, Any], timeout: float) -> Tuple[Any, Iterator[Any], Any]:
+    """스트림을 열고 첫 조각까지 받음 → (stream, 나머지 iterator, 첫 조각 또는 None)"""
+    stream = client.chat.completions.create(timeout=timeout, **params)
+    it = iter(stream)
+    try:
+        first = next(it, None)
+    except BaseException:
+        stream.close()
+        raise
+    return stream, it, first
+
+
+async def _aopen_stream(client: AsyncOpenAI, params: Dict[str, Any], timeout: float) -> Tuple[Any, Any, Any]:
+    """_open_stream의 비동기 버전 (hedge에서 져서 취소돼도 연결을 닫고 나감)"""
+    stream = await client.chat.completions.create(timeout=timeout, **params)
+    ait = stream.__aiter__()
+    try:
+        first = await ait.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except BaseException:
+        await stream.close()
+        raise
+    return stream, ait, first
+
+
+async def _aclose_opened(opened: Tuple[Any, Any, Any]) -> None:
+    await opened[0].close()
+
+
+def _stream_params(
+    messages: List[Dict[str, Any]],
+    model: str,
+    temperature: float,
+    tools: Optional[List[Dict[str, Any]]],
+    tool_choice: Optional[Any],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    params = _chat_params(messages, model, temperature, tools, tool_choice, max_tokens)
+    params["stream"] = True
+    params["stream_options"] = {"include_usage": True}
+    return params
+
+
+class _StreamAccumulator:
+    """스트리밍 조각 → content / tool_calls / finish_reason / usage 조립 (동기·비동기 공용)"""
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.ttft: Optional[float] = None
+        self.parts: List[str] = []
+        self.calls: Dict[int, Dict[str, Any]] = {}
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[Dict[str, Any]] = None
+
+    def add(self, chunk: Any) -> Optional[str]:
+        """조각 1개 반영 → 새 content 텍스트(없으면 None)"""
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage.model_dump() if hasattr(chunk.usage, "model_dump") else dict(chunk.usage)
+        if not chunk.choices:
+            return None  # include_usage의 마지막 조각은 choices가 비어 있음
+        choice = chunk.choices[0]
+        delta = choice.delta
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        if delta is None:
+            return None
+        if self.ttft is None and (delta.content or delta.tool_calls):
+            self.ttft = time.perf_counter() - self.t0
+        for tc in delta.tool_calls or []:
+            _merge_tool_call_delta(self.calls, tc)
+        if delta.content:
+            self.parts.append(delta.content)
+            return delta.content
+        return None
 
-    response = client.chat.completions.create(**params)
-    return response
+    def result(self) -> Dict[str, Any]:
+        msg: Dict[str, Any] = {"role": "assistant", "content": "".join(self.parts) or None}
+        if self.calls:
+            msg["tool_calls"] = [self.calls[i] for i in sorted(self.calls)]
+        return {
+            "type": "message",
+            "message": msg,
+            "finish_reason": self.finish_reason,
+            "usage": self.usage,
+            "ttft_s": self.ttft,
+            "total_s": time.perf_counter() - self.t0,
+        }
 
 
 def chat_simple(
@@ -70,6 +452,7 @@ def chat_simple(
     model: str = DEFAULT_MODEL,
     temperature: float = DEFAULT_TEMPERATURE,
     max_tokens: Optional[int] = None,
+    cache: Optional[bool] = None,
 ) -> str:
     messages: List[Dict[str, Any]] = [
         {"role": "system", "content": SYSTEM_PROMPT},
@@ -83,6 +466,7 @@ def chat_simple(
         tools=None,
         tool_choice="none",
         max_tokens=max_tokens,
+        cache=cache,
     )
 
     msg = resp.choices[0].message
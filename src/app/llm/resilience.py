@@ -0,0 +1,406 @@
+# src/app/llm/resilience.py
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import openai
+
+from src.app.config.settings import settings
+
+T = TypeVar("T")
+
+# p95를 계산할 최근 지연 샘플 수 / 자동 hedge 지연을 쓰기 시작하는 최소 샘플 수
+_WINDOW = 200
+_MIN_SAMPLES = 20
+# 남은 예산이 이보다 적으면 요청을 보내지 않음 (보내도 응답을 못 받음)
+_MIN_ATTEMPT_S = 0.2
+
+_RETRYABLE_STATUS = {408, 409, 429}
+# 서버가 보낸 Retry-After가 너무 길면 이 값까지만 기다림 (턴 예산이 있으면 그쪽이 먼저 끊음)
+_MAX_RETRY_AFTER_S = 60.0
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """턴 예산(graph state의 deadline)을 다 써서 LLM 호출을 더 할 수 없음"""
+
+
+# ---------- 턴 예산 ----------
+def turn_deadline(budget_s: Optional[float] = None) -> Optional[float]:
+    """
+    지금부터 한 턴에 쓸 수 있는 마감 시각 (time.time() 기준, graph state["deadline"]에 넣음)
+    - budget_s가 없으면 settings.llm_turn_budget_s, 0 이하이면 마감 없음(None)
+    """
+    budget = settings.llm_turn_budget_s if budget_s is None else budget_s
+    return time.time() + budget if budget and budget > 0 else None
+
+
+def remaining_s(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else deadline - time.time()
+
+
+def attempt_timeout(deadline: Optional[float]) -> float:
+    """요청 1번의 timeout = min(LLM_REQUEST_TIMEOUT_S, 남은 턴 예산)"""
+    timeout = settings.llm_request_timeout_s
+    left = remaining_s(deadline)
+    if left is not None:
+        if left < _MIN_ATTEMPT_S:
+            get_llm_metrics().count("deadline_exceeded")
+            raise LLMDeadlineExceeded(f"LLM 턴 예산 초과 (남은 시간 {max(0.0, left):.2f}s)")
+        timeout = min(timeout, left)
+    return timeout
+
+
+# ---------- 재시도 ----------
+def is_retryable(e: BaseException) -> bool:
+    """연결 오류 / timeout / 429 / 5xx만 재시도 (400, 401, 컨텍스트 초과 등은 바로 실패)"""
+    if isinstance(e, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in _RETRYABLE_STATUS or e.status_code >= 500
+    return False
+
+
+def backoff_s(attempt: int) -> float:
+    """full jitter: U(0, min(max, base * 2^attempt)) → 동시에 실패한 요청들이 같은 순간에 다시 몰리지 않음"""
+    cap = min(settings.llm_retry_max_ms, settings.llm_retry_base_ms * (2 ** attempt))
+    return random.uniform(0, cap) / 1000.0
+
+
+def retry_after_s(e: BaseException) -> Optional[float]:
+    """응답 헤더의 retry-after-ms / Retry-After(초 또는 HTTP 날짜), 없거나 못 읽으면 None"""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    raw_ms = headers.get("retry-after-ms")
+    if raw_ms:
+        try:
+            return max(0.0, float(raw_ms) / 1000.0)
+        except ValueError:
+            pass
+    raw = headers.get("retry-after")
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(raw).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def retry_delay_s(e: BaseException, attempt: int) -> float:
+    """재시도 전 대기: jitter backoff, 서버가 Retry-After(429/503 등)를 주면 최소 그만큼"""
+    delay = backoff_s(attempt)
+    after = retry_after_s(e)
+    if after is not None:
+        delay = max(delay, min(after, _MAX_RETRY_AFTER_S))
+    return delay
+
+
+# ---------- 메트릭 ----------
+class LLMCallMetrics:
+    """
+    LLM 호출 카운터 + 최근 지연 분포
+    - kind별(complete: 응답 전체 / first_chunk: 스트림 첫 조각까지) 최근 _WINDOW개 지연으로 p95 계산
+      → LLM_HEDGE_DELAY_MS=0이면 이 p95가 hedge 지연이 됨
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "hedge_cancelled": 0,    # 진 요청을 실제로 끊음 (시작 전 취소 / async task 취소)
+            "hedge_closed": 0,       # 진 스트림: 첫 조각까지 받은 뒤 바로 닫음
+            "hedge_uncancelled": 0,  # 진 동기 non-stream 요청: 끊을 수 없어 끝까지 받고 버림
+            "deadline_exceeded": 0,
+            "failures": 0,
+        }
+        self._lat: Dict[str, Deque[float]] = {}
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def observe(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self._lat.setdefault(kind, deque(maxlen=_WINDOW)).append(seconds)
+
+    def percentile(self, kind: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._lat.get(kind, ()))
+        if len(samples) < _MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self._counts)
+            kinds = list(self._lat)
+        for kind in kinds:
+            p50, p95 = self.percentile(kind, 0.50), self.percentile(kind, 0.95)
+            out[kind] = {
+                "p50_ms": p50 * 1000 if p50 is not None else None,
+                "p95_ms": p95 * 1000 if p95 is not None else None,
+                "hedge_delay_ms": hedge_delay_s(kind) * 1000,
+            }
+        out["hedge_enabled"] = settings.llm_hedge
+        return out
+
+
+_metrics: Optional[LLMCallMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_llm_metrics() -> LLMCallMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = LLMCallMetrics()
+        return _metrics
+
+
+def llm_metrics_stats() -> Dict[str, Any]:
+    return get_llm_metrics().stats()
+
+
+def hedge_delay_s(kind: str) -> float:
+    """LLM_HEDGE_DELAY_MS > 0이면 고정값, 0이면 관측 p95 (샘플이 모이기 전에는 LLM_HEDGE_DEFAULT_DELAY_MS)"""
+    if settings.llm_hedge_delay_ms > 0:
+        return settings.llm_hedge_delay_ms / 1000.0
+    p95 = get_llm_metrics().percentile(kind, 0.95)
+    return p95 if p95 is not None else settings.llm_hedge_default_delay_ms / 1000.0
+
+
+# ---------- 동기 실행 ----------
+# hedge용 요청 2개를 돌리는 스레드 (동기 httpx 요청은 중간에 끊을 수 없어서 진 쪽은 끝날 때까지 스레드를 씀)
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=max(2, settings.llm_hedge_workers),
+                thread_name_prefix="llm-hedge",
+            )
+        return _hedge_executor
+
+
+def _timed(fn: Callable[[float], T], kind: str) -> Callable[[float], T]:
+    def run(timeout: float) -> T:
+        get_llm_metrics().count("attempts")
+        t0 = time.perf_counter()
+        out = fn(timeout)
+        get_llm_metrics().observe(kind, time.perf_counter() - t0)
+        return out
+    return run
+
+
+def _discard(fut: Future, close: Optional[Callable[[Any], None]]) -> None:
+    """
+    hedge에서 진 요청: 아직 시작 전이면 취소, 이미 돌고 있으면 끝난 뒤 결과를 닫음
+    - 동기 httpx 요청은 응답 헤더가 오기 전에는 다른 스레드에서 끊을 수 없음
+      → 스트림은 열리자마자 닫고(hedge_closed), non-stream은 끝까지 받은 뒤 버림(hedge_uncancelled)
+    """
+    metrics = get_llm_metrics()
+    if fut.cancel():
+        metrics.count("hedge_cancelled")
+        return
+    if close is None:
+        metrics.count("hedge_uncancelled")
+        return
+    metrics.count("hedge_closed")
+
+    def _close(f: Future) -> None:
+        if not f.cancelled() and f.exception() is None:
+            try:
+                close(f.result())
+            except Exception:
+                pass
+
+    fut.add_done_callback(_close)
+
+
+def _hedged(fn: Callable[[float], T], timeout: float, kind: str, close: Optional[Callable[[T], None]]) -> T:
+    delay = hedge_delay_s(kind)
+    if delay >= timeout:
+        return fn(timeout)  # hedge를 보낼 시간이 없음
+
+    first = _get_hedge_executor().submit(fn, timeout)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+
+    get_llm_metrics().count("hedges")
+    second = _get_hedge_executor().submit(fn, timeout - delay)
+    futs = [first, second]
+    pending = set(futs)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        ok = [f for f in done if f.exception() is None]
+        if ok:
+            winner = ok[0]
+            if winner is second:
+                get_llm_metrics().count("hedge_wins")
+            for f in futs:
+                if f is not winner:
+                    _discard(f, close)
+            return winner.result()
+        error = next(iter(done)).exception()
+    raise error
+
+
+def call_with_policy(
+    fn: Callable[[float], T],
+    *,
+    kind: str,
+    deadline: Optional[float] = None,
+    close_loser: Optional[Callable[[T], None]] = None,
+) -> T:
+    """
+    fn(timeout)을 턴 예산 / 재시도 / hedge 정책으로 실행
+    - timeout: 요청 1번에 쓸 시간 (openai의 per-request timeout으로 넘김)
+    - 재시도 가능한 오류면 jitter backoff(Retry-After가 있으면 최소 그만큼) 후 다시 (LLM_MAX_RETRIES번까지, 남은 예산 안에서만)
+    - LLM_HEDGE=1: hedge 지연 안에 응답이 없으면 같은 요청을 1번 더 보내고 먼저 끝난 쪽 사용
+    """
+    metrics = get_llm_metrics()
+    metrics.count("calls")
+    timed = _timed(fn, kind)
+    attempt = 0
+    while True:
+        timeout = attempt_timeout(deadline)
+        try:
+            if settings.llm_hedge:
+                return _hedged(timed, timeout, kind, close_loser)
+            return timed(timeout)
+        except Exception as e:
+            delay = retry_delay_s(e, attempt)
+            left = remaining_s(deadline)
+            if not is_retryable(e) or attempt >= settings.llm_max_retries:
+                metrics.count("failures")
+                raise
+            if left is not None and left - delay < _MIN_ATTEMPT_S:
+                metrics.count("deadline_exceeded")
+                raise LLMDeadlineExceeded(f"LLM 턴 예산 초과 (마지막 오류: {e})") from e
+            metrics.count("retries")
+            print(f"[LLM] retry {attempt + 1}/{settings.llm_max_retries} in {delay * 1000:.0f}ms: {type(e).__name__}")
+            time.sleep(delay)
+            attempt += 1
+
+
+# ---------- 비동기 실행 ----------
+def _atimed(fn: Callable[[float], Awaitable[T]], kind: str) -> Callable[[float], Awaitable[T]]:
+    async def run(timeout: float) -> T:
+        get_llm_metrics().count("attempts")
+        t0 = time.perf_counter()
+        out = await fn(timeout)
+        get_llm_metrics().observe(kind, time.perf_counter() - t0)
+        return out
+    return run
+
+
+async def _adiscard(task: "asyncio.Task[Any]", close: Optional[Callable[[Any], Awaitable[None]]]) -> None:
+    """진 요청 task 취소 (이미 끝났으면 결과를 닫음) → httpx 연결도 같이 끊김"""
+    get_llm_metrics().count("hedge_cancelled")
+    if not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return
+    if close is not None and not task.cancelled() and task.exception() is None:
+        try:
+            await close(task.result())
+        except Exception:
+            pass
+
+
+async def _ahedged(
+    fn: Callable[[float], Awaitable[T]],
+    timeout: float,
+    kind: str,
+    close: Optional[Callable[[T], Awaitable[None]]],
+) -> T:
+    delay = hedge_delay_s(kind)
+    if delay >= timeout:
+        return await fn(timeout)
+
+    first = asyncio.ensure_future(fn(timeout))
+    tasks: List["asyncio.Task[T]"] = [first]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        get_llm_metrics().count("hedges")
+        second = asyncio.ensure_future(fn(timeout - delay))
+        tasks.append(second)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            ok = [t for t in done if not t.cancelled() and t.exception() is None]
+            if ok:
+                winner = ok[0]
+                if winner is second:
+                    get_llm_metrics().count("hedge_wins")
+                for t in tasks:
+                    if t is not winner:
+                        await _adiscard(t, close)
+                return winner.result()
+            error = next(iter(done)).exception()
+        raise error
+    except asyncio.CancelledError:
+        for t in tasks:
+            t.cancel()
+        raise
+
+
+async def acall_with_policy(
+    fn: Callable[[float], Awaitable[T]],
+    *,
+    kind: str,
+    deadline: Optional[float] = None,
+    close_loser: Optional[Callable[[T], Awaitable[None]]] = None,
+) -> T:
+    """call_with_policy의 비동기 버전 (hedge에서 진 요청은 task.cancel()로 바로 끊음)"""
+    metrics = get_llm_metrics()
+    metrics.count("calls")
+    timed = _atimed(fn, kind)
+    attempt = 0
+    while True:
+        timeout = attempt_timeout(deadline)
+        try:
+            if settings.llm_hedge:
+                return await _ahedged(timed, timeout, kind, close_loser)
+            return await timed(timeout)
+        except Exception as e:
+            delay = retry_delay_s(e, attempt)
+            left = remaining_s(deadline)
+            if not is_retryable(e) or attempt >= settings.llm_max_retries:
+                metrics.count("failures")
+                raise
+            if left is not None and left - delay < _MIN_ATTEMPT_S:
+                metrics.count("deadline_exceeded")
+                raise LLMDeadlineExceeded(f"LLM 턴 예산 초과 (마지막 오류: {e})") from e
+            metrics.count("retries")
+            print(f"[LLM] retry {attempt + 1}/{settings.llm_max_retries} in {delay * 1000:.0f}ms: {type(e).__name__}")
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,231 @@
+# src/app/llm/response_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 요청 형식(키 구성)이 바뀌면 올림 → 이전 항목은 자연스럽게 miss
+CACHE_KEY_VERSION = 1
+
+
+def request_key(params: Dict[str, Any]) -> str:
+    """
+    chat.completions 요청 파라미터의 정규화 해시
+    - dict 키 순서 / 공백과 무관하게 같은 요청이면 같은 키 (sort_keys, 구분자 고정)
+    - model / messages / tools / temperature / tool_choice / max_tokens 만 사용 (stream 여부는 무관)
+    """
+    canon = {
+        "v": CACHE_KEY_VERSION,
+        "model": params.get("model"),
+        "messages": params.get("messages"),
+        "tools": params.get("tools"),
+        "temperature": params.get("temperature"),
+        "tool_choice": params.get("tool_choice"),
+        "max_tokens": params.get("max_tokens"),
+    }
+    blob = json.dumps(canon, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    결정적(temperature 0) LLM 호출 응답 캐시 (SQLite 1개 파일)
+
+    - 키: request_key(params) → 값: ChatCompletion dict (zlib 압축 JSON)
+    - ttl_s가 지난 항목은 miss로 보고 지움
+    - 항목 수 / 전체 크기가 한도를 넘으면 오래 안 쓴 것부터 삭제 (last_used 기준)
+    - 같은 키의 요청이 동시에 들어오면 API는 1번만 호출하고 나머지는 그 결과를 기다림 (coalescing)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_s: float = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_mb: float = 256,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = float(ttl_s)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evicted = 0
+
+    # ---------- 조회 / 저장 ----------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, payload FROM responses WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[0] > self.ttl_s:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[1]).decode("utf-8"))
+
+    def put(self, key: str, payload: Dict[str, Any], model: Optional[str] = None) -> None:
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"), 6)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created_at, last_used, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, len(blob), blob),
+            )
+            self._evict_locked(now)
+
+    def _evict_locked(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_s,))
+        self.evicted += max(0, cur.rowcount)
+        n, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if n <= self.max_entries and total <= self.max_bytes:
+            return
+        # 한도의 90%까지 줄여서 매 put마다 지우지 않도록
+        keep_n = int(self.max_entries * 0.9)
+        keep_bytes = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used DESC").fetchall()
+        kept_n = kept_bytes = 0
+        drop = []
+        for key, size in rows:
+            if kept_n < keep_n and kept_bytes + size <= keep_bytes:
+                kept_n += 1
+                kept_bytes += size
+            else:
+                drop.append((key,))
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", drop)
+        self.evicted += len(drop)
+
+    # ---------- 호출 ----------
+    def claim(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[Future], bool]:
+        """
+        (캐시 값, 기다릴 Future, 내가 호출해야 하는지)
+        - 캐시 hit: (값, None, False)
+        - 같은 키를 누가 호출 중: (None, 그 Future, False)
+        - 아무도 없음: (None, 내 Future, True) → 호출 후 resolve()로 끝내야 함
+        """
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached, None, False
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return None, fut, False
+            fut = Future()
+            self._inflight[key] = fut
+            self.misses += 1
+            return None, fut, True
+
+    def resolve(self, key: str, payload: Optional[Dict[str, Any]], error: Optional[BaseException] = None,
+                model: Optional[str] = None) -> None:
+        if error is None and payload is not None:
+            try:
+                self.put(key, payload, model=model)
+            except sqlite3.Error as e:
+                print(f"[LLM_CACHE] 저장 실패: {e}")
+        with self._lock:
+            fut = self._inflight.pop(key, None)
+        if fut is not None:
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(payload)
+
+    def call(self, key: str, fn: Callable[[], Dict[str, Any]], model: Optional[str] = None) -> Dict[str, Any]:
+        """동기 호출용: hit면 바로, 진행 중이면 기다리고, 아니면 fn() 결과를 저장해서 반환"""
+        cached, fut, owner = self.claim(key)
+        if cached is not None:
+            return cached
+        if not owner:
+            return fut.result()
+        try:
+            payload = fn()
+        except BaseException as e:
+            self.resolve(key, None, e)
+            raise
+        self.resolve(key, payload, model=model)
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            inflight = len(self._inflight)
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": n,
+            "size_mb": total / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "evicted": self.evicted,
+            "inflight": inflight,
+            "ttl_s": self.ttl_s,
+        }
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+# ---------- process-wide singleton ----------
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from src.app.config.settings import settings
+
+            _cache = LLMResponseCache(
+                settings.llm_cache_path,
+                ttl_s=settings.llm_cache_ttl_s,
+                max_entries=settings.llm_cache_max_entries,
+                max_mb=settings.llm_cache_max_mb,
+            )
+        return _cache
+
+
+def response_cache_stats() -> Optional[Dict[str, Any]]:
+    """캐시를 한 번도 안 썼으면 None (파일도 만들지 않음)"""
+    return _cache.stats() if _cache is not None else None
@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 MEMORY_EXTRACTOR_PROMPT = """You are a memory extraction assistant.
 Your task:
@@ -40,11 +40,50 @@ def build_snippet(history: List[Any], user_message: str, final_answer: str) -> s
     recent_text = "\n".join([str(m) for m in recent])
     return f"[RECENT]\n{recent_text}\n\n[USER]\n{user_message}\n\n[ASSISTANT_FINAL]\n{final_answer}"
 
-def run_memory_extractor(llm: ChatOpenAI, snippet: str) -> Dict[str, Any]:
-    resp = llm.invoke([SystemMessage(content=MEMORY_EXTRACTOR_PROMPT), HumanMessage(content=snippet)])
-    text = resp.content.strip()
+def _parse_extractor_output(text: str) -> Dict[str, Any]:
     try:
-        return json.loads(text)
+        return json.loads(text.strip())
     except Exception:
         # 모델이 JSON을 약간 망가뜨리면 최소 방어
         return {"should_write_memory": False}
+
+def run_memory_extractor(llm: "ChatOpenAI", snippet: str) -> Dict[str, Any]:
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    resp = llm.invoke([SystemMessage(content=MEMORY_EXTRACTOR_PROMPT), HumanMessage(content=snippet)])
+    return _parse_extractor_output(resp.content)
+
+def _extractor_messages(snippet: str) -> List[Dict[str, Any]]:
+    return [
+        {"role": "system", "content": MEMORY_EXTRACTOR_PROMPT},
+        {"role": "user", "content": snippet},
+    ]
+
+def extract_memory(snippet: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    run_memory_extractor와 같은 판단을 chat_raw(temperature 0)로 수행
+    - 같은 스니펫이면 요청이 완전히 같음 → LLM_CACHE가 켜져 있으면 응답 캐시에서 바로 나옴
+    """
+    from src.app.llm.client import DEFAULT_MODEL, chat_raw
+
+    resp = chat_raw(
+        _extractor_messages(snippet),
+        model=model or DEFAULT_MODEL,
+        temperature=0,
+        tools=None,
+        tool_choice=None,
+    )
+    return _parse_extractor_output(resp.choices[0].message.content or "")
+
+async def aextract_memory(snippet: str, model: Optional[str] = None) -> Dict[str, Any]:
+    """extract_memory의 비동기 버전 (achat_raw)"""
+    from src.app.llm.client import DEFAULT_MODEL, achat_raw
+
+    resp = await achat_raw(
+        _extractor_messages(snippet),
+        model=model or DEFAULT_MODEL,
+        temperature=0,
+        tools=None,
+        tool_choice=None,
+    )
+    return _parse_extractor_output(resp.choices[0].message.content or "")
@@ -3,15 +3,19 @@ from __future__ import annotations
 # src/app/memory/store.py
 import json
 import datetime
+import uuid
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Literal, Optional
 
-import chromadb
-from chromadb import PersistentClient
 from sentence_transformers import SentenceTransformer
 
 from src.app.config.settings import settings
+from src.app.embedding.quantize import cache_model_name
+from src.app.embedding.registry import get_shared_embedder
+from src.app.embedding.query_cache import encode_query
+from src.app.vectorstore.base import VectorStore
+from src.app.vectorstore.factory import open_vector_store
 
 MemoryType = Literal["profile", "episodic", "knowledge"]
 
@@ -26,7 +30,7 @@ class MemoryItem:
     created_at: str
 
 
-_mem_client: Optional[PersistentClient] = None
+_mem_store: Optional[VectorStore] = None
 _mem_embedder: Optional[SentenceTransformer] = None
 
 
@@ -55,34 +59,42 @@ def get_memory_collection_name() -> str:
     return "course_memory"
 
 
-def get_mem_client() -> PersistentClient:
-    global _mem_client
-    if _mem_client is None:
-        db_dir = get_memory_db_dir()
-        db_dir.mkdir(parents=True, exist_ok=True)
-        _mem_client = chromadb.PersistentClient(path=str(db_dir))
-    return _mem_client
-
-
-def get_mem_collection():
-    client = get_mem_client()
-    return client.get_or_create_collection(
-        name=get_memory_collection_name(),
-        metadata={"hnsw:space": "cosine"},
-    )
+def get_mem_store() -> VectorStore:
+    """settings.memory_backend(chroma | numpy)에 맞는 메모리 벡터 저장소"""
+    global _mem_store
+    if _mem_store is None:
+        _mem_store = open_vector_store(
+            settings.memory_backend,
+            get_memory_db_dir(),
+            get_memory_collection_name(),
+            space="cosine",
+            hnsw=settings.hnsw_params(),
+        )
+    return _mem_store
 
 
 def get_mem_embedder() -> SentenceTransformer:
     """
     ⚠️ 중요:
     - SentenceTransformer는 meta tensor 상태에서 .to(device)를 호출하면 터질 수 있음
-    - 따라서 최초 생성 시 device를 'cpu'로 명시 고정
+    - 따라서 최초 생성 시 device를 명시 고정 (settings.rag_embedder_device, 기본 'cpu')
+    - settings.rag_embedder_quantize=int8이면 동적 양자화 모델 사용
+    - get_rag_embedder와 같은 레지스트리 키 → 같은 인스턴스를 공유 (가중치 1벌)
+    - settings.embed_batching이면 RAG 질의와 같은 MicroBatcher로 묶임
     """
     global _mem_embedder
     if _mem_embedder is None:
-        _mem_embedder = SentenceTransformer(
+        _mem_embedder = get_shared_embedder(
             settings.rag_embedding_model_name,
-            device="cpu",   # ✅ meta tensor 문제 해결 핵심
+            device=settings.rag_embedder_device,   # ✅ meta tensor 문제 해결 핵심
+            quantize=settings.rag_embedder_quantize,
+            cache_dir=settings.rag_quantized_model_dir,
+            user="memory",
+            batching=settings.embed_batching,
+            max_wait_ms=settings.embed_batch_max_wait_ms,
+            max_batch=settings.embed_batch_max_size,
+            workers=settings.embed_workers,
+            threads_per_worker=settings.embed_worker_threads,
         )
     return _mem_embedder
 
@@ -101,15 +113,16 @@ def write_memory(
     importance = max(1, min(int(importance), 5))
 
     now = datetime.datetime.now().isoformat(timespec="seconds")
-    mem_id = f"mem::{now}"
+    # 초 단위 시각만 쓰면 같은 초에 저장한 메모리끼리 upsert로 덮어씀 → 뒤에 랜덤 접미사
+    mem_id = f"mem::{now}::{uuid.uuid4().hex[:8]}"
 
-    col = get_mem_collection()
-    emb = get_mem_embedder().encode([content], show_progress_bar=False).tolist()[0]
+    store = get_mem_store()
+    emb = get_mem_embedder().encode([content], show_progress_bar=False)
 
-    col.add(
+    store.upsert_batch(
         ids=[mem_id],
         documents=[content],
-        embeddings=[emb],
+        embeddings=emb,
         metadatas=[{
             "memory_type": memory_type,
             "importance": importance,
@@ -118,25 +131,26 @@ def write_memory(
             "created_at": now,
         }],
     )
+    store.flush()
     return mem_id
 
 
 def read_memory(query: str, top_k: int = 5) -> List[MemoryItem]:
-    col = get_mem_collection()
-    qemb = get_mem_embedder().encode([query], show_progress_bar=False).tolist()
-
-    res = col.query(
-        query_embeddings=qemb,
-        n_results=max(1, min(int(top_k), 10)),
-        include=["documents", "metadatas"],
+    store = get_mem_store()
+    # rag_search와 같은 모델이라 질의 임베딩을 공용 LRU로 공유
+    qemb = encode_query(
+        get_mem_embedder(),
+        cache_model_name(settings.rag_embedding_model_name, settings.rag_embedder_quantize),
+        query,
+        cache_size=settings.query_embed_cache_size,
+        enabled=settings.query_embed_cache,
     )
 
-    ids = (res.get("ids") or [[]])[0]
-    docs = (res.get("documents") or [[]])[0]
-    metas = (res.get("metadatas") or [[]])[0]
+    hits = store.query_batch([qemb], max(1, min(int(top_k), 10)))[0]
 
     out: List[MemoryItem] = []
-    for mem_id, doc, meta in zip(ids, docs, metas):
+    for h in hits:
+        mem_id, doc, meta = h.id, h.document, h.metadata
         raw_tags = meta.get("tags", "[]") if isinstance(meta, dict) else "[]"
         try:
             parsed_tags = json.loads(raw_tags) if isinstance(raw_tags, str) else raw_tags
@@ -0,0 +1,200 @@
+# src/app/net/http_pool.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+# 외부 HTTP 호출(OpenAI / Google 검색)이 같이 쓰는 커넥션 풀
+# - keep-alive로 TCP + TLS 연결을 재사용 → 검색 tool 호출마다 핸드셰이크(100ms+)를 하지 않음
+# - HTTP/2(h2 설치 시): 같은 호스트로 가는 동시 요청이 연결 1개를 나눠 씀
+# - 동기(httpx.Client) / 비동기(httpx.AsyncClient) 각각 프로세스에 1개
+# - 설정은 호출 측이 인자로 넘김 (src/app은 settings.http_pool_params(), final_project는 환경변수)
+#   풀은 처음 만들 때의 설정으로 고정되므로 같은 프로세스에서는 같은 값을 넘길 것
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+_http2: Optional[bool] = None
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "max_connections": 100,
+    "max_keepalive": 20,
+    "keepalive_expiry_s": 60.0,
+    "connect_timeout_s": 5.0,
+    "timeout_s": 60.0,
+    "http2": False,
+    "hedge": False,  # LLM hedge를 켰는지 (HTTP/2와 같이 켜면 경고만)
+}
+_config: Dict[str, Any] = dict(DEFAULT_CONFIG)
+
+
+class _PoolMetrics:
+    """httpcore trace 이벤트로 새 연결 / TLS 핸드셰이크 횟수와 걸린 시간 집계"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+
+    def _on_event(self, started: Dict[str, float], name: str) -> None:
+        now = time.perf_counter()
+        step, _, phase = name.rpartition(".")
+        if phase == "started":
+            started[step] = now
+            return
+        if phase != "complete" or step not in started:
+            return
+        ms = (now - started.pop(step)) * 1000
+        with self._lock:
+            if step == "connection.connect_tcp":
+                self.tcp_connects += 1
+                self.connect_ms += ms
+            elif step == "connection.start_tls":
+                self.tls_handshakes += 1
+                self.tls_ms += ms
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        if "trace" in request.extensions:
+            return
+        started: Dict[str, float] = {}
+        request.extensions["trace"] = lambda name, info: self._on_event(started, name)
+
+    async def aon_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        if "trace" in request.extensions:
+            return
+        started: Dict[str, float] = {}
+
+        async def trace(name: str, info: Dict[str, Any]) -> None:
+            self._on_event(started, name)
+
+        request.extensions["trace"] = trace
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "tcp_connects": self.tcp_connects,
+                "tls_handshakes": self.tls_handshakes,
+                "reuse_rate": 1 - self.tcp_connects / self.requests if self.requests else 0.0,
+                "avg_connect_ms": self.connect_ms / self.tcp_connects if self.tcp_connects else None,
+                "avg_tls_ms": self.tls_ms / self.tls_handshakes if self.tls_handshakes else None,
+            }
+
+
+_metrics = {"sync": _PoolMetrics(), "async": _PoolMetrics()}
+
+
+def _configure(config: Dict[str, Any]) -> None:
+    # 클라이언트가 하나도 없을 때만 반영 (이미 열린 풀의 한도 / timeout은 바꿀 수 없음)
+    global _config
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise TypeError(f"알 수 없는 HTTP 풀 설정: {sorted(unknown)}")
+    if _client is None and _async_client is None:
+        _config = {**DEFAULT_CONFIG, **config}
+
+
+def _http2_enabled() -> bool:
+    global _http2
+    if _http2 is None:
+        _http2 = bool(_config["http2"])
+        if _http2:
+            try:
+                import h2  # noqa: F401  (httpx[http2])
+            except ImportError:
+                print("[HTTP] h2 패키지가 없어 HTTP/1.1 keep-alive만 사용합니다 (pip install 'httpx[http2]').")
+                _http2 = False
+        if _http2 and _config["hedge"]:
+            print("[HTTP] HTTP/2 + LLM_HEDGE: hedge 요청이 같은 연결에 다중화되어 느린 연결을 피하지 못합니다.")
+    return _http2
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(_config["max_connections"]),
+        max_keepalive_connections=int(_config["max_keepalive"]),
+        keepalive_expiry=float(_config["keepalive_expiry_s"]),
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # 요청별 timeout(OpenAI per-request timeout, 검색 timeout=...)이 있으면 그게 우선
+    return httpx.Timeout(float(_config["timeout_s"]), connect=float(_config["connect_timeout_s"]))
+
+
+def get_http_client(**config: Any) -> httpx.Client:
+    """
+    공용 동기 클라이언트
+    config: max_connections / max_keepalive / keepalive_expiry_s / connect_timeout_s / timeout_s / http2 / hedge
+    (빠진 값은 DEFAULT_CONFIG, 처음 만들 때만 반영)
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _configure(config)
+            _client = httpx.Client(
+                http2=_http2_enabled(),
+                limits=_limits(),
+                timeout=_timeout(),
+                follow_redirects=True,
+                event_hooks={"request": [_metrics["sync"].on_request]},
+            )
+        return _client
+
+
+def get_async_http_client(**config: Any) -> httpx.AsyncClient:
+    """비동기 그래프 / AsyncOpenAI용 (연결이 이벤트 루프에 묶이므로 서버 루프 1개에서만 사용, config는 get_http_client와 같음)"""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _configure(config)
+            _async_client = httpx.AsyncClient(
+                http2=_http2_enabled(),
+                limits=_limits(),
+                timeout=_timeout(),
+                follow_redirects=True,
+                event_hooks={"request": [_metrics["async"].aon_request]},
+            )
+        return _async_client
+
+
+def _pool_state(client: Any) -> Optional[Dict[str, Any]]:
+    """httpcore 풀의 현재 연결 상태 (내부 속성이라 구조가 다르면 None)"""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    conns = getattr(pool, "connections", None)
+    if conns is None:
+        return None
+    infos = [c.info() for c in list(conns)]
+    idle = sum(1 for c in list(conns) if c.is_idle())
+    max_connections = int(_config["max_connections"])
+    return {
+        "connections": len(infos),
+        "idle": idle,
+        "active": len(infos) - idle,
+        "http2": sum(1 for i in infos if "HTTP/2" in i),
+        "utilization": (len(infos) - idle) / max_connections if max_connections else 0.0,
+    }
+
+
+def http_pool_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "max_connections": _config["max_connections"],
+        "max_keepalive": _config["max_keepalive"],
+        "keepalive_expiry_s": _config["keepalive_expiry_s"],
+    }
+    for name, client in (("sync", _client), ("async", _async_client)):
+        if client is None:
+            out[name] = None
+            continue
+        out[name] = {**_metrics[name].stats(), "pool": _pool_state(client)}
+    return out
+
@@ -0,0 +1,181 @@
+# src/app/rag/bm25.py
+from __future__ import annotations
+
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_ASCII_RE = re.compile(r"^[0-9a-z_]+$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어 친화 문자 n-gram 토크나이저
+    - 단어(\\w+)마다 글자 bigram 생성 → 조사/어미가 붙어도 '함수', '테이블' 등이 매칭됨
+    - 한 글자 단어는 그대로 사용
+    - 영문/숫자 식별자(에러 코드, 테이블명 등)는 단어 전체도 함께 사용 → 정확 매칭 가산
+    """
+    out: List[str] = []
+    for w in _WORD_RE.findall(text.lower()):
+        if len(w) == 1:
+            out.append(w)
+            continue
+        out.extend(w[i:i + 2] for i in range(len(w) - 1))
+        if _ASCII_RE.match(w):
+            out.append(w)
+    return out
+
+
+def _pack_strings(items: List[str]) -> np.ndarray:
+    """문자열 리스트 → NUL 구분 UTF-8 바이트 배열 (numpy 유니코드 배열보다 ~4배 작음)"""
+    return np.frombuffer("\x00".join(items).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(arr: np.ndarray) -> List[str]:
+    blob = arr.tobytes().decode("utf-8")
+    return blob.split("\x00") if blob else []
+
+
+class BM25Index:
+    """
+    in-process BM25 역색인 (CSR 형태 numpy 배열)
+
+    - term_ptr[t]:term_ptr[t+1] 구간이 term t의 posting
+    - post_docs: 문서 번호(int32), post_w: BM25 tf 정규화 값을 미리 계산한 가중치(float32)
+      → 질의 시에는 scores[docs] += idf[t] * w 만 하면 됨
+    - 디스크에는 np.savez(비압축) 1개 파일로 저장 (로드 = 배열 읽기)
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        terms: List[str],
+        term_ptr: np.ndarray,
+        post_docs: np.ndarray,
+        post_w: np.ndarray,
+        idf: np.ndarray,
+    ) -> None:
+        self.ids = ids
+        self.terms = terms
+        self.vocab: Dict[str, int] = {t: i for i, t in enumerate(terms)}
+        self.term_ptr = term_ptr
+        self.post_docs = post_docs
+        self.post_w = post_w
+        self.idf = idf
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- 생성 ----------
+    @classmethod
+    def build(
+        cls,
+        docs: Iterable[Tuple[str, str]],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """docs: (chunk_id, text) iterable"""
+        ids: List[str] = []
+        vocab: Dict[str, int] = {}
+        # posting을 (term, doc, tf) 평면 리스트로 모은 뒤 term 기준 정렬 → CSR
+        p_term: List[int] = []
+        p_doc: List[int] = []
+        p_tf: List[int] = []
+        doc_len: List[int] = []
+
+        for doc_no, (cid, text) in enumerate(docs):
+            ids.append(cid)
+            toks = tokenize(text or "")
+            doc_len.append(len(toks))
+            for term, f in Counter(toks).items():
+                p_term.append(vocab.setdefault(term, len(vocab)))
+                p_doc.append(doc_no)
+                p_tf.append(f)
+
+        n_docs = len(ids)
+        dl = np.asarray(doc_len, dtype=np.float32)
+        avgdl = float(dl.mean()) if n_docs else 1.0
+        norm = k1 * (1.0 - b + b * dl / max(avgdl, 1e-6))  # 문서별 분모 항
+
+        terms = list(vocab.keys())
+        term_arr = np.asarray(p_term, dtype=np.int64)
+        order = np.argsort(term_arr, kind="stable")  # 같은 term 안에서는 문서 순서 유지
+        post_docs = np.asarray(p_doc, dtype=np.int32)[order]
+        tf = np.asarray(p_tf, dtype=np.float32)[order]
+
+        lengths = np.bincount(term_arr, minlength=len(terms))
+        term_ptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=term_ptr[1:])
+
+        post_w = (tf * (k1 + 1.0) / (tf + norm[post_docs])).astype(np.float32) if n_docs else tf
+        df = lengths.astype(np.float64)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        return cls(ids, terms, term_ptr, post_docs, post_w, idf)
+
+    # ---------- 저장 / 로드 ----------
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp,
+            ids=_pack_strings(self.ids),
+            terms=_pack_strings(self.terms),
+            term_ptr=self.term_ptr,
+            post_docs=self.post_docs,
+            post_w=self.post_w,
+            idf=self.idf,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(path) as z:
+            return cls(
+                ids=_unpack_strings(z["ids"]),
+                terms=_unpack_strings(z["terms"]),
+                term_ptr=z["term_ptr"],
+                post_docs=z["post_docs"],
+                post_w=z["post_w"],
+                idf=z["idf"],
+            )
+
+    # ---------- 검색 ----------
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        n_docs = len(self.ids)
+        if n_docs == 0:
+            return []
+
+        tids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not tids:
+            return []
+
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for tid in tids:
+            s, e = self.term_ptr[tid], self.term_ptr[tid + 1]
+            # 한 term 안에서 문서 번호는 중복이 없으므로 fancy index 누적이 안전
+            scores[self.post_docs[s:e]] += self.idf[tid] * self.post_w[s:e]
+
+        k = min(int(top_k), n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    k: int = 60,
+    top_k: Optional[int] = None,
+) -> List[Tuple[str, float]]:
+    """여러 순위 리스트를 RRF(1 / (k + rank))로 합침"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking, start=1):
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (k + rank)
+    out = sorted(fused.items(), key=lambda x: x[1], reverse=True)
+    return out[:top_k] if top_k else out
@@ -0,0 +1,117 @@
+# src/app/rag/chunking.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# 경계에서 다시 토크나이즈했을 때 토큰이 1~2개 늘어나는 경우 대비
+_SAFETY_TOKENS = 2
+
+
+def _num_special_tokens(tokenizer: Any) -> int:
+    try:
+        return int(tokenizer.num_special_tokens_to_add(pair=False))
+    except Exception:
+        return 2  # [CLS] ... [SEP] / <s> ... </s>
+
+
+def token_budget(embedder: Any) -> int:
+    """
+    임베더가 실제로 보는 토큰 수 = max_seq_length - special token 수
+    (이보다 긴 입력은 인코더에서 잘려 나가므로 청크를 이 길이에 맞춘다)
+    """
+    max_len = int(getattr(embedder, "max_seq_length", 0) or 128)
+    budget = max_len - _num_special_tokens(embedder.tokenizer) - _SAFETY_TOKENS
+    return max(8, budget)
+
+
+def token_window_spans(
+    offsets: Sequence[Tuple[int, int]],
+    max_tokens: int,
+    overlap: int,
+) -> np.ndarray:
+    """
+    토큰 offset_mapping → 청크 글자 구간 [(start, end), ...] (numpy로 한 번에 계산)
+    - 각 구간은 최대 max_tokens 토큰, 이웃 구간과 overlap 토큰만큼 겹침
+    """
+    n = len(offsets)
+    if n == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    overlap = max(0, min(int(overlap), max_tokens - 1))
+    step = max_tokens - overlap
+
+    offs = np.asarray(offsets, dtype=np.int64).reshape(n, 2)
+    starts = np.arange(0, max(n - overlap, 1), step)
+    ends = np.minimum(starts + max_tokens, n)
+    return np.stack([offs[starts, 0], offs[ends - 1, 1]], axis=1)
+
+
+def chunk_spans_by_tokens(
+    texts: List[str],
+    tokenizer: Any,
+    max_tokens: int,
+    overlap: int = 16,
+) -> List[List[Tuple[str, int, int]]]:
+    """
+    여러 텍스트(페이지/문서)를 토큰 기준으로 자른다 → 텍스트별 [(청크, start, end), ...]
+    - fast tokenizer에 리스트를 한 번에 넘겨 배치로 토크나이즈 (Rust 쪽에서 병렬 처리)
+    - offset_mapping으로 토큰 경계를 원문 위치로 되돌려 청크 문자열과 글자 구간을 만든다 (페이지 번호 매핑 등에 사용)
+    """
+    if not texts:
+        return []
+
+    enc = tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        truncation=False,
+        verbose=False,  # "sequence length is longer than ..." 경고 억제
+    )
+
+    out: List[List[Tuple[str, int, int]]] = []
+    for text, offsets in zip(texts, enc["offset_mapping"]):
+        chunks: List[Tuple[str, int, int]] = []
+        for start, end in token_window_spans(offsets, max_tokens, overlap).tolist():
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append((chunk, start, end))
+        out.append(chunks)
+    return out
+
+
+def truncation_report(
+    chunks: List[str],
+    tokenizer: Any,
+    max_seq_length: int,
+) -> Dict[str, Any]:
+    """
+    (기존 글자 단위) 청크가 인코더에서 몇 토큰씩 잘려 나가는지 계산
+    반환: 요약 + per_chunk = [(토큰 수, 잘린 토큰 수), ...]
+    """
+    if not chunks:
+        return {"chunks": 0, "truncated_chunks": 0, "truncated_tokens": 0, "per_chunk": []}
+
+    enc = tokenizer(
+        list(chunks),
+        add_special_tokens=True,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        truncation=False,
+        verbose=False,
+    )
+    lengths = np.fromiter((len(ids) for ids in enc["input_ids"]), dtype=np.int64, count=len(chunks))
+    cut = np.maximum(lengths - int(max_seq_length), 0)
+
+    return {
+        "chunks": int(len(chunks)),
+        "max_seq_length": int(max_seq_length),
+        "truncated_chunks": int((cut > 0).sum()),
+        "truncated_tokens": int(cut.sum()),
+        "total_tokens": int(lengths.sum()),
+        "truncated_ratio": float(cut.sum() / max(1, lengths.sum())),
+        "per_chunk": list(zip(lengths.tolist(), cut.tolist())),
+    }
@@ -0,0 +1,223 @@
+# src/app/rag/dedup.py
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 128개 해시 = 16 band × 8 row → Jaccard 약 0.7부터 후보로 잡힘, 최종 판정은 threshold로
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_CHARS = 5
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WS = re.compile(r"\s+")
+
+
+def _shingle_hashes(text: str, k: int = SHINGLE_CHARS) -> np.ndarray:
+    """
+    글자 k-gram 집합의 crc32 해시
+    - 한국어는 띄어쓰기가 들쭉날쭉해서 단어 대신 글자 단위, 공백/대소문자는 정규화
+    """
+    text = _WS.sub(" ", text).strip().lower()
+    if len(text) <= k:
+        grams = {text}
+    else:
+        grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+class MinHasher:
+    """(a*h + b) mod (2^61-1) 순열 NUM_PERM개의 최솟값 → uint32 서명"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1) -> None:
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        h = _shingle_hashes(text)
+        # uint64 곱셈은 넘치면 그대로 wrap (해시 용도라 상관없음)
+        phv = ((h[:, None] * self._a + self._b) % _MERSENNE) & _MAX_HASH
+        return phv.min(axis=0).astype(np.uint32)
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+class NearDupIndex:
+    """
+    색인 시점 준중복 청크 제거용 MinHash LSH 인덱스
+
+    - 색인된(대표) 청크마다 서명을 보관하고, band(16개) 중 하나라도 같으면 후보
+      → 후보와의 추정 Jaccard가 threshold 이상이면 중복으로 보고 임베딩/저장 생략
+    - 중복 청크는 links(중복 id → (대표 id, "파일 p.페이지"))로 기록
+      → 대표 청크 metadata의 dup_sources / dup_count로 노출
+    - path가 있으면 npz 1개로 저장해서 증분 색인(바뀐 PDF만)에서도 이전 청크와 비교
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        threshold: float = 0.85,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})은 bands({bands})로 나누어떨어져야 합니다.")
+        self.path = Path(path) if path is not None else None
+        self.threshold = float(threshold)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.reset()
+
+        self.checked = 0
+        self.duplicates = 0
+        self.dup_chars = 0
+
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def reset(self) -> None:
+        self._sigs: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(self.bands)]
+        self._links: Dict[str, Tuple[str, str]] = {}
+        self._dups: Dict[str, Set[str]] = defaultdict(set)
+
+    # ---------- LSH ----------
+    def _band_keys(self, sig: np.ndarray) -> List[bytes]:
+        return [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.hasher.signature(text)
+
+    def find(self, sig: np.ndarray) -> Optional[Tuple[str, float]]:
+        """threshold 이상인 가장 비슷한 대표 청크 (id, 추정 Jaccard), 없으면 None"""
+        cands: Set[str] = set()
+        for b, key in enumerate(self._band_keys(sig)):
+            cands.update(self._buckets[b].get(key, ()))
+        best: Optional[Tuple[str, float]] = None
+        for cid in cands:
+            sim = estimate_jaccard(sig, self._sigs[cid])
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (cid, sim)
+        return best
+
+    def add(self, cid: str, sig: np.ndarray) -> None:
+        if cid in self._sigs:
+            self._remove_kept(cid)
+        self._sigs[cid] = sig
+        for b, key in enumerate(self._band_keys(sig)):
+            self._buckets[b][key].append(cid)
+
+    def check(self, cid: str, text: str, label: str) -> Optional[str]:
+        """
+        text가 기존 대표 청크의 준중복이면 링크를 남기고 대표 id 반환,
+        아니면 cid를 대표로 등록하고 None
+        """
+        sig = self.signature(text)
+        self.checked += 1
+        hit = self.find(sig)
+        if hit is None:
+            self.add(cid, sig)
+            return None
+        kept = hit[0]
+        self._links[cid] = (kept, label)
+        self._dups[kept].add(cid)
+        self.duplicates += 1
+        self.dup_chars += len(text)
+        return kept
+
+    def duplicate_labels(self, kept: str) -> List[str]:
+        return sorted(self._links[d][1] for d in self._dups.get(kept, ()))
+
+    def linked_ids(self) -> List[str]:
+        """중복 링크가 하나 이상 있는 대표 청크 id"""
+        return sorted(k for k, d in self._dups.items() if d)
+
+    # ---------- 파일 단위 정리 ----------
+    def _remove_kept(self, cid: str) -> None:
+        sig = self._sigs.pop(cid)
+        for b, key in enumerate(self._band_keys(sig)):
+            bucket = self._buckets[b].get(key)
+            if bucket is not None and cid in bucket:
+                bucket.remove(cid)
+                if not bucket:
+                    del self._buckets[b][key]
+
+    def remove_source(self, prefix: str) -> Tuple[Set[str], Set[str]]:
+        """
+        id가 prefix로 시작하는 청크(= 한 PDF)를 인덱스에서 제거
+        반환: (dup 링크가 빠져서 metadata를 다시 써야 하는 다른 대표 id들,
+               이 PDF의 대표 청크를 가리키던 중복 청크 id들 → 그 PDF는 다시 색인해야 함)
+        """
+        refresh: Set[str] = set()
+        orphans: Set[str] = set()
+
+        for cid in [c for c in self._sigs if c.startswith(prefix)]:
+            self._remove_kept(cid)
+            for d in self._dups.pop(cid, ()):
+                self._links.pop(d, None)
+                if not d.startswith(prefix):
+                    orphans.add(d)
+
+        for d in [d for d in self._links if d.startswith(prefix)]:
+            kept, _ = self._links.pop(d)
+            dups = self._dups.get(kept)
+            if dups is not None:
+                dups.discard(d)
+                if not dups:
+                    del self._dups[kept]
+            if not kept.startswith(prefix):
+                refresh.add(kept)
+        return refresh, orphans
+
+    # ---------- 저장 ----------
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ids = list(self._sigs)
+        sigs = np.stack([self._sigs[c] for c in ids]) if ids else np.zeros((0, self.bands * self.rows), np.uint32)
+        dup_ids = list(self._links)
+        tmp = self.path.with_name(self.path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            ids=np.array(ids, dtype=str),
+            sigs=sigs,
+            dup_ids=np.array(dup_ids, dtype=str),
+            dup_kept=np.array([self._links[d][0] for d in dup_ids], dtype=str),
+            dup_labels=np.array([self._links[d][1] for d in dup_ids], dtype=str),
+        )
+        tmp.replace(self.path)
+
+    def _load(self) -> None:
+        with np.load(self.path, allow_pickle=False) as z:
+            if z["sigs"].shape[1:] != (self.bands * self.rows,):
+                return  # 해시 설정이 바뀐 파일 → 빈 인덱스로 시작 (index_params가 바뀌어 전체 재색인됨)
+            for cid, sig in zip(z["ids"].tolist(), z["sigs"]):
+                self.add(cid, sig.copy())
+            for d, kept, label in zip(z["dup_ids"].tolist(), z["dup_kept"].tolist(), z["dup_labels"].tolist()):
+                self._links[d] = (kept, label)
+                self._dups[kept].add(d)
+
+    def stats(self, dim: Optional[int] = None) -> Dict[str, Any]:
+        """이번 실행에서 건너뛴 중복 수 / 절약한 텍스트·벡터 크기 (dim: 임베딩 차원)"""
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "dup_ratio": self.duplicates / self.checked if self.checked else 0.0,
+            "saved_text_kb": self.dup_chars / 1024,
+            "saved_vector_kb": self.duplicates * dim * 4 / 1024 if dim else None,
+            "kept_total": len(self._sigs),
+            "links_total": len(self._links),
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,299 @@
+# src/app/rag/embed_cache.py
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# SQLite 바인딩 변수 개수 제한(구버전 999)을 넘지 않도록 IN (...) 을 나눠서 조회
+_SQL_CHUNK = 500
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    디스크 임베딩 캐시 (모델 1개 + normalize 설정 1개 단위)
+
+    - 인덱스: SQLite  (model, normalize, sha256(text)) → slot, last_used
+    - 벡터  : slot 번호로 접근하는 memory-mapped 행렬 파일 (float32 / float16)
+    - 용량  : max_bytes 를 넘으면 가장 오래 안 쓴 항목의 slot을 재사용 (LRU)
+
+    같은 텍스트를 다시 임베딩할 때(--rebuild 등) 모델 forward 없이 I/O만 발생한다.
+    쓰기는 한 프로세스(색인 작업)에서 하는 것을 전제로 한다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        model_name: str,
+        normalize: bool = False,
+        dtype: str = "float32",
+        max_bytes: int = 1 << 30,
+    ) -> None:
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"지원하지 않는 dtype: {dtype}")
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.normalize = int(bool(normalize))
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = int(max_bytes)
+
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.matrix_path = self.cache_dir / f"{safe}-n{self.normalize}.{dtype}.bin"
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " model TEXT NOT NULL, normalize INTEGER NOT NULL, text_hash TEXT NOT NULL,"
+            " slot INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, normalize, text_hash))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_lru ON entries (model, normalize, last_used)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS matrices ("
+            " model TEXT NOT NULL, normalize INTEGER NOT NULL,"
+            " dim INTEGER NOT NULL, dtype TEXT NOT NULL, next_slot INTEGER NOT NULL,"
+            " PRIMARY KEY (model, normalize))"
+        )
+        self._db.commit()
+
+        self.dim: Optional[int] = None
+        self._next_slot = 0
+        self._mm: Optional[np.memmap] = None
+
+        row = self._db.execute(
+            "SELECT dim, dtype, next_slot FROM matrices WHERE model=? AND normalize=?",
+            (self.model_name, self.normalize),
+        ).fetchone()
+        if row is not None:
+            dim, stored_dtype, next_slot = row
+            if stored_dtype != dtype or not self.matrix_path.exists():
+                # 저장 형식이 바뀌었거나 행렬 파일이 사라졌으면 인덱스도 버림
+                self._clear()
+            else:
+                self.dim = int(dim)
+                self._next_slot = int(next_slot)
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 내부 유틸 ----------
+    def _key(self) -> Tuple[str, int]:
+        return (self.model_name, self.normalize)
+
+    def _clear(self) -> None:
+        self._db.execute("DELETE FROM entries WHERE model=? AND normalize=?", self._key())
+        self._db.execute("DELETE FROM matrices WHERE model=? AND normalize=?", self._key())
+        self._db.commit()
+        self._mm = None
+        if self.matrix_path.exists():
+            self.matrix_path.unlink()
+        self.dim = None
+        self._next_slot = 0
+
+    @property
+    def capacity(self) -> int:
+        if not self.dim:
+            return 0
+        return max(1, self.max_bytes // (self.dim * self.dtype.itemsize))
+
+    def _rows_on_disk(self) -> int:
+        if not self.dim or not self.matrix_path.exists():
+            return 0
+        return self.matrix_path.stat().st_size // (self.dim * self.dtype.itemsize)
+
+    def _matrix(self, min_rows: int = 0) -> np.memmap:
+        """필요하면 파일을 늘린 뒤 memmap 반환 (한 번에 두 배씩 늘림)"""
+        assert self.dim is not None
+        rows = self._rows_on_disk()
+        if self._mm is None or rows < min_rows:
+            if rows < min_rows:
+                new_rows = min(self.capacity, max(min_rows, rows * 2, 1024))
+                self._mm = None
+                with open(self.matrix_path, "ab") as f:
+                    f.truncate(new_rows * self.dim * self.dtype.itemsize)
+                rows = new_rows
+            self._mm = np.memmap(self.matrix_path, dtype=self.dtype, mode="r+", shape=(rows, self.dim))
+        return self._mm
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        uniq = list(dict.fromkeys(hashes))
+        for i in range(0, len(uniq), _SQL_CHUNK):
+            part = uniq[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(part))
+            rows = self._db.execute(
+                f"SELECT text_hash, slot FROM entries WHERE model=? AND normalize=? AND text_hash IN ({marks})",
+                (*self._key(), *part),
+            ).fetchall()
+            found.update({h: int(s) for h, s in rows})
+        return found
+
+    # ---------- 조회 / 저장 ----------
+    def get_many(self, texts: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        반환: ({texts 인덱스: 벡터}, 캐시에 없는 texts 인덱스 리스트)
+        """
+        hashes = [text_sha256(t) for t in texts]
+        with self._lock:
+            if self.dim is None:
+                self.misses += len(texts)
+                return {}, list(range(len(texts)))
+
+            found = self._lookup(hashes)
+            hit_idx = [i for i, h in enumerate(hashes) if h in found]
+            miss_idx = [i for i, h in enumerate(hashes) if h not in found]
+
+            vectors: Dict[int, np.ndarray] = {}
+            if hit_idx:
+                mm = self._matrix()
+                slots = np.fromiter((found[hashes[i]] for i in hit_idx), dtype=np.int64, count=len(hit_idx))
+                block = np.asarray(mm[slots], dtype=np.float32)
+                vectors = {i: block[k] for k, i in enumerate(hit_idx)}
+
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE entries SET last_used=? WHERE model=? AND normalize=? AND text_hash=?",
+                    [(now, *self._key(), h) for h in {hashes[i] for i in hit_idx}],
+                )
+                self._db.commit()
+
+            self.hits += len(hit_idx)
+            self.misses += len(miss_idx)
+            return vectors, miss_idx
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+        if vectors.ndim != 2 or vectors.shape[0] != len(texts):
+            raise ValueError("texts와 vectors 개수가 맞지 않습니다.")
+
+        with self._lock:
+            if self.dim is not None and self.dim != vectors.shape[1]:
+                # 같은 이름으로 다른 차원의 모델이 들어온 경우 → 캐시 초기화
+                self._clear()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._next_slot = 0
+
+            # 배치 안 중복 + 이미 캐시에 있는 항목 제외
+            by_hash: Dict[str, int] = {}
+            for i, t in enumerate(texts):
+                by_hash[text_sha256(t)] = i
+            existing = self._lookup(list(by_hash.keys()))
+            new_items = [(h, i) for h, i in by_hash.items() if h not in existing]
+            if not new_items:
+                return
+
+            cap = self.capacity
+            new_items = new_items[-cap:]
+            n_new = len(new_items)
+
+            # 1) 아직 안 쓴 slot부터 사용
+            n_fresh = min(n_new, cap - self._next_slot)
+            slots = list(range(self._next_slot, self._next_slot + n_fresh))
+            self._next_slot += n_fresh
+
+            # 2) 모자라면 가장 오래 안 쓴 항목을 내보내고 그 slot 재사용
+            n_evict = n_new - n_fresh
+            if n_evict > 0:
+                victims = self._db.execute(
+                    "SELECT text_hash, slot FROM entries WHERE model=? AND normalize=?"
+                    " ORDER BY last_used LIMIT ?",
+                    (*self._key(), n_evict),
+                ).fetchall()
+                self._db.executemany(
+                    "DELETE FROM entries WHERE model=? AND normalize=? AND text_hash=?",
+                    [(*self._key(), h) for h, _ in victims],
+                )
+                slots.extend(int(s) for _, s in victims)
+
+            mm = self._matrix(min_rows=max(slots) + 1)
+            slot_arr = np.asarray(slots, dtype=np.int64)
+            mm[slot_arr] = vectors[[i for _, i in new_items]].astype(self.dtype)
+            mm.flush()
+
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO entries (model, normalize, text_hash, slot, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(*self._key(), h, s, now) for (h, _), s in zip(new_items, slots)],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO matrices (model, normalize, dim, dtype, next_slot)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (*self._key(), self.dim, self.dtype.name, self._next_slot),
+            )
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute(
+                "SELECT COUNT(*) FROM entries WHERE model=? AND normalize=?", self._key()
+            ).fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": int(entries),
+            "capacity": self.capacity,
+            "bytes": int(entries) * (self.dim or 0) * self.dtype.itemsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._mm = None
+            self._db.close()
+
+
+def encode_with_cache(
+    embedder: Any,
+    texts: List[str],
+    cache: Optional[EmbeddingCache],
+    **encode_kwargs: Any,
+) -> np.ndarray:
+    """
+    embedder.encode(texts) 와 같은 결과(float32 행렬)를 반환하되,
+    캐시에 있는 텍스트는 건너뛰고 나머지만 실제로 인코딩한다.
+    """
+    if cache is None:
+        return np.asarray(embedder.encode(texts, **encode_kwargs), dtype=np.float32)
+    if not texts:
+        return np.zeros((0, cache.dim or 0), dtype=np.float32)
+
+    cached, miss_idx = cache.get_many(texts)
+
+    fresh: Optional[np.ndarray] = None
+    if miss_idx:
+        fresh = np.asarray(
+            embedder.encode([texts[i] for i in miss_idx], **encode_kwargs),
+            dtype=np.float32,
+        )
+        cache.put_many([texts[i] for i in miss_idx], fresh)
+
+    dim = fresh.shape[1] if fresh is not None else next(iter(cached.values())).shape[0]
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    for i, vec in cached.items():
+        out[i] = vec
+    if fresh is not None:
+        out[miss_idx] = fresh
+    return out
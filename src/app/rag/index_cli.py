@@ -3,16 +3,117 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from src.app.rag.pipeline import index_pdfs
+from src.app.rag.pipeline import (
+    chunk_truncation_report,
+    export_rag_snapshot,
+    get_rag_embedder,
+    get_rag_store,
+    index_pdfs,
+)
+
+
+def _int_list(raw: str):
+    return [int(x) for x in raw.split(",") if x.strip()]
+
+
+def _print_tune_table(rows, top_k: int):
+    print(f"{'backend':8} {'M':>4} {'c_ef':>5} {'s_ef':>5} {'recall@' + str(top_k):>10} "
+          f"{'p50(ms)':>8} {'p99(ms)':>8} {'build(s)':>9}")
+    for r in rows:
+        print(f"{r['backend']:8} {r['M'] or '-':>4} {r['construction_ef'] or '-':>5} {r['search_ef'] or '-':>5} "
+              f"{r['recall']:>10.4f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['build_s']:>9.1f}")
+
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--pdf_dir", type=str, default="data/pdfs")
     ap.add_argument("--rebuild", action="store_true")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="PDF 텍스트 추출 프로세스 수 (기본: RAG_INDEX_WORKERS 또는 1)")
+    ap.add_argument("--truncation-report", action="store_true",
+                    help="색인 대신, 기존 800자 청크가 임베더에서 몇 토큰씩 잘리는지 출력")
+    ap.add_argument("--tune", action="store_true",
+                    help="색인 대신, 현재 컬렉션으로 HNSW 파라미터별 recall@k / p50 / p99 측정 (정답: NumPy 정확 검색)")
+    ap.add_argument("--tune-queries", type=str, default=None,
+                    help="질의 파일 (한 줄에 질의 1개). 없으면 청크 앞부분을 샘플링")
+    ap.add_argument("--tune-samples", type=int, default=200)
+    ap.add_argument("--tune-k", type=int, default=10)
+    ap.add_argument("--tune-m", type=str, default="16,32")
+    ap.add_argument("--tune-construction-ef", type=str, default="100,200")
+    ap.add_argument("--tune-search-ef", type=str, default="10,50,100")
+    ap.add_argument("--quantize-check", action="store_true",
+                    help="색인 대신, fp32 vs int8 임베더의 cosine 일치도 / recall@k / 인코딩 처리량 / 크기 비교")
+    ap.add_argument("--quantize-samples", type=int, default=500,
+                    help="--quantize-check에 쓸 청크 수 (질의는 이 중 200개의 앞부분)")
+    ap.add_argument("--export-snapshot", action="store_true",
+                    help="색인 후 읽기 전용 스냅샷 번들(mmap)을 내보냄 → 서버는 RAG_BACKEND=snapshot으로 서빙")
+    ap.add_argument("--snapshot-only", action="store_true",
+                    help="색인 없이 현재 저장소를 스냅샷으로만 내보냄")
+    ap.add_argument("--snapshot-dir", type=str, default=None,
+                    help="스냅샷 출력 디렉토리 (기본: <rag_db_dir>/snapshot/<collection>)")
     args = ap.parse_args()
 
-    out = index_pdfs(Path(args.pdf_dir), rebuild=args.rebuild)
+    if args.quantize_check:
+        import random
+
+        from src.app.config.settings import settings
+        from src.app.embedding.quantize import quantization_report
+        from src.app.rag.tuning import _load_corpus, sample_queries
+
+        _, docs, _ = _load_corpus(get_rag_store())
+        docs = [d for d in docs if d.strip()]
+        if not docs:
+            print("[QUANT] 저장소가 비어 있습니다. 먼저 색인하세요.")
+            return
+        docs = random.Random(0).sample(docs, min(args.quantize_samples, len(docs)))
+        print(quantization_report(
+            settings.rag_embedding_model_name,
+            docs,
+            sample_queries(docs, 200),
+            cache_dir=settings.rag_quantized_model_dir,
+        ))
+        return
+
+    snapshot_dir = Path(args.snapshot_dir) if args.snapshot_dir else None
+    if args.snapshot_only:
+        print(export_rag_snapshot(snapshot_dir))
+        return
+
+    if args.tune:
+        from src.app.rag.tuning import tune_hnsw
+
+        queries = None
+        if args.tune_queries:
+            lines = Path(args.tune_queries).read_text(encoding="utf-8").splitlines()
+            queries = [q.strip() for q in lines if q.strip()]
+        rows = tune_hnsw(
+            get_rag_store(),
+            get_rag_embedder(),
+            queries=queries,
+            top_k=args.tune_k,
+            m_values=_int_list(args.tune_m),
+            construction_efs=_int_list(args.tune_construction_ef),
+            search_efs=_int_list(args.tune_search_ef),
+            n_samples=args.tune_samples,
+        )
+        _print_tune_table(rows, args.tune_k)
+        return
+
+    if args.truncation_report:
+        rep = chunk_truncation_report(Path(args.pdf_dir), workers=args.workers or 1)
+        for f in rep.pop("files"):
+            print(f"[{f['source']}] chunks={f['chunks']} truncated_chunks={f['truncated_chunks']} "
+                  f"truncated_tokens={f['truncated_tokens']}")
+            for idx, (n_tok, n_cut) in enumerate(f["per_chunk"]):
+                if n_cut:
+                    print(f"  chunk {idx}: {n_tok} tokens, {n_cut} truncated")
+        print(rep)
+        return
+
+    out = index_pdfs(Path(args.pdf_dir), rebuild=args.rebuild, workers=args.workers)
     print(out)
+    if args.export_snapshot and out.get("ok") and not out.get("snapshot"):
+        print(export_rag_snapshot(snapshot_dir))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,104 @@
+# src/app/rag/manifest.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """큰 PDF도 메모리에 다 올리지 않도록 블록 단위로 해시"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class IndexManifest:
+    """
+    index_pdfs 증분 색인용 매니페스트 (JSON 파일 1개)
+
+    - params: 청크 설정 / 임베딩 모델 등 (바뀌면 전체 재색인 필요)
+    - files : {파일명: {"sha256", "size", "mtime_ns", "chunk_ids"}}
+
+    size/mtime이 그대로면 해시 계산도 생략하고,
+    달라졌을 때만 sha256으로 실제 변경 여부를 확인한다.
+    """
+
+    def __init__(self, path: Path, data: Optional[Dict[str, Any]] = None) -> None:
+        self.path = Path(path)
+        data = data or {}
+        self.params: Dict[str, Any] = dict(data.get("params") or {})
+        self.files: Dict[str, Dict[str, Any]] = dict(data.get("files") or {})
+
+    @classmethod
+    def load(cls, path: Path) -> "IndexManifest":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            # 깨진 매니페스트는 없는 것으로 보고 전체 재색인
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        payload = {
+            "version": MANIFEST_VERSION,
+            "params": self.params,
+            "files": self.files,
+        }
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        # 중간에 죽어도 이전 매니페스트가 깨지지 않도록 교체 방식으로 저장
+        os.replace(tmp, self.path)
+
+    def reset(self, params: Dict[str, Any]) -> None:
+        self.params = dict(params)
+        self.files = {}
+
+    # ---------- 파일 단위 조회/갱신 ----------
+    def names(self) -> List[str]:
+        return list(self.files.keys())
+
+    def chunk_ids(self, name: str) -> List[str]:
+        entry = self.files.get(name) or {}
+        return list(entry.get("chunk_ids") or [])
+
+    def stat_matches(self, name: str, st: os.stat_result) -> bool:
+        entry = self.files.get(name)
+        if not entry:
+            return False
+        return entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+
+    def hash_matches(self, name: str, sha256: str) -> bool:
+        entry = self.files.get(name)
+        return bool(entry) and entry.get("sha256") == sha256
+
+    def touch(self, name: str, st: os.stat_result) -> None:
+        """내용은 같고 mtime만 바뀐 경우 stat 정보만 갱신"""
+        entry = self.files.get(name)
+        if entry is not None:
+            entry["size"] = st.st_size
+            entry["mtime_ns"] = st.st_mtime_ns
+
+    def set_file(self, name: str, sha256: str, st: os.stat_result, chunk_ids: List[str]) -> None:
+        self.files[name] = {
+            "sha256": sha256,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "chunk_ids": list(chunk_ids),
+        }
+
+    def remove_file(self, name: str) -> List[str]:
+        entry = self.files.pop(name, None) or {}
+        return list(entry.get("chunk_ids") or [])
@@ -0,0 +1,114 @@
+# src/app/rag/page_cache.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 추출 방식(페이지 텍스트 결과)이 바뀌면 올림 → 이전 캐시는 자동으로 무시됨
+EXTRACTOR_REVISION = 1
+
+
+def extractor_version() -> str:
+    try:
+        import pypdf
+
+        lib = f"pypdf-{pypdf.__version__}"
+    except Exception:
+        lib = "pypdf-unknown"
+    return f"{lib}/r{EXTRACTOR_REVISION}"
+
+
+class PageTextCache:
+    """
+    PDF 페이지 텍스트 캐시 (SQLite 1개 파일)
+
+    - 키: (파일 sha256, 추출기 버전, 페이지 번호) → zlib 압축 UTF-8 텍스트
+    - docs 테이블에 페이지 수를 기록해서 "파일 전체가 캐시에 있음"을 확인
+      → 청크 크기 / overlap만 바꾼 재색인은 PDF 파싱을 완전히 건너뜀
+    - 같은 PDF가 이름만 바뀌어도 해시가 같으면 그대로 재사용
+    """
+
+    def __init__(self, path: Path, extractor: Optional[str] = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.extractor = extractor or extractor_version()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                file_sha TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                n_pages INTEGER NOT NULL,
+                PRIMARY KEY (file_sha, extractor)
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                file_sha TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                text BLOB NOT NULL,
+                PRIMARY KEY (file_sha, extractor, page)
+            );
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_pages(self, file_sha: str) -> Optional[List[str]]:
+        """캐시에 파일 전체 페이지가 있으면 페이지 텍스트 리스트, 아니면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT n_pages FROM docs WHERE file_sha = ? AND extractor = ?",
+                (file_sha, self.extractor),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            rows = self._conn.execute(
+                "SELECT page, text FROM pages WHERE file_sha = ? AND extractor = ? ORDER BY page",
+                (file_sha, self.extractor),
+            ).fetchall()
+            if len(rows) != row[0]:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [zlib.decompress(blob).decode("utf-8") for _, blob in rows]
+
+    def put_pages(self, file_sha: str, pages: List[str]) -> None:
+        blobs = [(file_sha, self.extractor, i, zlib.compress(t.encode("utf-8"), 6)) for i, t in enumerate(pages)]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM pages WHERE file_sha = ? AND extractor = ?", (file_sha, self.extractor),
+            )
+            self._conn.executemany(
+                "INSERT INTO pages (file_sha, extractor, page, text) VALUES (?, ?, ?, ?)", blobs,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO docs (file_sha, extractor, n_pages) VALUES (?, ?, ?)",
+                (file_sha, self.extractor, len(pages)),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n_docs, = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+            n_pages, n_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0) FROM pages"
+            ).fetchone()
+        return {
+            "extractor": self.extractor,
+            "docs": n_docs,
+            "pages": n_pages,
+            "compressed_mb": n_bytes / (1024 * 1024),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
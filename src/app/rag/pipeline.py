@@ -2,20 +2,42 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
-import chromadb
-from chromadb import PersistentClient
 from sentence_transformers import SentenceTransformer
 
 from src.app.config.settings import settings
+from src.app.embedding.quantize import cache_model_name
+from src.app.embedding.registry import get_shared_embedder
+from src.app.embedding.query_cache import encode_queries
+from src.app.rag.bm25 import BM25Index, reciprocal_rank_fusion
+from src.app.rag.chunking import chunk_spans_by_tokens, token_budget, truncation_report
+from src.app.rag.dedup import BANDS, NUM_PERM, NearDupIndex
+from src.app.rag.embed_cache import EmbeddingCache, encode_with_cache
+from src.app.rag.manifest import IndexManifest, file_sha256
+from src.app.rag.page_cache import PageTextCache
+from src.app.rag.rerank import CrossEncoderReranker
+from src.app.rag.result_cache import SemanticResultCache
+from src.app.vectorstore.base import VectorHit, VectorStore
+from src.app.vectorstore.factory import open_vector_store
+from src.app.vectorstore.snapshot_store import export_snapshot
 
 
 # ---------- globals ----------
-_rag_client: Optional[PersistentClient] = None
+_rag_store: Optional[VectorStore] = None
+_rag_index_store: Optional[VectorStore] = None
 _rag_embedder: Optional[SentenceTransformer] = None
+_rag_embed_cache: Optional[EmbeddingCache] = None
+_rag_bm25: Optional[BM25Index] = None
+_rag_bm25_mtime: Optional[int] = None
+_rag_result_cache: Optional[SemanticResultCache] = None
+_rag_reranker: Optional[CrossEncoderReranker] = None
+_rag_page_cache: Optional[PageTextCache] = None
 
 
 def get_rag_db_dir() -> Path:
@@ -29,36 +51,172 @@ def get_rag_collection_name() -> str:
     return getattr(settings, "rag_collection_name", "course_rag")
 
 
-def get_rag_client() -> PersistentClient:
-    global _rag_client
-    if _rag_client is None:
-        db_dir = get_rag_db_dir()
-        db_dir.mkdir(parents=True, exist_ok=True)
-        _rag_client = chromadb.PersistentClient(path=str(db_dir))
-    return _rag_client
+def _open_rag_store(backend: str) -> VectorStore:
+    return open_vector_store(
+        backend,
+        get_rag_db_dir(),
+        get_rag_collection_name(),
+        space="cosine",
+        numpy_dtype=settings.rag_numpy_dtype,
+        hnsw=settings.hnsw_params(),
+    )
+
+
+def get_rag_store() -> VectorStore:
+    """settings.rag_backend(chroma | numpy | snapshot)에 맞는 RAG 벡터 저장소 (검색용)"""
+    global _rag_store
+    if _rag_store is None:
+        _rag_store = _open_rag_store(settings.rag_backend)
+    return _rag_store
+
+
+def _index_backend() -> str:
+    # snapshot은 읽기 전용 → 색인은 원본 저장소에 하고 스냅샷을 다시 내보낸다
+    if settings.rag_backend == "snapshot":
+        return settings.rag_snapshot_source
+    return settings.rag_backend
 
 
-def get_rag_collection():
-    client = get_rag_client()
-    return client.get_or_create_collection(
-        name=get_rag_collection_name(),
-        metadata={"hnsw:space": "cosine"},
+def get_rag_index_store() -> VectorStore:
+    """색인(쓰기)용 저장소 (rag_backend=snapshot이 아니면 get_rag_store()와 같음)"""
+    global _rag_index_store
+    if settings.rag_backend != "snapshot":
+        return get_rag_store()
+    if _rag_index_store is None:
+        _rag_index_store = _open_rag_store(_index_backend())
+    return _rag_index_store
+
+
+def get_rag_snapshot_dir() -> Path:
+    # open_vector_store("snapshot", ...)가 읽는 위치와 같아야 함
+    return get_rag_db_dir() / "snapshot" / get_rag_collection_name()
+
+
+def export_rag_snapshot(out_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    색인 저장소 전체를 읽기 전용 스냅샷 번들로 내보냄 (기본: get_rag_snapshot_dir())
+    - embeddings.npy(mmap) + id/본문/metadata UTF-8 blob과 offset 테이블 + manifest.json
+    - 서버는 RAG_BACKEND=snapshot으로 이 번들을 mmap해서 바로 검색
+    """
+    out_dir = Path(out_dir) if out_dir is not None else get_rag_snapshot_dir()
+    manifest = export_snapshot(
+        get_rag_index_store(),
+        out_dir,
+        space="cosine",
+        info={
+            "collection": get_rag_collection_name(),
+            "embedding_model": get_rag_embedder_key(),
+            "source_backend": _index_backend(),
+        },
     )
+    return {"path": str(out_dir), **manifest}
 
 
 def get_rag_embedder() -> SentenceTransformer:
+    """
+    RAG 임베더 (프로세스 전역 레지스트리에서 가져옴)
+    - 메모리 저장소(get_mem_embedder)와 설정이 같으면 같은 인스턴스 → 가중치 1벌
+    - settings.embed_batching이면 MicroBatcher 프록시 (동시 질의 encode를 한 배치로)
+    """
     global _rag_embedder
     if _rag_embedder is None:
         # 이미 settings에 멀티링구얼 임베더명이 있다고 했으니 재사용
-        _rag_embedder = SentenceTransformer(settings.rag_embedding_model_name)
+        _rag_embedder = get_shared_embedder(
+            settings.rag_embedding_model_name,
+            device=settings.rag_embedder_device,
+            quantize=settings.rag_embedder_quantize,
+            cache_dir=settings.rag_quantized_model_dir,
+            user="rag",
+            batching=settings.embed_batching,
+            max_wait_ms=settings.embed_batch_max_wait_ms,
+            max_batch=settings.embed_batch_max_size,
+            workers=settings.embed_workers,
+            threads_per_worker=settings.embed_worker_threads,
+        )
     return _rag_embedder
 
 
+def get_rag_embedder_key() -> str:
+    """질의 LRU / 디스크 임베딩 캐시 키 (양자화 모드별로 분리)"""
+    return cache_model_name(settings.rag_embedding_model_name, settings.rag_embedder_quantize)
+
+
+def get_rag_embed_cache() -> Optional[EmbeddingCache]:
+    """색인용 임베딩 디스크 캐시 (settings.rag_embed_cache=False면 None)"""
+    global _rag_embed_cache
+    if not settings.rag_embed_cache:
+        return None
+    if _rag_embed_cache is None:
+        _rag_embed_cache = EmbeddingCache(
+            settings.rag_embed_cache_dir or get_rag_db_dir() / "embed_cache",
+            model_name=get_rag_embedder_key(),
+            normalize=False,  # encode() 기본값과 동일
+            dtype=settings.rag_embed_cache_dtype,
+            max_bytes=settings.rag_embed_cache_max_mb * 1024 * 1024,
+        )
+    return _rag_embed_cache
+
+
+def get_bm25_path() -> Path:
+    return get_rag_db_dir() / "bm25_index.npz"
+
+
+def get_rag_bm25() -> Optional[BM25Index]:
+    """
+    index_pdfs가 만든 BM25 인덱스 (없으면 None)
+    파일 mtime이 바뀌면(재색인) 다시 로드한다.
+    """
+    global _rag_bm25, _rag_bm25_mtime
+    path = get_bm25_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _rag_bm25 is None or mtime != _rag_bm25_mtime:
+        _rag_bm25 = BM25Index.load(path)
+        _rag_bm25_mtime = mtime
+    return _rag_bm25
+
+
+def get_rag_result_cache() -> SemanticResultCache:
+    global _rag_result_cache
+    if _rag_result_cache is None:
+        _rag_result_cache = SemanticResultCache(
+            max_items=settings.rag_result_cache_size,
+            ttl_s=settings.rag_result_cache_ttl_s,
+            max_distance=settings.rag_result_cache_max_distance,
+        )
+    return _rag_result_cache
+
+
+def get_rag_reranker() -> CrossEncoderReranker:
+    global _rag_reranker
+    if _rag_reranker is None:
+        _rag_reranker = CrossEncoderReranker(
+            settings.rag_rerank_model,
+            device="cpu",
+            max_length=settings.rag_rerank_max_length,
+            batch_size=settings.rag_rerank_batch_size,
+        )
+    return _rag_reranker
+
+
+def get_page_cache() -> Optional[PageTextCache]:
+    """PDF 페이지 텍스트 캐시 (settings.rag_page_cache=False면 None)"""
+    global _rag_page_cache
+    if not settings.rag_page_cache:
+        return None
+    if _rag_page_cache is None:
+        _rag_page_cache = PageTextCache(settings.rag_page_cache_path or get_rag_db_dir() / "page_cache.sqlite3")
+    return _rag_page_cache
+
+
 # ---------- PDF loader ----------
-def _read_pdf_text(pdf_path: Path) -> str:
+def _read_pdf_pages(pdf_path: Path) -> List[str]:
     """
     의존성 최소화를 위해 pypdf 사용 권장.
     requirements.txt: pypdf
+    (프로세스 풀 작업 단위 → 페이지 텍스트 리스트)
     """
     from pypdf import PdfReader  # local import to avoid import-time failure
 
@@ -67,7 +225,64 @@ def _read_pdf_text(pdf_path: Path) -> str:
     for page in reader.pages:
         txt = page.extract_text() or ""
         parts.append(txt)
-    return "\n".join(parts)
+    return parts
+
+
+def _iter_pdf_pages(
+    pdf_paths: List[Path],
+    workers: int = 1,
+    shas: Optional[List[str]] = None,
+) -> Iterator[List[str]]:
+    """
+    PDF별 페이지 텍스트 리스트를 입력 순서대로 돌려준다.
+    - 페이지 캐시(파일 해시 기준)에 있으면 파싱하지 않음 → 청크 설정만 바꾼 재색인은 pypdf를 안 탐
+    - 캐시에 없는 파일만 프로세스 풀로 병렬 파싱 (pypdf는 순수 파이썬 CPU-bound)
+    - 결과가 앞서 쌓이지 않도록 동시에 띄우는 작업 수는 workers * 2 로 제한
+    shas: 이미 계산한 파일 해시 (index_pdfs의 매니페스트 확인 단계)
+    """
+    cache = get_page_cache()
+
+    def lookup(i: int, pdf_path: Path) -> Tuple[Optional[str], Optional[List[str]]]:
+        if cache is None:
+            return None, None
+        sha = shas[i] if shas is not None else file_sha256(pdf_path)
+        return sha, cache.get_pages(sha)
+
+    def store(sha: Optional[str], pages: List[str]) -> List[str]:
+        if cache is not None and sha is not None:
+            cache.put_pages(sha, pages)
+        return pages
+
+    if workers <= 1 or len(pdf_paths) <= 1:
+        for i, pdf_path in enumerate(pdf_paths):
+            sha, pages = lookup(i, pdf_path)
+            yield pages if pages is not None else store(sha, _read_pdf_pages(pdf_path))
+        return
+
+    it = enumerate(pdf_paths)
+    with ProcessPoolExecutor(max_workers=min(workers, len(pdf_paths))) as pool:
+        pending: deque = deque()
+
+        def fill() -> None:
+            while len(pending) < workers * 2:
+                nxt = next(it, None)
+                if nxt is None:
+                    return
+                sha, pages = lookup(*nxt)
+                pending.append((sha, pages if pages is not None else pool.submit(_read_pdf_pages, nxt[1])))
+
+        fill()
+        while pending:
+            sha, item = pending.popleft()
+            pages = item if isinstance(item, list) else store(sha, item.result())
+            fill()
+            yield pages
+
+
+def _iter_pdf_texts(pdf_paths: List[Path], workers: int = 1) -> Iterator[str]:
+    """PDF별 전체 텍스트를 입력 순서대로 (페이지 캐시 + 프로세스 풀, _iter_pdf_pages 참고)"""
+    for pages in _iter_pdf_pages(pdf_paths, workers=workers):
+        yield "\n".join(pages)
 
 
 # ---------- chunking ----------
@@ -79,14 +294,18 @@ def _clean_text(t: str) -> str:
 
 
 def _chunk_text(text: str, chunk_size: int = 800, overlap: int = 120) -> List[str]:
-    text = _clean_text(text)
+    return [chunk for chunk, _, _ in _chunk_text_spans(_clean_text(text), chunk_size, overlap)]
+
+
+def _chunk_text_spans(text: str, chunk_size: int = 800, overlap: int = 120) -> List[Tuple[str, int, int]]:
+    """(이미 정리된) text를 글자 단위로 자름 → [(청크, start, end), ...]"""
     if not text:
         return []
 
     # 안전장치
     overlap = max(0, min(overlap, chunk_size - 1))
     
-    chunks: List[str] = []
+    chunks: List[Tuple[str, int, int]] = []
     i = 0
     n = len(text)
 
@@ -94,7 +313,7 @@ def _chunk_text(text: str, chunk_size: int = 800, overlap: int = 120) -> List[st
         j = min(n, i + chunk_size)
         chunk = text[i:j]
         if chunk:
-            chunks.append(chunk)
+            chunks.append((chunk, i, j))
 
         # ✅ 핵심: 끝까지 도달했으면 종료
         if j >= n:
@@ -110,78 +329,548 @@ def _chunk_text(text: str, chunk_size: int = 800, overlap: int = 120) -> List[st
     return chunks
 
 
+def _chunk_pages(pages: List[str], embedder: Any) -> List[Tuple[str, int, int]]:
+    """
+    settings.rag_chunker 에 따라 PDF 1개(페이지 리스트)를 청크로 자름 → [(청크, 시작 페이지, 끝 페이지), ...]
+    - tokens: 임베더 토크나이저 기준, max_seq_length 안에 딱 맞게 (잘려 버려지는 토큰 없음)
+    - chars : 기존 800자 단위
+    - 페이지마다 정리한 뒤 "\n"으로 이어 붙이고, 청크 글자 구간으로 페이지 번호(1부터)를 찾음
+    """
+    cleaned = [(no, _clean_text(p)) for no, p in enumerate(pages, start=1)]
+    cleaned = [(no, t) for no, t in cleaned if t]
+    if not cleaned:
+        return []
 
-# ---------- indexing ----------
-def index_pdfs(pdf_dir: Path, rebuild: bool = False) -> Dict[str, Any]:
+    starts: List[int] = []
+    pos = 0
+    for _, t in cleaned:
+        starts.append(pos)
+        pos += len(t) + 1
+    text = "\n".join(t for _, t in cleaned)
+
+    if settings.rag_chunker == "tokens":
+        spans = chunk_spans_by_tokens(
+            [text],
+            embedder.tokenizer,
+            max_tokens=token_budget(embedder),
+            overlap=settings.rag_chunk_overlap_tokens,
+        )[0]
+    else:
+        spans = _chunk_text_spans(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+
+    def page_at(offset: int) -> int:
+        return cleaned[max(0, bisect_right(starts, offset) - 1)][0]
+
+    out: List[Tuple[str, int, int]] = []
+    for chunk, s, e in spans:
+        # 페이지 구분 "\n"으로 시작하는 청크는 다음 페이지부터로 봄
+        s += len(chunk) - len(chunk.lstrip())
+        out.append((chunk, page_at(s), page_at(max(s, e - 1))))
+    return out
+
+
+def chunk_truncation_report(pdf_dir: Path, workers: int = 1) -> Dict[str, Any]:
     """
-    pdf_dir 내 PDF를 읽어서 청크→임베딩→Chroma에 저장
+    글자 단위(800자) 청크가 임베더에서 몇 토큰씩 잘려 나가는지 PDF별로 집계
+    (tokens 청커로 바꾸기 전/후 비교용)
     """
-    col = get_rag_collection()
+    embedder = get_rag_embedder()
+    max_len = int(getattr(embedder, "max_seq_length", 0) or 128)
 
-    if rebuild:
-        # 컬렉션을 비우고 재색인
-        # (Chroma 버전에 따라 delete(where={}) 또는 recreate가 다를 수 있음)
-        try:
-            col.delete(where={})
-        except Exception:
-            pass
+    pdfs = sorted(pdf_dir.glob("*.pdf"))
+    files: List[Dict[str, Any]] = []
+    total_chunks = 0
+    truncated_chunks = 0
+    truncated_tokens = 0
+    total_tokens = 0
+
+    for pdf_path, raw in zip(pdfs, _iter_pdf_texts(pdfs, workers=workers)):
+        chunks = _chunk_text(raw, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+        rep = truncation_report(chunks, embedder.tokenizer, max_len)
+        files.append({
+            "source": pdf_path.name,
+            "chunks": rep["chunks"],
+            "truncated_chunks": rep["truncated_chunks"],
+            "truncated_tokens": rep["truncated_tokens"],
+            # chunk_index별 (토큰 수, 잘린 토큰 수)
+            "per_chunk": rep["per_chunk"],
+        })
+        total_chunks += rep["chunks"]
+        truncated_chunks += rep["truncated_chunks"]
+        truncated_tokens += rep["truncated_tokens"]
+        total_tokens += rep.get("total_tokens", 0)
 
+    return {
+        "max_seq_length": max_len,
+        "chunks": total_chunks,
+        "truncated_chunks": truncated_chunks,
+        "truncated_tokens": truncated_tokens,
+        "truncated_ratio": truncated_tokens / max(1, total_tokens),
+        "files": files,
+    }
+
+
+# ---------- indexing ----------
+# 청크 설정 (매니페스트에 함께 기록 → 바뀌면 전체 재색인)
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 120
+
+
+def get_index_manifest_path() -> Path:
+    return get_rag_db_dir() / "index_manifest.json"
+
+
+def get_dedup_index_path() -> Path:
+    return get_rag_db_dir() / "dedup_index.npz"
+
+
+def get_index_generation_path() -> Path:
+    return get_rag_db_dir() / "index_generation"
+
+
+def get_index_generation() -> int:
+    """
+    색인 세대 번호 (index_pdfs가 컬렉션을 바꿀 때마다 +1)
+    색인은 별도 프로세스(index_cli)에서 돌 수 있으므로 매번 파일에서 읽는다.
+    """
+    try:
+        return int(get_index_generation_path().read_text(encoding="utf-8").strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_index_generation() -> int:
+    path = get_index_generation_path()
+    gen = get_index_generation() + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(str(gen), encoding="utf-8")
+    tmp.replace(path)
+    return gen
+
+
+def _index_params() -> Dict[str, Any]:
+    return {
+        "collection": get_rag_collection_name(),
+        "backend": _index_backend(),
+        # Chroma는 HNSW 설정을 컬렉션 생성 시에만 반영 → 바뀌면 전체 재색인
+        "hnsw": (settings.hnsw_params() or None) if _index_backend() == "chroma" else None,
+        # int8 양자화 벡터는 fp32와 섞어 쓰면 안 됨 → "모델@int8" (none이면 모델 이름 그대로)
+        "embedding_model": get_rag_embedder_key(),
+        "chunker": settings.rag_chunker,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "chunk_overlap_tokens": settings.rag_chunk_overlap_tokens,
+        # 청크 metadata에 page / page_end 포함 (없던 색인은 한 번 재색인)
+        "page_metadata": True,
+        # 준중복 제거 설정이 바뀌면 남길 청크가 달라지므로 전체 재색인
+        "dedup": (
+            {"threshold": settings.rag_dedup_threshold, "num_perm": NUM_PERM, "bands": BANDS}
+            if settings.rag_dedup else None
+        ),
+    }
+
+
+def _iter_store_docs(store: VectorStore, page_size: int = 1000) -> Iterator[Tuple[str, str]]:
+    offset = 0
+    while True:
+        page = store.get(limit=page_size, offset=offset)
+        if not page:
+            return
+        yield from ((h.id, h.document or "") for h in page)
+        offset += len(page)
+
+
+def build_bm25_index(store: Optional[VectorStore] = None) -> int:
+    """저장소 전체 문서로 BM25 인덱스를 다시 만들어 디스크에 저장 → 문서 수 반환"""
+    store = store if store is not None else get_rag_store()
+    index = BM25Index.build(_iter_store_docs(store))
+    index.save(get_bm25_path())
+    return len(index)
+
+
+def _chunk_prefix(name: str) -> str:
+    return f"{name}::chunk::"
+
+
+def _refresh_dup_metadata(store: VectorStore, dedup: NearDupIndex, kept_ids: Set[str]) -> None:
+    """대표 청크 metadata의 dup_sources / dup_count를 현재 링크 기준으로 다시 씀"""
+    if not kept_ids:
+        return
+    hits = store.get(ids=sorted(kept_ids))
+    metas = []
+    for h in hits:
+        labels = dedup.duplicate_labels(h.id)
+        metas.append({**h.metadata, "dup_sources": "; ".join(labels), "dup_count": len(labels)})
+    store.update_metadatas([h.id for h in hits], metas)
+
+
+def index_pdfs(pdf_dir: Path, rebuild: bool = False, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    pdf_dir 내 PDF를 읽어서 청크→임베딩→벡터 저장소(Chroma | NumPy)에 저장
+
+    매니페스트(파일 해시 → chunk id)를 보고 바뀐 PDF만 다시 색인한다.
+    - 내용이 같은 PDF: 건너뜀
+    - 바뀐 PDF: 재임베딩 후, 더 이상 없는 chunk id는 컬렉션에서 삭제
+    - 사라진 PDF: 해당 chunk id 삭제
+    - rebuild=True 이거나 청크/모델 설정이 바뀌면 전체 재색인
+    - rag_backend=snapshot이면 원본 저장소에 색인한 뒤 스냅샷 번들을 다시 내보냄
+    - rag_dedup=True면 이미 색인된 청크와 거의 같은 청크(MinHash LSH)는 임베딩/저장하지 않고
+      대표 청크 metadata(dup_sources, dup_count)에 출처만 남김
+      (대표 청크가 있던 PDF가 바뀌거나 사라지면 그 중복을 가진 PDF도 다시 색인)
+
+    workers: PDF 텍스트 추출 프로세스 수 (None이면 settings.rag_index_workers)
+    """
+    if workers is None:
+        workers = settings.rag_index_workers
+
+    # PDF가 없으면 기존 색인은 건드리지 않음 (reset 후 매니페스트를 저장하지 않고 끝나면 둘이 어긋남)
     pdfs = sorted(pdf_dir.glob("*.pdf"))
     if not pdfs:
         return {"ok": False, "message": f"No PDFs found in {pdf_dir}"}
 
-    embedder = get_rag_embedder()
+    manifest = IndexManifest.load(get_index_manifest_path())
+    params = _index_params()
+
+    store = get_rag_index_store()
+    reset = rebuild or manifest.params != params
+    dedup = NearDupIndex(get_dedup_index_path(), threshold=settings.rag_dedup_threshold) if settings.rag_dedup else None
+    if reset:
+        store.reset()
+        manifest.reset(params)
+        if dedup is not None:
+            dedup.reset()
+
+    embedder = None  # 바뀐 파일이 하나도 없으면 모델 로드도 생략 (토큰 청커도 임베더 토크나이저 사용)
 
     total_chunks = 0
-    for pdf_path in pdfs:
-        raw = _read_pdf_text(pdf_path)
-        chunks = _chunk_text(raw)
+    skipped = 0
+    removed = 0
+    refresh: Set[str] = set()  # dup 링크가 바뀐 대표 청크 id
+    orphans: Set[str] = set()  # 대표 청크가 없어진 중복 청크 id
+
+    def drop_dedup(name: str) -> None:
+        if dedup is not None:
+            r, o = dedup.remove_source(_chunk_prefix(name))
+            refresh.update(r)
+            orphans.update(o)
+
+    try:
+        # 디렉토리에서 사라진 PDF 정리
+        current = {p.name for p in pdfs}
+        for name in manifest.names():
+            if name not in current:
+                store.delete(manifest.remove_file(name))
+                drop_dedup(name)
+                removed += 1
+
+        # 1) 바뀐 PDF만 골라내기 (해시는 stat이 달라졌을 때만 계산)
+        changed = []
+        for pdf_path in pdfs:
+            st = pdf_path.stat()
+            if manifest.stat_matches(pdf_path.name, st):
+                skipped += 1
+                continue
+
+            sha = file_sha256(pdf_path)
+            if manifest.hash_matches(pdf_path.name, sha):
+                manifest.touch(pdf_path.name, st)
+                skipped += 1
+                continue
+
+            changed.append((pdf_path, sha, st))
+
+        # 1-1) 다시 색인할 PDF의 대표 청크를 가리키던 중복 청크가 있으면 그 PDF도 다시 색인
+        for pdf_path, _, _ in changed:
+            drop_dedup(pdf_path.name)
+        by_name = {p.name: p for p in pdfs}
+        queued = {c[0].name for c in changed}
+        while orphans:
+            deps = {d.split("::chunk::", 1)[0] for d in orphans} - queued
+            orphans.clear()
+            for name in sorted(deps):
+                if name not in by_name:
+                    continue
+                pdf_path = by_name[name]
+                changed.append((pdf_path, file_sha256(pdf_path), pdf_path.stat()))
+                queued.add(name)
+                skipped -= 1
+                drop_dedup(name)
+
+        # 2) 텍스트 추출은 병렬로(페이지 캐시에 있으면 생략), 청크/임베딩은 원래 순서대로
+        page_lists = _iter_pdf_pages(
+            [c[0] for c in changed], workers=workers, shas=[c[1] for c in changed],
+        )
+        for (pdf_path, sha, st), pages in zip(changed, page_lists):
+            old_ids = manifest.chunk_ids(pdf_path.name)
+            if embedder is None:
+                embedder = get_rag_embedder()
+            spans = _chunk_pages(pages, embedder)
+
+            # ids/metadata/documents 준비 (중복으로 빠진 청크도 chunk 번호는 유지)
+            keep: List[int] = []
+            for k, (chunk, p0, _) in enumerate(spans):
+                cid = f"{_chunk_prefix(pdf_path.name)}{k}"
+                kept_id = dedup.check(cid, chunk, f"{pdf_path.name} p.{p0}") if dedup is not None else None
+                if kept_id is None:
+                    keep.append(k)
+                else:
+                    refresh.add(kept_id)
+            chunks = [spans[k][0] for k in keep]
+            ids = [f"{_chunk_prefix(pdf_path.name)}{k}" for k in keep]
+
+            # 이전 버전에만 있던 chunk는 삭제 (청크 수가 줄어든 경우)
+            new_ids = set(ids)
+            store.delete([i for i in old_ids if i not in new_ids])
+
+            if chunks:
+                metadatas = [
+                    {"source": pdf_path.name, "chunk_index": k, "page": spans[k][1], "page_end": spans[k][2]}
+                    for k in keep
+                ]
+                embeddings = encode_with_cache(
+                    embedder, chunks, get_rag_embed_cache(), show_progress_bar=False,
+                )
+                store.upsert_batch(ids, embeddings, documents=chunks, metadatas=metadatas)
+
+            # 빈 PDF도 기록해 두어야 다음 실행에서 다시 읽지 않음
+            manifest.set_file(pdf_path.name, sha, st, ids)
+            total_chunks += len(chunks)
+
+        if dedup is not None:
+            _refresh_dup_metadata(store, dedup, refresh)
+    finally:
+        store.flush()
+        manifest.save()
+        if dedup is not None:
+            dedup.save()
+
+    # BM25는 컬렉션 전체 기준 통계(idf)라 바뀐 게 있으면 통째로 다시 만든다
+    bm25_docs = None
+    if reset or changed or removed or not get_bm25_path().exists():
+        bm25_docs = build_bm25_index(store)
+
+    snapshot = None
+    if settings.rag_backend == "snapshot" and (
+        reset or changed or removed or not (get_rag_snapshot_dir() / "manifest.json").exists()
+    ):
+        snapshot = export_rag_snapshot()
+
+    # 검색 결과 캐시 무효화 (서버 프로세스는 다음 조회 때 세대 변경을 보고 비움)
+    generation = get_index_generation()
+    if reset or changed or removed:
+        generation = bump_index_generation()
+
+    cache = get_rag_embed_cache()
+    page_cache = get_page_cache()
+    return {
+        "ok": True,
+        "pdf_count": len(pdfs),
+        "chunk_count": total_chunks,
+        "indexed": len(changed),
+        "skipped": skipped,
+        "removed": removed,
+        "embed_cache": cache.stats() if cache is not None else None,
+        "page_cache": page_cache.stats() if page_cache is not None else None,
+        "dedup": (
+            dedup.stats(dim=embedder.get_sentence_embedding_dimension() if embedder is not None else None)
+            if dedup is not None else None
+        ),
+        "bm25_docs": bm25_docs,
+        "snapshot": snapshot,
+        "index_generation": generation,
+    }
 
-        if not chunks:
-            continue
 
-        # ids/metadata/documents 준비
-        ids = [f"{pdf_path.name}::chunk::{k}" for k in range(len(chunks))]
-        metadatas = [{"source": pdf_path.name, "chunk_index": k} for k in range(len(chunks))]
-        embeddings = embedder.encode(chunks, show_progress_bar=False).tolist()
+# ---------- query ----------
+def _hit(h: VectorHit) -> Dict[str, Any]:
+    return {
+        "text": h.document,
+        "source": (h.metadata or {}).get("source", ""),
+        "chunk_index": (h.metadata or {}).get("chunk_index", -1),
+        "page": (h.metadata or {}).get("page"),
+        "dup_sources": (h.metadata or {}).get("dup_sources") or "",
+        "distance": h.distance,
+    }
+
+
+def _fuse(
+    query: str,
+    bm25: BM25Index,
+    vec_ids: List[str],
+    n_results: int,
+    n_fetch: int,
+) -> List[Tuple[str, float]]:
+    """벡터 순위 + BM25 순위를 RRF로 합침 → [(chunk_id, score), ...]"""
+    lex_ids = [cid for cid, _ in bm25.search(query, n_fetch)]
+    return reciprocal_rank_fusion([vec_ids, lex_ids], k=settings.rag_rrf_k, top_k=n_results)
+
+
+def _fused_hits(
+    fused: List[Tuple[str, float]],
+    by_id: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    hits: List[Dict[str, Any]] = []
+    for cid, score in fused:
+        h = by_id.get(cid)
+        if h is None:
+            continue  # BM25 인덱스가 컬렉션보다 오래된 경우
+        hits.append({**h, "score": score})
+    return hits
+
+
+# 벡터 저장소에 한 번에 넘기는 질의 수 (평가 시 수천 개 질의도 메모리 일정하게)
+QUERY_BATCH_SIZE = 256
+
+
+def _rerank_results(results: List[Dict[str, Any]], n_results: int) -> List[Dict[str, Any]]:
+    """후보 N개 → cross-encoder로 top n_results (질의별 시간 예산 초과 시 원래 순서)"""
+    reranker = get_rag_reranker()
+    out: List[Dict[str, Any]] = []
+    for r in results:
+        hits, ok = reranker.rerank(r["query"], r["hits"], n_results, settings.rag_rerank_budget_ms)
+        out.append({**r, "hits": hits, "reranked": ok})
+    return out
+
+
+def query_rag_many(
+    queries: List[str],
+    top_k: int = 5,
+    mode: Optional[str] = None,
+    rerank: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    여러 질의를 한 번에 검색 → 질의별 query_rag 결과 리스트 (입력 순서 유지)
+    - 임베딩은 한 번의 배치 encode, 벡터 검색은 질의 임베딩 여러 개를 한 번에 query_batch
+    - hybrid에서 BM25에서만 나온 청크 본문도 배치 단위로 한 번에 store.get
+    mode 의미는 query_rag와 동일
+    rerank: None이면 settings.rag_rerank
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+
+    mode = mode or settings.rag_search_mode
+    rerank = settings.rag_rerank if rerank is None else rerank
+    n_results = max(1, min(int(top_k), 10))
+    # 재정렬 시에는 후보를 넉넉히 모은 뒤 cross-encoder로 top_k만 남김
+    n_keep = max(n_results, settings.rag_rerank_candidates) if rerank else n_results
+
+    bm25 = get_rag_bm25() if mode == "hybrid" else None
+    # hybrid면 양쪽에서 넉넉히 가져와서 합친 뒤 top_k만 남김
+    n_fetch = n_keep if bm25 is None else max(n_keep, n_results * 4, 20)
+
+    store = get_rag_store()
+    # 같은 질의는 memory_read_node 등에서 이미 인코딩했을 수 있음 → 공용 LRU
+    qembs = encode_queries(
+        get_rag_embedder(),
+        get_rag_embedder_key(),
+        queries,
+        cache_size=settings.query_embed_cache_size,
+        enabled=settings.query_embed_cache,
+    )
 
-        # 중복 id가 있으면 add에서 에러가 날 수 있으므로, 간단히 upsert 권장
-        try:
-            col.upsert(ids=ids, documents=chunks, metadatas=metadatas, embeddings=embeddings)
-        except Exception:
-            # upsert 없는 구버전이면 add로 시도
-            col.add(ids=ids, documents=chunks, metadatas=metadatas, embeddings=embeddings)
+    out: List[Dict[str, Any]] = []
+    for s in range(0, len(queries), QUERY_BATCH_SIZE):
+        batch = queries[s:s + QUERY_BATCH_SIZE]
+        vec_hits = store.query_batch(qembs[s:s + QUERY_BATCH_SIZE], n_fetch)
+        all_ids = [[h.id for h in hits] for hits in vec_hits]
+        all_hits = [[_hit(h) for h in hits] for hits in vec_hits]
+
+        if bm25 is None:
+            results = [
+                {"query": q, "top_k": top_k, "mode": "vector", "hits": hits}
+                for q, hits in zip(batch, all_hits)
+            ]
+            out.extend(_rerank_results(results, n_results) if rerank else results)
+            continue
 
-        total_chunks += len(chunks)
+        own_hits = [dict(zip(ids, hits)) for ids, hits in zip(all_ids, all_hits)]
+        fused_all = [_fuse(q, bm25, ids, n_keep, n_fetch) for q, ids in zip(batch, all_ids)]
+
+        # BM25에서만 나온 청크: 본문은 배치 안 다른 질의의 벡터 결과에서 재사용 (distance는 없음)
+        lexical: Dict[str, Dict[str, Any]] = {}
+        for hits in vec_hits:
+            for h in hits:
+                lexical.setdefault(h.id, {**_hit(h), "distance": None})
+
+        missing = list(dict.fromkeys(
+            cid
+            for own, fused in zip(own_hits, fused_all)
+            for cid, _ in fused
+            if cid not in own and cid not in lexical
+        ))
+        if missing:
+            for h in store.get(ids=missing):
+                lexical[h.id] = _hit(h)
+
+        results = [
+            {"query": q, "top_k": top_k, "mode": "hybrid", "hits": _fused_hits(fused, {**lexical, **own})}
+            for q, fused, own in zip(batch, fused_all, own_hits)
+        ]
+        out.extend(_rerank_results(results, n_results) if rerank else results)
+    return out
+
+
+def query_rag(query: str, top_k: int = 5, mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    mode
+    - vector: 벡터 검색만
+    - hybrid: 벡터 + BM25(문자 n-gram)를 RRF로 결합 → 'F함수', 테이블명, 에러 코드 같은 정확한 식별자도 잡음
+    - None  : settings.rag_search_mode (BM25 인덱스가 없으면 vector로 동작)
 
-    return {"ok": True, "pdf_count": len(pdfs), "chunk_count": total_chunks}
+    settings.rag_rerank면 후보 rag_rerank_candidates개를 cross-encoder로 재정렬해서 top_k 반환
+    """
+    return query_rag_many([query], top_k, mode)[0]
 
 
-# ---------- query ----------
-def query_rag(query: str, top_k: int = 5) -> Dict[str, Any]:
-    col = get_rag_collection()
-    qemb = get_rag_embedder().encode([query], show_progress_bar=False).tolist()
-
-    res = col.query(
-        query_embeddings=qemb,
-        n_results=max(1, min(int(top_k), 10)),
-        include=["documents", "metadatas", "distances"],
+def query_rag_cached_many(
+    queries: List[str],
+    top_k: int = 5,
+    mode: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    query_rag_many 앞단 결과 캐시
+    - 질의 임베딩이 캐시된 질의와 충분히 가까우면(settings.rag_result_cache_max_distance) 검색 생략
+    - 색인 세대가 바뀌면 캐시 전체 무효화
+    질의 임베딩은 공용 LRU에 남으므로 miss일 때 query_rag_many에서 다시 인코딩하지 않는다.
+    """
+    queries = list(queries)
+    cache = get_rag_result_cache()
+    if cache.max_items <= 0 or not queries:
+        return query_rag_many(queries, top_k, mode)
+
+    mode = mode or settings.rag_search_mode
+    key = (max(1, min(int(top_k), 10)), mode, settings.rag_rerank)
+    generation = get_index_generation()
+    qvecs = encode_queries(
+        get_rag_embedder(),
+        get_rag_embedder_key(),
+        queries,
+        cache_size=settings.query_embed_cache_size,
+        enabled=settings.query_embed_cache,
     )
 
-    docs = (res.get("documents") or [[]])[0]
-    metas = (res.get("metadatas") or [[]])[0]
-    dists = (res.get("distances") or [[]])[0]
+    out: List[Optional[Dict[str, Any]]] = []
+    miss: List[int] = []
+    for i, (q, qvec) in enumerate(zip(queries, qvecs)):
+        cached = cache.lookup(qvec, key, generation)
+        if cached is None:
+            miss.append(i)
+            out.append(None)
+        else:
+            out.append({**cached, "query": q, "top_k": top_k, "cached": True})
+
+    if miss:
+        fresh = query_rag_many([queries[i] for i in miss], top_k, mode)
+        for i, res in zip(miss, fresh):
+            cache.store(qvecs[i], key, generation, res)
+            out[i] = res
+    return out  # type: ignore[return-value]
 
-    hits: List[Dict[str, Any]] = []
-    for doc, meta, dist in zip(docs, metas, dists):
-        hits.append({
-            "text": doc,
-            "source": (meta or {}).get("source", ""),
-            "chunk_index": (meta or {}).get("chunk_index", -1),
-            "distance": float(dist) if dist is not None else None,
-        })
 
-    return {"query": query, "top_k": top_k, "hits": hits}
+def query_rag_cached(query: str, top_k: int = 5, mode: Optional[str] = None) -> Dict[str, Any]:
+    return query_rag_cached_many([query], top_k, mode)[0]
 
 
 def format_rag_answer(result: Dict[str, Any]) -> str:
@@ -190,9 +879,14 @@ def format_rag_answer(result: Dict[str, Any]) -> str:
         return "검색 결과가 없습니다."
 
     lines: List[str] = []
-    for i, h in enumerate(hits[:5], 1):
+    for i, h in enumerate(hits[:settings.rag_answer_max_hits], 1):
         src = h.get("source", "")
         idx = h.get("chunk_index", -1)
+        page = h.get("page")
         txt = (h.get("text") or "").strip().replace("\n", " ")
-        lines.append(f"[{i}] ({src} / chunk {idx}) {txt[:300]}")
+        where = f"{src} p.{page}" if page else src
+        also = h.get("dup_sources")
+        if also:
+            where += f"; 같은 내용: {also[:120]}"
+        lines.append(f"[{i}] ({where} / chunk {idx}) {txt[:300]}")
     return "\n".join(lines)
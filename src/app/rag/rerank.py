@@ -0,0 +1,93 @@
+# src/app/rag/rerank.py
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sentence_transformers import CrossEncoder
+
+# 재정렬은 CPU 작업이라 한 번에 하나씩만 실행 (대기 시간도 시간 예산에 포함됨)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+
+
+class CrossEncoderReranker:
+    """
+    (질의, 청크) 쌍을 cross-encoder로 점수화해서 재정렬
+
+    - 후보를 batch_size씩 나눠 점수화하고, 배치 사이마다 취소 여부 확인
+    - budget_ms 안에 끝나지 않으면 점수를 버리고 원래(벡터/RRF) 순서 사용
+      → 느린 CPU에서도 검색 지연이 예산 이상으로 늘어나지 않음
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "cpu",
+        max_length: int = 256,
+        batch_size: int = 16,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = max(1, int(batch_size))
+        self.model = CrossEncoder(model_name, device=device, max_length=max_length)
+        self.timeouts = 0
+        self.calls = 0
+
+    def score(self, query: str, texts: List[str], cancel: Optional[threading.Event] = None) -> Optional[np.ndarray]:
+        """texts별 관련도 점수 (취소되면 None)"""
+        scores: List[float] = []
+        for s in range(0, len(texts), self.batch_size):
+            if cancel is not None and cancel.is_set():
+                return None
+            pairs = [(query, t) for t in texts[s:s + self.batch_size]]
+            out = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            scores.extend(np.asarray(out, dtype=np.float32).reshape(-1).tolist())
+        return np.asarray(scores, dtype=np.float32)
+
+    def rerank(
+        self,
+        query: str,
+        hits: List[Dict[str, Any]],
+        top_k: int,
+        budget_ms: float,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        반환: (상위 top_k hits, 재정렬 성공 여부)
+        재정렬된 hit에는 "rerank_score"가 붙는다.
+        """
+        if len(hits) <= 1:
+            return hits[:top_k], False
+
+        self.calls += 1
+        cancel = threading.Event()
+        texts = [(h.get("text") or "") for h in hits]
+        fut = _executor.submit(self.score, query, texts, cancel)
+        try:
+            scores = fut.result(timeout=max(0.0, budget_ms) / 1000.0)
+        except FutureTimeout:
+            cancel.set()  # 진행 중인 배치만 끝내고 멈춤
+            self.timeouts += 1
+            return hits[:top_k], False
+
+        if scores is None:
+            return hits[:top_k], False
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [{**hits[i], "rerank_score": float(scores[i])} for i in order], True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "timeout_rate": (self.timeouts / self.calls) if self.calls else 0.0,
+        }
+
+
+def warmup_reranker(reranker: CrossEncoderReranker) -> float:
+    """모델 lazy init 제거용 forward 1회 → 걸린 시간(초)"""
+    t0 = time.perf_counter()
+    reranker.score("warmup", ["warmup"])
+    return time.perf_counter() - t0
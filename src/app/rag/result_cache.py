@@ -0,0 +1,119 @@
+# src/app/rag/result_cache.py
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    key: Hashable  # (top_k, mode) 등 질의 외 검색 조건
+    vec: np.ndarray  # 단위 벡터로 정규화한 질의 임베딩
+    result: Dict[str, Any]
+    created: float
+
+
+class SemanticResultCache:
+    """
+    rag_search 결과 캐시 (질의 임베딩 기준 근사 매칭)
+
+    - 새 질의 임베딩과 캐시된 질의 임베딩의 cosine 거리가 max_distance 이하면 캐시 결과 반환
+      → "F함수 사용법" / "F 함수 사용법은?" 같은 거의 같은 질문에서 검색을 생략
+    - 색인 세대(index generation)가 바뀌면 전부 폐기 (index_pdfs가 세대를 올림)
+    - max_items 초과 시 LRU, ttl_s 지난 항목은 조회 시 폐기
+    """
+
+    def __init__(self, max_items: int = 256, ttl_s: float = 600.0, max_distance: float = 0.05) -> None:
+        self.max_items = int(max_items)
+        self.ttl_s = float(ttl_s)
+        self.max_distance = float(max_distance)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(vec: Any) -> np.ndarray:
+        v = np.asarray(vec, dtype=np.float32).reshape(-1)
+        n = float(np.linalg.norm(v))
+        return v / n if n > 0 else v
+
+    def _sync_generation(self, generation: int) -> None:
+        if self._generation != generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def _expire(self, now: float) -> None:
+        if self.ttl_s <= 0:
+            return
+        dead = [eid for eid, e in self._entries.items() if now - e.created > self.ttl_s]
+        for eid in dead:
+            del self._entries[eid]
+
+    def lookup(self, vec: Any, key: Hashable, generation: int) -> Optional[Dict[str, Any]]:
+        if self.max_items <= 0:
+            return None
+        q = self._unit(vec)
+        with self._lock:
+            self._sync_generation(generation)
+            self._expire(time.time())
+
+            cands = [(eid, e) for eid, e in self._entries.items() if e.key == key]
+            if not cands:
+                self.misses += 1
+                return None
+
+            sims = np.stack([e.vec for _, e in cands]) @ q
+            j = int(np.argmax(sims))
+            if 1.0 - float(sims[j]) > self.max_distance:
+                self.misses += 1
+                return None
+
+            eid, entry = cands[j]
+            self._entries.move_to_end(eid)
+            self.hits += 1
+            # 호출 측에서 hits를 고쳐도 캐시가 오염되지 않도록 복사본 반환
+            return copy.deepcopy(entry.result)
+
+    def store(self, vec: Any, key: Hashable, generation: int, result: Dict[str, Any]) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._sync_generation(generation)
+            self._entries[self._next_id] = _Entry(
+                key=key,
+                vec=self._unit(vec),
+                result=copy.deepcopy(result),
+                created=time.time(),
+            )
+            self._next_id += 1
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_items": self.max_items,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
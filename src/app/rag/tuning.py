@@ -0,0 +1,136 @@
+# src/app/rag/tuning.py
+from __future__ import annotations
+
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.app.vectorstore.base import VectorStore
+from src.app.vectorstore.chroma_store import ChromaVectorStore
+from src.app.vectorstore.numpy_store import NumpyVectorStore
+
+
+def _load_corpus(store: VectorStore) -> tuple[List[str], List[str], np.ndarray]:
+    ids: List[str] = []
+    docs: List[str] = []
+    embs: List[np.ndarray] = []
+    for batch in store.snapshot():
+        ids.extend(batch.ids)
+        docs.extend(d or "" for d in batch.documents)
+        embs.append(batch.embeddings)
+    mat = np.concatenate(embs) if embs else np.zeros((0, 0), dtype=np.float32)
+    return ids, docs, mat
+
+
+def sample_queries(docs: List[str], n: int, seed: int = 0, max_chars: int = 80) -> List[str]:
+    """질의 파일이 없을 때: 청크 앞부분(첫 문장 정도)을 질의로 사용"""
+    rng = random.Random(seed)
+    picked = rng.sample(range(len(docs)), min(n, len(docs)))
+    out = []
+    for i in picked:
+        q = " ".join(docs[i].split())[:max_chars]
+        if q:
+            out.append(q)
+    return out
+
+
+def _timed_queries(store: VectorStore, qembs: np.ndarray, top_k: int) -> tuple[List[List[str]], np.ndarray]:
+    store.query_batch(qembs[:1], top_k)  # 세그먼트 로드 등 첫 호출 비용 제외
+    results: List[List[str]] = []
+    lat = np.empty(len(qembs), dtype=np.float64)
+    for i, q in enumerate(qembs):
+        t0 = time.perf_counter()
+        hits = store.query_batch(q.reshape(1, -1), top_k)[0]
+        lat[i] = (time.perf_counter() - t0) * 1000.0
+        results.append([h.id for h in hits])
+    return results, lat
+
+
+def _recall(results: List[List[str]], truth: List[List[str]], top_k: int) -> float:
+    if not truth:
+        return 0.0
+    per_query = [len(set(r[:top_k]) & set(t)) / max(1, len(t)) for r, t in zip(results, truth)]
+    return float(np.mean(per_query))
+
+
+def tune_hnsw(
+    store: VectorStore,
+    embedder: Any,
+    queries: Optional[List[str]] = None,
+    top_k: int = 10,
+    m_values: Sequence[int] = (16, 32),
+    construction_efs: Sequence[int] = (100, 200),
+    search_efs: Sequence[int] = (10, 50, 100),
+    n_samples: int = 200,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    현재 RAG 저장소의 임베딩으로 HNSW 파라미터 조합을 훑어 recall@k / 지연시간 측정
+
+    - 정답: NumpyVectorStore 정확 검색 결과 (recall 1.0 기준선도 함께 측정)
+    - 조합마다 임시 디렉토리에 Chroma 컬렉션을 새로 만들어 같은 임베딩을 넣음
+      (Chroma는 HNSW 설정을 생성 시에만 반영하므로 search_ef도 조합별로 새로 만듦)
+    반환: 조합별 {"backend", "M", "construction_ef", "search_ef", "recall", "p50_ms", "p99_ms", "build_s"}
+    """
+    ids, docs, mat = _load_corpus(store)
+    if not ids:
+        return []
+
+    queries = queries or sample_queries(docs, n_samples, seed=seed)
+    qembs = np.asarray(embedder.encode(queries, show_progress_bar=False), dtype=np.float32)
+    print(f"[TUNE] corpus={len(ids)} queries={len(queries)} k={top_k}")
+
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="hnsw_tune_") as tmp:
+        exact = NumpyVectorStore(Path(tmp) / "numpy", "exact", space="cosine")
+        t0 = time.perf_counter()
+        exact.upsert_batch(ids, mat)
+        build_s = time.perf_counter() - t0
+        truth, lat = _timed_queries(exact, qembs, top_k)
+        rows.append({
+            "backend": "numpy",
+            "M": None,
+            "construction_ef": None,
+            "search_ef": None,
+            "recall": 1.0,
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "build_s": build_s,
+        })
+
+        for m in m_values:
+            for cef in construction_efs:
+                for sef in search_efs:
+                    name = f"tune_m{m}_c{cef}_s{sef}"
+                    hnsw = ChromaVectorStore(
+                        Path(tmp) / "chroma",
+                        name,
+                        space="cosine",
+                        hnsw={"M": m, "construction_ef": cef, "search_ef": sef},
+                    )
+                    t0 = time.perf_counter()
+                    hnsw.upsert_batch(ids, mat)
+                    build_s = time.perf_counter() - t0
+
+                    results, lat = _timed_queries(hnsw, qembs, top_k)
+                    row = {
+                        "backend": "chroma",
+                        "M": m,
+                        "construction_ef": cef,
+                        "search_ef": sef,
+                        "recall": _recall(results, truth, top_k),
+                        "p50_ms": float(np.percentile(lat, 50)),
+                        "p99_ms": float(np.percentile(lat, 99)),
+                        "build_s": build_s,
+                    }
+                    rows.append(row)
+                    print(
+                        f"[TUNE] M={m} construction_ef={cef} search_ef={sef} "
+                        f"recall@{top_k}={row['recall']:.4f} p50={row['p50_ms']:.2f}ms"
+                    )
+                    hnsw.client.delete_collection(name)
+    return rows
@@ -6,9 +6,11 @@ import math
 import os
 from typing import Optional
 
-import requests
+import httpx
 from pydantic import BaseModel, Field
 
+from src.app.config.settings import settings
+from src.app.net.http_pool import get_http_client
 from src.app.tools.__base__ import tool
 
 
@@ -55,10 +57,11 @@ def search_tool(args: SearchInput) -> str:
         params["siteSearch"] = args.site
 
     try:
-        resp = requests.get(url, params=params, timeout=15)
+        # 공용 keep-alive 풀 → 두 번째 검색부터는 TCP/TLS 핸드셰이크 없이 바로 요청
+        resp = get_http_client(**settings.http_pool_params()).get(url, params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
-    except requests.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         # API가 에러 메시지를 JSON으로 주는 경우가 많아서 최대한 노출
         try:
             err = resp.json()
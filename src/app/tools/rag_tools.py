@@ -1,25 +1,46 @@
 # src/app/tools/rag_tools.py
 from __future__ import annotations
 
+from typing import Dict, List, Tuple
+
 from pydantic import BaseModel, Field
 
-from src.app.rag.pipeline import query_rag, format_rag_answer
+from src.app.rag.pipeline import query_rag_cached, query_rag_cached_many, format_rag_answer
 from src.app.tools.__base__ import tool
 
 
+RAG_TOOL_NAME = "rag_search"
+
+
 class RagQueryInput(BaseModel):
     query: str = Field(..., description="검색할 질문/키워드")
     top_k: int = Field(5, ge=1, le=10, description="가져올 청크 개수")
 
 
 @tool(
-    name="rag_search",
+    name=RAG_TOOL_NAME,
     description="PDF 문서에서 관련 내용을 벡터 검색으로 찾아 요약용 근거를 반환합니다.",
     input_model=RagQueryInput,
 )
 def rag_search_tool(args: RagQueryInput) -> str:
     print("[RAG TOOL CALLED]", args.query)
-    res = query_rag(args.query, args.top_k)
+    res = query_rag_cached(args.query, args.top_k)
     return format_rag_answer(res)
 
 
+def rag_search_many(items: List[RagQueryInput]) -> List[str]:
+    """
+    같은 step에서 나온 rag_search 호출 여러 개를 한 번에 처리
+    (top_k가 같은 것끼리 묶어 배치 임베딩 + 배치 검색)
+    """
+    groups: Dict[int, List[Tuple[int, str]]] = {}
+    for i, args in enumerate(items):
+        print("[RAG TOOL CALLED]", args.query)
+        groups.setdefault(args.top_k, []).append((i, args.query))
+
+    out: List[str] = [""] * len(items)
+    for top_k, group in groups.items():
+        results = query_rag_cached_many([q for _, q in group], top_k)
+        for (i, _), res in zip(group, results):
+            out[i] = format_rag_answer(res)
+    return out
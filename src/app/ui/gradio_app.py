@@ -5,7 +5,8 @@ from typing import Any, Dict, List
 
 import gradio as gr
 
-from src.app.graph.app import build_app
+from src.app.graph.app import build_app, final_answer
+from src.app.llm.resilience import turn_deadline
 
 # 🔥 interrupt 사용
 APP = build_app(enable_interrupt=True)
@@ -37,22 +38,13 @@ def _format_event_updates(ev: Any) -> str:
     return " | ".join(parts)
 
 
-def _invoke_once(user_text: str, thread_id: str) -> str:
-    cfg = {"configurable": {"thread_id": thread_id}}
-    state = {
-        "messages": [{"role": "user", "content": user_text}],
-        "tool_calls": None,
-        "steps": 0,
-    }
-
-    out = APP.invoke(state, config=cfg)
-    messages = out.get("messages", [])
-
-    if not messages:
-        return "⚠️ 응답이 생성되지 않았습니다."
-
-    m = messages[-1]
-    return m.get("content", "") if isinstance(m, dict) else str(m)
+def _final_answer(cfg: Dict[str, Any]) -> str:
+    """
+    방금 실행한 그래프의 최종 assistant 답변 (checkpoint에서 읽음 → 그래프를 다시 돌리지 않음)
+    - reflection이 system 메시지를 덧붙일 수 있으므로 마지막 assistant 메시지를 찾는다
+    """
+    messages = (APP.get_state(cfg).values or {}).get("messages", [])
+    return final_answer(messages) or "⚠️ 응답이 생성되지 않았습니다."
 
 
 def _chat_send(
@@ -74,7 +66,7 @@ def _chat_send(
     history = _append(history, "assistant", "…(처리 중)")
     yield history, "", trace
 
-    cfg = {"configurable": {"thread_id": thread_id}}
+    cfg = {"configurable": {"thread_id": thread_id, "deadline": turn_deadline()}}
     state = {
         "messages": [{"role": "user", "content": user_text}],
         "tool_calls": None,
@@ -101,7 +93,7 @@ def _chat_send(
                 return
 
             # interrupt 없을 때만 최종 답변
-            assistant_text = _invoke_once(user_text, thread_id)
+            assistant_text = _final_answer(cfg)
             history[-1] = {"role": "assistant", "content": assistant_text}
             yield history, "", trace
             return
@@ -112,10 +104,29 @@ def _chat_send(
             return
 
     # ================= STREAM ON =================
+    # updates: 노드 단위 trace / custom: llm_node가 보내는 토큰 조각 → 도착하는 대로 답변 칸에 표시
     try:
         local_lines: List[str] = []
+        new_trace = trace
+        partial = ""
+        partial_step = None
+
+        for mode, ev in APP.stream(state, config=cfg, stream_mode=["updates", "custom"]):
+            if mode == "custom" and isinstance(ev, dict):
+                if ev.get("type") == "token":
+                    # 새 llm step(tool 결과 이후 재호출)이면 이전 조각은 지움
+                    if ev.get("step") != partial_step:
+                        partial, partial_step = "", ev.get("step")
+                    partial += ev.get("text", "")
+                    history[-1] = {"role": "assistant", "content": partial}
+                    yield history, "", new_trace
+                elif ev.get("type") == "llm_done" and ev.get("ttft_s") is not None:
+                    local_lines.append(
+                        f"[llm] step {ev.get('step')} ttft={ev['ttft_s'] * 1000:.0f}ms "
+                        f"total={ev['total_s'] * 1000:.0f}ms"
+                    )
+                continue
 
-        for ev in APP.stream(state, config=cfg, stream_mode="updates"):
             local_lines.append(_format_event_updates(ev))
             new_trace = (trace + "\n" + "\n".join(local_lines)).strip()
             yield history, "", new_trace
@@ -136,7 +147,7 @@ def _chat_send(
             return
 
         # interrupt 없을 때만 최종 답변
-        assistant_text = _invoke_once(user_text, thread_id)
+        assistant_text = _final_answer(cfg)
         history[-1] = {"role": "assistant", "content": assistant_text}
         yield history, "", new_trace
 
@@ -148,7 +159,8 @@ def _chat_send(
 # ================= Resume =================
 
 def _resume(history: ChatHistory, thread_id: str, trace: str):
-    cfg = {"configurable": {"thread_id": thread_id}}
+    # 사람이 확인하는 동안 흐른 시간은 턴 예산에서 빼지 않음 → 재개 시점부터 새 예산
+    cfg = {"configurable": {"thread_id": thread_id, "deadline": turn_deadline()}}
     result = APP.invoke(None, config=cfg)
 
     messages = result.get("messages", [])
@@ -218,7 +230,7 @@ def build_gradio():
         thread = gr.State(str(uuid.uuid4()))
         chat = gr.Chatbot(height=420)
 
-        use_stream = gr.Checkbox(value=False, label="LangGraph stream (노드 단위)")
+        use_stream = gr.Checkbox(value=False, label="Stream (토큰 + 노드 trace)")
         trace_box = gr.Textbox(label="Stream Trace", lines=10, interactive=False)
 
         with gr.Row():
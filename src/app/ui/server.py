@@ -1,9 +1,26 @@
 # src/app/ui/server.py
 from __future__ import annotations
 
-from fastapi import FastAPI
+import json
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 import gradio as gr
 
+from src.app.embedding.query_cache import query_cache_stats
+from src.app.embedding.batcher import batcher_stats
+from src.app.embedding.registry import embedder_stats
+from src.app.embedding.worker_pool import worker_pool_stats
+from src.app.config.settings import settings
+from src.app.graph.app import build_app, final_answer
+from src.app.graph.blocking import blocking_stats
+from src.app.llm.resilience import LLMDeadlineExceeded, llm_metrics_stats, turn_deadline
+from src.app.llm.response_cache import response_cache_stats
+from src.app.net.http_pool import http_pool_stats
+from src.app.rag.pipeline import get_rag_reranker, get_rag_result_cache
 from src.app.ui.gradio_app import build_gradio
 
 # =========================
@@ -20,7 +37,7 @@ def warmup():
     """
     서버 시작 시:
     - SentenceTransformer 모델
-    - Chroma DB 컬렉션
+    - 벡터 저장소 (Chroma | NumPy)
     을 미리 로드해서
     첫 질문이 느려지는 문제를 제거한다.
     """
@@ -30,7 +47,7 @@ def warmup():
     # Memory
     # -------------------------
     from src.app.memory.store import (
-        get_mem_collection,
+        get_mem_store,
         get_mem_embedder,
     )
 
@@ -38,29 +55,30 @@ def warmup():
     # RAG
     # -------------------------
     from src.app.rag.pipeline import (
-        get_rag_collection,
+        get_rag_store,
         get_rag_embedder,
     )
 
-    # 1️⃣ Chroma 컬렉션 미리 열기 (disk I/O warm)
-    get_mem_collection()
-    get_rag_collection()
+    # 1️⃣ 벡터 저장소 미리 열기 (disk I/O warm)
+    get_mem_store().count()
+    get_rag_store().count()
 
-    # 2️⃣ 임베딩 모델 로드
-    mem_embedder = get_mem_embedder()
-    rag_embedder = get_rag_embedder()
+    # 2️⃣ 임베딩 모델 로드 (설정이 같으면 레지스트리에서 같은 인스턴스 → 1번만 로드)
+    embedders = {id(m): m for m in (get_mem_embedder(), get_rag_embedder())}
 
     # 3️⃣ 실제 forward 1회 (lazy init 제거)
-    mem_embedder.encode(
-        ["warmup"],
-        show_progress_bar=False,
-        convert_to_numpy=True,
-    )
-    rag_embedder.encode(
-        ["warmup"],
-        show_progress_bar=False,
-        convert_to_numpy=True,
-    )
+    for embedder in embedders.values():
+        embedder.encode(
+            ["warmup"],
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+
+    # 4️⃣ 재정렬 모델 (첫 질의가 로딩 시간 때문에 예산 초과로 떨어지지 않도록)
+    if settings.rag_rerank:
+        from src.app.rag.rerank import warmup_reranker
+
+        warmup_reranker(get_rag_reranker())
 
     print("[WARMUP] done")
 
@@ -72,9 +90,100 @@ demo = build_gradio()
 app = gr.mount_gradio_app(app, demo, path="/ui")
 
 
+# =========================
+# Async chat API
+# =========================
+# 비동기 노드 그래프 (ainvoke / astream) → 요청이 OpenAI 응답을 기다리는 동안 스레드를 잡지 않음
+_async_graph: Any = None
+
+
+def get_async_graph() -> Any:
+    global _async_graph
+    if _async_graph is None:
+        _async_graph = build_app(use_async=True)
+    return _async_graph
+
+
+class ChatRequest(BaseModel):
+    message: str
+    thread_id: Optional[str] = None
+
+
+def _chat_input(req: ChatRequest) -> tuple[Dict[str, Any], Dict[str, Any], str]:
+    thread_id = req.thread_id or str(uuid.uuid4())
+    # 턴 예산은 invoke마다 새로 (state에 두면 checkpoint에 남아 다음 invoke가 지난 마감 시각을 씀)
+    cfg = {"configurable": {"thread_id": thread_id, "deadline": turn_deadline()}}
+    state = {
+        "messages": [{"role": "user", "content": req.message}],
+        "tool_calls": None,
+        "steps": 0,
+    }
+    return state, cfg, thread_id
+
+
+@app.post("/chat")
+async def chat(req: ChatRequest):
+    state, cfg, thread_id = _chat_input(req)
+    try:
+        out = await get_async_graph().ainvoke(state, config=cfg)
+    except LLMDeadlineExceeded as e:
+        # 턴 예산(LLM_TURN_BUDGET_S) 초과 → 500 대신 504 (gateway timeout)
+        raise HTTPException(
+            status_code=504,
+            detail={"thread_id": thread_id, "error": f"응답 시간 초과: {e}"},
+        ) from e
+    return {"thread_id": thread_id, "answer": final_answer(out.get("messages", []))}
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    SSE: token 이벤트(llm_node custom stream) / node 이벤트(노드 완료) / 마지막 done 이벤트(최종 답변)
+    """
+    state, cfg, thread_id = _chat_input(req)
+    graph = get_async_graph()
+
+    async def events() -> AsyncIterator[str]:
+        def sse(obj: Dict[str, Any]) -> str:
+            return f"data: {json.dumps(obj, ensure_ascii=False)}\n\n"
+
+        try:
+            async for mode, ev in graph.astream(state, config=cfg, stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    yield sse(ev)
+                elif isinstance(ev, dict):
+                    yield sse({"type": "node", "nodes": list(ev.keys())})
+            snapshot = await graph.aget_state(cfg)
+            answer = final_answer((snapshot.values or {}).get("messages", []))
+            yield sse({"type": "done", "thread_id": thread_id, "answer": answer})
+        except LLMDeadlineExceeded as e:
+            yield sse({"type": "error", "thread_id": thread_id, "status": 504, "error": f"응답 시간 초과: {e}"})
+        except Exception as e:
+            yield sse({"type": "error", "thread_id": thread_id, "error": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # =========================
 # Root endpoint
 # =========================
 @app.get("/")
 def root():
     return {"ok": True, "ui": "/ui"}
+
+
+@app.get("/stats")
+def stats():
+    """캐시 적중률 등 런타임 통계"""
+    return {
+        "blocking_executor": blocking_stats(),
+        "llm_response_cache": response_cache_stats(),
+        "llm_calls": llm_metrics_stats(),
+        "http_pool": http_pool_stats(),
+        "embedders": embedder_stats(),
+        "embed_batchers": batcher_stats(),
+        "embed_worker_pools": worker_pool_stats(),
+        "query_embedding_cache": query_cache_stats(),
+        "rag_result_cache": get_rag_result_cache().stats(),
+        "rag_reranker": get_rag_reranker().stats() if settings.rag_rerank else None,
+    }
@@ -0,0 +1,79 @@
+# src/app/vectorstore/base.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+
+import numpy as np
+
+
+@dataclass
+class VectorHit:
+    id: str
+    document: Optional[str]
+    metadata: Dict[str, Any]
+    distance: Optional[float] = None  # get()으로 가져온 레코드는 None
+
+
+@dataclass
+class SnapshotBatch:
+    ids: List[str]
+    embeddings: np.ndarray  # (n, dim) float32
+    documents: List[Optional[str]]
+    metadatas: List[Dict[str, Any]]
+
+
+class VectorStore(Protocol):
+    """
+    RAG / 메모리 저장소 공용 벡터 저장소 인터페이스
+
+    구현체: ChromaVectorStore(chroma_store.py), NumpyVectorStore(numpy_store.py)
+    배치/캐시/양자화 같은 최적화는 이 인터페이스 위에서 한 번만 구현하고,
+    백엔드는 settings(rag_backend / memory_backend)로 바꿔 끼운다.
+    """
+
+    name: str
+
+    def upsert_batch(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None: ...
+
+    def query_batch(
+        self,
+        embeddings: Any,
+        top_k: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[VectorHit]]:
+        """질의 임베딩 여러 개 → 질의별 hit 리스트 (distance 오름차순), where는 metadata 일치 필터"""
+        ...
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[VectorHit]: ...
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """임베딩/문서는 그대로 두고 metadata만 교체 (없는 id는 무시)"""
+        ...
+
+    def delete(self, ids: List[str]) -> None: ...
+
+    def count(self) -> int: ...
+
+    def snapshot(self, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+        """저장된 전체 레코드를 (임베딩 포함) 배치 단위로 순회"""
+        ...
+
+    def reset(self) -> None:
+        """컬렉션 비우기"""
+        ...
+
+    def flush(self) -> None:
+        """메모리에 쌓인 변경분을 디스크에 저장 (즉시 저장하는 백엔드는 no-op)"""
+        ...
@@ -0,0 +1,212 @@
+# src/app/vectorstore/chroma_store.py
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import chromadb
+import numpy as np
+from chromadb import PersistentClient
+
+from src.app.vectorstore.base import SnapshotBatch, VectorHit
+
+# 같은 경로에 PersistentClient를 여러 개 열지 않도록 경로별로 공유
+_clients: Dict[str, PersistentClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_chroma_client(path: str | Path) -> PersistentClient:
+    key = str(Path(path).resolve())
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            Path(key).mkdir(parents=True, exist_ok=True)
+            client = chromadb.PersistentClient(path=key)
+            _clients[key] = client
+        return client
+
+
+class ChromaVectorStore:
+    """
+    Chroma PersistentClient 컬렉션 1개를 VectorStore 인터페이스로 감싼 것
+
+    hnsw: {"M": .., "construction_ef": .., "search_ef": ..}
+    Chroma는 HNSW 설정을 컬렉션을 만들 때만 반영하므로, 값을 바꾸면 reset() 후 다시 넣어야 한다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        name: str,
+        space: str = "cosine",
+        hnsw: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.name = name
+        self.space = space
+        self.hnsw = dict(hnsw or {})
+        self.client = get_chroma_client(self.path)
+        self._checked = False
+
+    def _metadata(self) -> Optional[Dict[str, Any]]:
+        # l2는 Chroma 기본값 → metadata 없이 만든 기존 컬렉션(final_project)과 그대로 호환
+        meta: Dict[str, Any] = {"hnsw:space": self.space} if self.space != "l2" else {}
+        meta.update({f"hnsw:{k}": int(v) for k, v in self.hnsw.items()})
+        return meta or None
+
+    def _col(self):
+        # 다른 프로세스(index_cli --rebuild)가 컬렉션을 다시 만들 수 있으므로 매번 조회
+        col = self.client.get_or_create_collection(
+            name=self.name,
+            metadata=self._metadata(),
+        )
+        if not self._checked:
+            self._checked = True
+            self._warn_stale_hnsw(col)
+        return col
+
+    def _warn_stale_hnsw(self, col: Any) -> None:
+        # 이미 있던 컬렉션은 metadata 인자를 무시함 → 요청한 값과 다르면 알려줌 (reset() 후 다시 넣어야 반영)
+        have = getattr(col, "metadata", None) or {}
+        diff = {
+            k: (have.get(f"hnsw:{k}"), int(v))
+            for k, v in self.hnsw.items()
+            if have.get(f"hnsw:{k}") != int(v)
+        }
+        if diff:
+            print(f"[CHROMA] 컬렉션 {self.name!r}의 HNSW 설정이 요청과 다름 (기존, 요청): {diff} → 재생성해야 반영됨")
+
+    def _max_batch_size(self) -> int:
+        get_max = getattr(self.client, "get_max_batch_size", None)
+        if callable(get_max):
+            try:
+                return int(get_max())
+            except Exception:
+                pass
+        return 5000
+
+    # ---------- 쓰기 ----------
+    def upsert_batch(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        if not ids:
+            return
+        col = self._col()
+        embs = np.asarray(embeddings, dtype=np.float32)
+        step = self._max_batch_size()
+        for s in range(0, len(ids), step):
+            e = s + step
+            col.upsert(
+                ids=ids[s:e],
+                embeddings=embs[s:e].tolist(),
+                documents=documents[s:e] if documents is not None else None,
+                metadatas=metadatas[s:e] if metadatas is not None else None,
+            )
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        if not ids:
+            return
+        col = self._col()
+        # update는 없는 id가 섞이면 경고/실패하는 버전이 있음 → 있는 id만
+        have = set(col.get(ids=list(ids), include=[]).get("ids") or [])
+        pairs = [(cid, m) for cid, m in zip(ids, metadatas) if cid in have]
+        step = self._max_batch_size()
+        for s in range(0, len(pairs), step):
+            part = pairs[s:s + step]
+            col.update(ids=[c for c, _ in part], metadatas=[m for _, m in part])
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self._col().delete(ids=list(ids))
+
+    def reset(self) -> None:
+        # delete(where={})는 버전에 따라 실패하므로 컬렉션 자체를 지우고 다시 생성
+        try:
+            self.client.delete_collection(self.name)
+        except Exception:
+            pass
+        self._checked = True  # 새로 만든 컬렉션은 현재 설정 그대로
+        self._col()
+
+    def flush(self) -> None:
+        pass  # Chroma는 쓰기 즉시 저장
+
+    # ---------- 읽기 ----------
+    def count(self) -> int:
+        return int(self._col().count())
+
+    def query_batch(
+        self,
+        embeddings: Any,
+        top_k: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[VectorHit]]:
+        embs = np.asarray(embeddings, dtype=np.float32)
+        if embs.ndim == 1:
+            embs = embs.reshape(1, -1)
+        if len(embs) == 0:
+            return []
+
+        res = self._col().query(
+            query_embeddings=embs.tolist(),
+            n_results=max(1, int(top_k)),
+            where=where or None,
+            include=["documents", "metadatas", "distances"],
+        )
+
+        def rows(key: str) -> List[List[Any]]:
+            got = res.get(key) or []
+            return [(got[i] if i < len(got) and got[i] is not None else []) for i in range(len(embs))]
+
+        return [
+            [
+                VectorHit(id=cid, document=doc, metadata=meta or {}, distance=float(dist))
+                for cid, doc, meta, dist in zip(ids, docs, metas, dists)
+            ]
+            for ids, docs, metas, dists in zip(rows("ids"), rows("documents"), rows("metadatas"), rows("distances"))
+        ]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[VectorHit]:
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                # chroma는 빈 ids 목록을 에러로 처리
+                return []
+            res = self._col().get(ids=ids, include=["documents", "metadatas"])
+        else:
+            res = self._col().get(include=["documents", "metadatas"], limit=limit, offset=offset)
+        return [
+            VectorHit(id=cid, document=doc, metadata=meta or {})
+            for cid, doc, meta in zip(res.get("ids") or [], res.get("documents") or [], res.get("metadatas") or [])
+        ]
+
+    def snapshot(self, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+        col = self._col()
+        offset = 0
+        while True:
+            res = col.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            ids = list(res.get("ids") or [])
+            if not ids:
+                return
+            embs = res.get("embeddings")
+            yield SnapshotBatch(
+                ids=ids,
+                embeddings=np.asarray(embs if embs is not None else [], dtype=np.float32).reshape(len(ids), -1),
+                documents=list(res.get("documents") or [None] * len(ids)),
+                metadatas=[m or {} for m in (res.get("metadatas") or [None] * len(ids))],
+            )
+            offset += len(ids)
@@ -0,0 +1,36 @@
+# src/app/vectorstore/factory.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.app.vectorstore.base import VectorStore
+
+
+def open_vector_store(
+    backend: str,
+    path: str | Path,
+    name: str,
+    space: str = "cosine",
+    numpy_dtype: str = "float32",
+    hnsw: Optional[Dict[str, int]] = None,
+) -> VectorStore:
+    """
+    backend
+    - chroma: Chroma PersistentClient(path) 컬렉션 name (hnsw: M / construction_ef / search_ef)
+    - numpy : path/numpy/name 아래 in-process 정확 검색 저장소 (hnsw 무시)
+    - snapshot: path/snapshot/name 아래 export_snapshot 번들 (읽기 전용, mmap)
+    """
+    if backend == "chroma":
+        from src.app.vectorstore.chroma_store import ChromaVectorStore
+
+        return ChromaVectorStore(path, name, space=space, hnsw=hnsw)
+    if backend == "numpy":
+        from src.app.vectorstore.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore(Path(path) / "numpy", name, dtype=numpy_dtype, space=space)
+    if backend == "snapshot":
+        from src.app.vectorstore.snapshot_store import SnapshotVectorStore
+
+        return SnapshotVectorStore(Path(path) / "snapshot" / name, name)
+    raise ValueError(f"지원하지 않는 벡터 저장소: {backend} (chroma | numpy | snapshot)")
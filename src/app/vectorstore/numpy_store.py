@@ -0,0 +1,324 @@
+# src/app/vectorstore/numpy_store.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.app.vectorstore.base import SnapshotBatch, VectorHit
+
+STORE_VERSION = 1
+
+
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 1:
+        x = x.reshape(1, -1)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+class NumpyVectorStore:
+    """
+    in-process 정확 검색(exact search) VectorStore
+
+    - 임베딩은 L2 정규화 후 연속된 (N, dim) float32 행렬 1개로 보관
+      dtype="float16"이면 파일만 float16으로 저장(디스크/로드 I/O 절반), 로드 시 float32로 올림
+      (numpy의 float16 matmul/변환은 매 질의마다 하기엔 너무 느림)
+    - 검색 = 질의 행렬 @ 임베딩 행렬 1번 + argpartition → recall 1.0
+    - distance: space="cosine"이면 1 - cosine, "l2"면 제곱 L2(= 2 - 2·cosine, 단위 벡터 기준)
+      → 같은 space의 Chroma 컬렉션과 같은 값
+    - 디스크: embeddings.npy (시작 시 mmap으로 로드) + records.json (ids / documents / metadatas)
+      쓰기는 메모리에서 하고 flush()에서 파일 교체 방식으로 저장
+      다른 프로세스(index_cli)가 저장하면 다음 조회 때 자동으로 다시 로드
+    """
+
+    def __init__(self, path: str | Path, name: str, dtype: str = "float32", space: str = "cosine") -> None:
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"지원하지 않는 dtype: {dtype}")
+        if space not in ("cosine", "l2"):
+            raise ValueError(f"지원하지 않는 space: {space}")
+        self.name = name
+        self.space = space
+        self.dir = Path(path) / name
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.RLock()
+        self._clear_memory()
+        self._loaded_mtime: Optional[int] = None
+        self._dirty = False
+        self._load()
+
+    # ---------- 파일 ----------
+    @property
+    def embeddings_path(self) -> Path:
+        return self.dir / "embeddings.npy"
+
+    @property
+    def records_path(self) -> Path:
+        return self.dir / "records.json"
+
+    def _records_mtime(self) -> Optional[int]:
+        try:
+            return self.records_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _clear_memory(self) -> None:
+        self.ids: List[str] = []
+        self.documents: List[Optional[str]] = []
+        self.metadatas: List[Optional[Dict[str, Any]]] = []
+        self._row: Dict[str, int] = {}
+        self._emb: Optional[np.ndarray] = None  # (capacity, dim), 앞쪽 len(ids) 행만 유효
+        self._writable = False
+
+    def _load(self) -> None:
+        mtime = self._records_mtime()
+        if mtime is None:
+            self._loaded_mtime = None
+            return
+        data = json.loads(self.records_path.read_text(encoding="utf-8"))
+        if data.get("version") != STORE_VERSION:
+            raise RuntimeError(f"지원하지 않는 NumPy 컬렉션 형식: {self.records_path}")
+
+        emb = np.load(self.embeddings_path, mmap_mode="r")
+        ids = list(data.get("ids") or [])
+        if emb.shape[0] != len(ids):
+            # 다른 프로세스가 저장하는 중 (embeddings → records 순서로 교체) → 다음 조회 때 다시 시도
+            return
+
+        self._clear_memory()
+        self.ids = ids
+        self.documents = list(data.get("documents") or [None] * len(ids))
+        self.metadatas = list(data.get("metadatas") or [None] * len(ids))
+        self._row = {cid: i for i, cid in enumerate(ids)}
+        self._emb = emb if emb.dtype == np.float32 else np.asarray(emb, dtype=np.float32)
+        self._loaded_mtime = mtime
+
+    def _maybe_reload(self) -> None:
+        if self._dirty:
+            return  # 저장 안 한 변경이 있으면 내 메모리 상태가 우선
+        if self._records_mtime() != self._loaded_mtime:
+            self._load()
+
+    def flush(self) -> None:
+        """메모리 변경분을 디스크에 저장 (임베딩 → 레코드 순서, 각각 원자적 교체)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            n = len(self.ids)
+            dim = self._emb.shape[1] if self._emb is not None else 0
+
+            tmp_emb = self.dir / "embeddings.tmp.npy"
+            mat = self._emb[:n] if self._emb is not None else np.zeros((0, dim), dtype=np.float32)
+            np.save(tmp_emb, np.ascontiguousarray(mat, dtype=self.dtype))
+            os.replace(tmp_emb, self.embeddings_path)
+
+            tmp_rec = self.dir / "records.tmp.json"
+            payload = {
+                "version": STORE_VERSION,
+                "dtype": self.dtype.name,
+                "dim": int(dim),
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+            }
+            tmp_rec.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_rec, self.records_path)
+
+            self._loaded_mtime = self._records_mtime()
+            self._dirty = False
+
+    def reset(self) -> None:
+        """컬렉션 비우기 (파일도 삭제)"""
+        with self._lock:
+            self._clear_memory()
+            for p in (self.embeddings_path, self.records_path):
+                if p.exists():
+                    p.unlink()
+            self._loaded_mtime = None
+            self._dirty = False
+
+    # ---------- 쓰기 ----------
+    def _ensure_writable(self, dim: int, extra: int) -> np.ndarray:
+        """mmap(읽기 전용)이면 메모리로 복사, 용량이 모자라면 두 배씩 늘림"""
+        n = len(self.ids)
+        if self._emb is not None and self._emb.shape[1] != dim:
+            raise ValueError(f"임베딩 차원이 다릅니다: {self._emb.shape[1]} != {dim}")
+        cap = self._emb.shape[0] if (self._emb is not None and self._writable) else 0
+        if cap < n + extra:
+            new = np.empty((max(n + extra, cap * 2, 1024), dim), dtype=np.float32)
+            if self._emb is not None and n:
+                new[:n] = self._emb[:n]
+            self._emb = new
+            self._writable = True
+        return self._emb
+
+    def upsert_batch(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        if not ids:
+            return
+        vecs = _unit_rows(np.asarray(embeddings, dtype=np.float32))
+        if vecs.shape[0] != len(ids):
+            raise ValueError("ids와 embeddings 개수가 맞지 않습니다.")
+
+        with self._lock:
+            self._maybe_reload()
+            new_ids = [cid for cid in dict.fromkeys(ids) if cid not in self._row]
+            emb = self._ensure_writable(vecs.shape[1], len(new_ids))
+
+            for cid in new_ids:
+                self._row[cid] = len(self.ids)
+                self.ids.append(cid)
+                self.documents.append(None)
+                self.metadatas.append(None)
+
+            rows = np.fromiter((self._row[cid] for cid in ids), dtype=np.int64, count=len(ids))
+            emb[rows] = vecs
+            for k, r in enumerate(rows.tolist()):
+                if documents is not None:
+                    self.documents[r] = documents[k]
+                if metadatas is not None:
+                    self.metadatas[r] = metadatas[k]
+            self._dirty = True
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._maybe_reload()
+            for cid, meta in zip(ids, metadatas):
+                r = self._row.get(cid)
+                if r is not None:
+                    self.metadatas[r] = meta
+                    self._dirty = True
+
+    def delete(self, ids: List[str]) -> None:
+        """삭제한 자리는 마지막 행으로 채움 (행렬을 연속으로 유지)"""
+        if not ids:
+            return
+        with self._lock:
+            self._maybe_reload()
+            targets = [cid for cid in dict.fromkeys(ids) if cid in self._row]
+            if not targets:
+                return
+            n = len(self.ids)
+            self._ensure_writable(self._emb.shape[1], 0)
+            for cid in targets:
+                r = self._row.pop(cid)
+                last = len(self.ids) - 1
+                if r != last:
+                    moved = self.ids[last]
+                    self._emb[r] = self._emb[last]
+                    self.ids[r] = moved
+                    self.documents[r] = self.documents[last]
+                    self.metadatas[r] = self.metadatas[last]
+                    self._row[moved] = r
+                self.ids.pop()
+                self.documents.pop()
+                self.metadatas.pop()
+            self._dirty = n != len(self.ids) or self._dirty
+
+    # ---------- 읽기 ----------
+    def count(self) -> int:
+        with self._lock:
+            self._maybe_reload()
+            return len(self.ids)
+
+    def _matches(self, meta: Optional[Dict[str, Any]], where: Dict[str, Any]) -> bool:
+        meta = meta or {}
+        return all(meta.get(k) == v for k, v in where.items())
+
+    def query_batch(
+        self,
+        embeddings: Any,
+        top_k: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[VectorHit]]:
+        q = _unit_rows(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._maybe_reload()
+            n = len(self.ids)
+            if n == 0 or len(q) == 0:
+                return [[] for _ in range(len(q))]
+
+            scores = q @ self._emb[:n].T
+            n_valid = n
+            if where:
+                mask = np.fromiter((self._matches(m, where) for m in self.metadatas), dtype=bool, count=n)
+                n_valid = int(mask.sum())
+                scores[:, ~mask] = -np.inf
+
+            k = min(int(top_k), n_valid)
+            if k <= 0:
+                return [[] for _ in range(len(q))]
+            if k < n:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(n), (len(q), n))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            scale = 1.0 if self.space == "cosine" else 2.0
+            return [
+                [
+                    VectorHit(
+                        id=self.ids[r],
+                        document=self.documents[r],
+                        metadata=self.metadatas[r] or {},
+                        distance=scale * (1.0 - sim),
+                    )
+                    for r, sim in zip(rows, sims)
+                ]
+                for rows, sims in zip(top.tolist(), top_scores.tolist())
+            ]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[VectorHit]:
+        with self._lock:
+            self._maybe_reload()
+            if ids is not None:
+                rows = [self._row[cid] for cid in ids if cid in self._row]
+            else:
+                start = int(offset or 0)
+                end = len(self.ids) if limit is None else min(len(self.ids), start + int(limit))
+                rows = list(range(start, end))
+            return [
+                VectorHit(id=self.ids[r], document=self.documents[r], metadata=self.metadatas[r] or {})
+                for r in rows
+            ]
+
+    def snapshot(self, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+        """순회 도중 다른 쓰기가 섞이지 않도록 시작 시점의 레코드 목록으로 고정"""
+        with self._lock:
+            self._maybe_reload()
+            n = len(self.ids)
+            ids = list(self.ids)
+            documents = list(self.documents)
+            metadatas = list(self.metadatas)
+            emb = np.array(self._emb[:n], dtype=np.float32) if n else np.zeros((0, 0), dtype=np.float32)
+
+        for s in range(0, n, batch_size):
+            e = s + batch_size
+            yield SnapshotBatch(
+                ids=ids[s:e],
+                embeddings=emb[s:e],
+                documents=documents[s:e],
+                metadatas=[m or {} for m in metadatas[s:e]],
+            )
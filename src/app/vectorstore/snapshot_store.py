@@ -0,0 +1,340 @@
+# src/app/vectorstore/snapshot_store.py
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.app.vectorstore.base import SnapshotBatch, VectorHit, VectorStore
+
+SNAPSHOT_VERSION = 1
+
+# 번들 구성 파일
+_EMB = "embeddings.npy"          # (N, dim) float32, L2 정규화
+_FIELDS = ("ids", "texts", "metas")  # 각각 {name}.bin (UTF-8 blob) + {name}_offsets.npy (N+1, int64)
+_MANIFEST = "manifest.json"
+# out_dir/CURRENT: 지금 서빙할 버전 디렉토리 이름 (번들은 out_dir/v<시각ns>/ 아래에 만들고 이 파일만 교체)
+_CURRENT = "CURRENT"
+# 현재 버전 외에 남겨 두는 이전 버전 수 (다른 프로세스가 막 열려던 번들이 바로 지워지지 않도록)
+_KEEP_OLD_VERSIONS = 2
+
+
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+class _BlobWriter:
+    """문자열을 UTF-8 blob 파일에 이어 쓰고 offset 테이블을 만든다"""
+
+    def __init__(self, path: Path) -> None:
+        self.f = open(path, "wb")
+        self.offsets: List[int] = [0]
+
+    def write(self, items: List[str]) -> None:
+        for s in items:
+            b = s.encode("utf-8")
+            self.f.write(b)
+            self.offsets.append(self.offsets[-1] + len(b))
+
+    def close(self, offsets_path: Path) -> None:
+        self.f.close()
+        np.save(offsets_path, np.asarray(self.offsets, dtype=np.int64))
+
+
+def _resolve_bundle(root: Path) -> Optional[Path]:
+    """root/CURRENT가 가리키는 번들 디렉토리 (CURRENT가 없으면 root에 바로 쓴 이전 형식, 둘 다 없으면 None)"""
+    try:
+        name = (root / _CURRENT).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return root if (root / _MANIFEST).exists() else None
+    return root / name
+
+
+def _prune_versions(root: Path, current: str) -> None:
+    versions = sorted(
+        (p for p in root.iterdir() if p.is_dir() and p.name.startswith("v") and p.name != current),
+        key=lambda p: p.name,
+    )
+    for p in versions[:max(0, len(versions) - _KEEP_OLD_VERSIONS)]:
+        shutil.rmtree(p, ignore_errors=True)
+    # 이전 형식(root에 바로 쓴 번들) 파일 정리 (이미 mmap으로 연 프로세스는 계속 읽을 수 있음)
+    legacy = [_EMB, _MANIFEST] + [n for f in _FIELDS for n in (f"{f}.bin", f"{f}_offsets.npy")]
+    for name in legacy:
+        try:
+            (root / name).unlink()
+        except (FileNotFoundError, PermissionError):
+            pass
+
+
+def export_snapshot(
+    store: VectorStore,
+    out_dir: str | Path,
+    space: str = "cosine",
+    info: Optional[Dict[str, Any]] = None,
+    batch_size: int = 2000,
+) -> Dict[str, Any]:
+    """
+    store 전체를 읽기 전용 스냅샷 번들로 내보냄
+    - out_dir/v<시각ns>/ 에 번들을 다 쓴 뒤 out_dir/CURRENT 파일을 os.replace로 교체
+      → 교체는 원자적이라 읽는 쪽은 항상 이전 번들이나 새 번들 중 하나를 온전히 봄
+    - 이전 버전은 _KEEP_OLD_VERSIONS개까지 남김 (이미 mmap으로 열린 파일은 지워져도 그대로 유효)
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    version = f"v{time.time_ns()}"
+    tmp = out_dir / f".{version}.tmp-{os.getpid()}"
+    tmp.mkdir()
+
+    n_expected = store.count()
+    writers = {f: _BlobWriter(tmp / f"{f}.bin") for f in _FIELDS}
+    emb_mm: Optional[np.memmap] = None
+    n = 0
+    dim = 0
+    for batch in store.snapshot(batch_size=batch_size):
+        if not batch.ids:
+            continue
+        vecs = _unit_rows(batch.embeddings)
+        if emb_mm is None:
+            dim = int(vecs.shape[1])
+            emb_mm = np.lib.format.open_memmap(
+                tmp / _EMB, mode="w+", dtype=np.float32, shape=(max(n_expected, len(batch.ids)), dim),
+            )
+        if n + len(batch.ids) > emb_mm.shape[0]:
+            # 내보내는 도중 문서가 늘어난 경우 → 파일 크기를 다시 잡음
+            grown = np.lib.format.open_memmap(
+                tmp / (_EMB + ".grow"), mode="w+", dtype=np.float32, shape=(n + len(batch.ids), dim),
+            )
+            grown[:n] = emb_mm[:n]
+            del emb_mm
+            os.replace(tmp / (_EMB + ".grow"), tmp / _EMB)
+            emb_mm = grown
+        emb_mm[n:n + len(batch.ids)] = vecs
+        writers["ids"].write(batch.ids)
+        writers["texts"].write([d or "" for d in batch.documents])
+        writers["metas"].write([json.dumps(m or {}, ensure_ascii=False) for m in batch.metadatas])
+        n += len(batch.ids)
+
+    if emb_mm is None:
+        np.save(tmp / _EMB, np.zeros((0, 0), dtype=np.float32))
+    else:
+        emb_mm.flush()
+        if emb_mm.shape[0] != n:
+            # 내보내는 도중 문서가 줄어든 경우 → 실제 개수만큼 잘라서 다시 저장
+            np.save(tmp / (_EMB + ".tmp.npy"), np.asarray(emb_mm[:n]))
+            del emb_mm
+            os.replace(tmp / (_EMB + ".tmp.npy"), tmp / _EMB)
+        else:
+            del emb_mm
+    for f, w in writers.items():
+        w.close(tmp / f"{f}_offsets.npy")
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "count": n,
+        "dim": dim,
+        "dtype": "float32",
+        "space": space,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **(info or {}),
+    }
+    (tmp / _MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    os.replace(tmp, out_dir / version)
+    pointer = out_dir / f"{_CURRENT}.tmp-{os.getpid()}"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, out_dir / _CURRENT)
+    _prune_versions(out_dir, version)
+    return manifest
+
+
+class SnapshotVectorStore:
+    """
+    export_snapshot 번들을 읽기 전용으로 서빙하는 VectorStore
+
+    - 모든 파일을 mmap으로 열기만 함 → 로드 시간 ≈ 0, 여러 uvicorn worker가 OS page cache를 공유
+    - 검색은 NumpyVectorStore와 같은 정확 검색 (matmul + argpartition)
+    - 문자열(id / 본문 / metadata)은 결과로 나가는 행만 blob에서 디코딩
+    - 번들이 다시 내보내지면(CURRENT 교체) 다음 조회 때 새 번들로 교체
+    """
+
+    def __init__(self, path: str | Path, name: str = "") -> None:
+        self.path = Path(path)
+        self.name = name or self.path.name
+        self._lock = threading.Lock()
+        self._loaded_key: Optional[tuple] = None
+        self._open()
+
+    # ---------- 로드 ----------
+    def _version_key(self) -> Optional[tuple]:
+        # 조회마다 호출 → 파일을 읽지 않고 stat만 (os.replace로 바뀌면 inode / mtime이 달라짐)
+        try:
+            st = (self.path / _CURRENT).stat()
+            return (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        try:
+            return (None, (self.path / _MANIFEST).stat().st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _mmap_bytes(path: Path) -> np.ndarray:
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.uint8)  # 빈 파일은 mmap 불가
+        return np.memmap(path, dtype=np.uint8, mode="r")
+
+    def _open(self) -> None:
+        key = self._version_key()
+        bundle = _resolve_bundle(self.path) if key is not None else None
+        self._row: Optional[Dict[str, int]] = None
+        self._metas: Optional[List[Dict[str, Any]]] = None
+        if bundle is None:
+            self.manifest: Dict[str, Any] = {"count": 0, "space": "cosine"}
+            self._emb = np.zeros((0, 0), dtype=np.float32)
+            self._blobs: Dict[str, np.ndarray] = {f: np.zeros(0, dtype=np.uint8) for f in _FIELDS}
+            self._offsets: Dict[str, np.ndarray] = {f: np.zeros(1, dtype=np.int64) for f in _FIELDS}
+            self._loaded_key = None
+            return
+
+        manifest = json.loads((bundle / _MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise RuntimeError(f"지원하지 않는 스냅샷 형식: {bundle}")
+        self.manifest = manifest
+        self._emb = np.load(bundle / _EMB, mmap_mode="r")
+        self._blobs = {f: self._mmap_bytes(bundle / f"{f}.bin") for f in _FIELDS}
+        self._offsets = {f: np.load(bundle / f"{f}_offsets.npy", mmap_mode="r") for f in _FIELDS}
+        self._loaded_key = key
+
+    def _maybe_reload(self) -> None:
+        if self._version_key() != self._loaded_key:
+            self._open()
+
+    def _str(self, field: str, row: int) -> str:
+        off = self._offsets[field]
+        return bytes(self._blobs[field][int(off[row]):int(off[row + 1])]).decode("utf-8")
+
+    def _record(self, row: int, distance: Optional[float] = None) -> VectorHit:
+        meta = self._metas[row] if self._metas is not None else json.loads(self._str("metas", row))
+        return VectorHit(
+            id=self._str("ids", row),
+            document=self._str("texts", row),
+            metadata=meta,
+            distance=distance,
+        )
+
+    def _id_rows(self) -> Dict[str, int]:
+        # get(ids=...)에서만 필요 → 처음 쓸 때 한 번 만든다
+        if self._row is None:
+            self._row = {self._str("ids", r): r for r in range(self.count_unlocked())}
+        return self._row
+
+    def _all_metas(self) -> List[Dict[str, Any]]:
+        # where 필터에서만 필요 → 처음 쓸 때 한 번 파싱
+        if self._metas is None:
+            self._metas = [json.loads(self._str("metas", r)) for r in range(self.count_unlocked())]
+        return self._metas
+
+    def count_unlocked(self) -> int:
+        return int(self.manifest.get("count", 0))
+
+    # ---------- VectorStore ----------
+    def count(self) -> int:
+        with self._lock:
+            self._maybe_reload()
+            return self.count_unlocked()
+
+    def query_batch(
+        self,
+        embeddings: Any,
+        top_k: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[VectorHit]]:
+        q = np.asarray(embeddings, dtype=np.float32)
+        if q.ndim == 1:
+            q = q.reshape(1, -1)
+        q = _unit_rows(q)
+        with self._lock:
+            self._maybe_reload()
+            n = self.count_unlocked()
+            if n == 0 or len(q) == 0:
+                return [[] for _ in range(len(q))]
+
+            scores = q @ self._emb.T
+            n_valid = n
+            if where:
+                metas = self._all_metas()
+                mask = np.fromiter(
+                    (all(m.get(k) == v for k, v in where.items()) for m in metas), dtype=bool, count=n,
+                )
+                n_valid = int(mask.sum())
+                scores[:, ~mask] = -np.inf
+
+            k = min(int(top_k), n_valid)
+            if k <= 0:
+                return [[] for _ in range(len(q))]
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k < n else np.broadcast_to(np.arange(n), (len(q), n))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            scale = 1.0 if self.manifest.get("space", "cosine") == "cosine" else 2.0
+            return [
+                [self._record(r, scale * (1.0 - s)) for r, s in zip(rows, sims)]
+                for rows, sims in zip(top.tolist(), top_scores.tolist())
+            ]
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[VectorHit]:
+        with self._lock:
+            self._maybe_reload()
+            n = self.count_unlocked()
+            if ids is not None:
+                rows_by_id = self._id_rows()
+                rows = [rows_by_id[cid] for cid in ids if cid in rows_by_id]
+            else:
+                start = int(offset or 0)
+                end = n if limit is None else min(n, start + int(limit))
+                rows = list(range(start, end))
+            return [self._record(r) for r in rows]
+
+    def snapshot(self, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+        with self._lock:
+            self._maybe_reload()
+            n = self.count_unlocked()
+            emb = self._emb
+        for s in range(0, n, batch_size):
+            recs = [self._record(r) for r in range(s, min(n, s + batch_size))]
+            yield SnapshotBatch(
+                ids=[h.id for h in recs],
+                embeddings=np.asarray(emb[s:s + len(recs)], dtype=np.float32),
+                documents=[h.document for h in recs],
+                metadatas=[h.metadata for h in recs],
+            )
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise RuntimeError(
+            "스냅샷 저장소는 읽기 전용입니다. chroma/numpy 백엔드로 색인한 뒤 "
+            "index_cli --export-snapshot 으로 다시 내보내세요."
+        )
+
+    upsert_batch = _read_only
+    update_metadatas = _read_only
+    delete = _read_only
+    reset = _read_only
+
+    def flush(self) -> None:
+        pass
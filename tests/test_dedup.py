@@ -0,0 +1,61 @@
+# tests/test_dedup.py
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.app.rag.dedup import NearDupIndex
+
+BOILERPLATE = "본 문서는 사내 전용이며 무단 배포를 금지합니다. 문의: 정보보안팀 내선 1234, 최신 버전은 포털을 확인하세요."
+
+
+def test_exact_and_near_duplicates_link_to_kept_chunk():
+    idx = NearDupIndex(threshold=0.85)
+    assert idx.check("a.pdf-p1-c0", BOILERPLATE, "a.pdf p.1") is None
+    assert idx.check("a.pdf-p2-c0", "F함수는 문자열을 숫자로 바꾸는 함수입니다.", "a.pdf p.2") is None
+
+    # 공백 / 대소문자만 다른 반복 문구도 같은 청크로 봄
+    assert idx.check("b.pdf-p1-c0", "  " + BOILERPLATE.replace(" ", "  "), "b.pdf p.1") == "a.pdf-p1-c0"
+    assert idx.check("c.pdf-p9-c0", BOILERPLATE, "c.pdf p.9") == "a.pdf-p1-c0"
+
+    assert idx.linked_ids() == ["a.pdf-p1-c0"]
+    assert idx.duplicate_labels("a.pdf-p1-c0") == ["b.pdf p.1", "c.pdf p.9"]
+    stats = idx.stats(dim=4)
+    assert stats["checked"] == 4 and stats["duplicates"] == 2 and stats["kept_total"] == 2
+
+
+def test_no_duplicates_has_no_linked_ids():
+    # 색인 후 dup metadata 갱신은 linked_ids()가 비면 건너뜀 (빈 ids로 store.get 금지)
+    idx = NearDupIndex(threshold=0.85)
+    idx.check("a.pdf-p1-c0", "alpha beta gamma delta epsilon", "a.pdf p.1")
+    idx.check("a.pdf-p2-c0", "완전히 다른 내용의 두 번째 페이지입니다", "a.pdf p.2")
+    assert idx.linked_ids() == []
+
+
+def test_remove_source_reports_refresh_and_orphans():
+    idx = NearDupIndex(threshold=0.85)
+    idx.check("a.pdf-p1-c0", BOILERPLATE, "a.pdf p.1")
+    idx.check("b.pdf-p1-c0", BOILERPLATE, "b.pdf p.1")
+    other = BOILERPLATE.replace("정보보안팀", "총무팀 담당자").replace("1234", "5678") + " 추가 안내 문구"
+    idx.check("b.pdf-p2-c0", other, "b.pdf p.2")
+    idx.check("c.pdf-p1-c0", other, "c.pdf p.1")
+
+    # b를 지우면: a의 dup 링크가 빠짐(refresh), b의 대표 청크를 가리키던 c는 다시 색인해야 함(orphans)
+    refresh, orphans = idx.remove_source("b.pdf-")
+    assert refresh == {"a.pdf-p1-c0"}
+    assert orphans == {"c.pdf-p1-c0"}
+    assert idx.linked_ids() == []
+    # b를 다시 색인하면 a의 중복으로 다시 잡힘
+    assert idx.check("b.pdf-p1-c0", BOILERPLATE, "b.pdf p.1") == "a.pdf-p1-c0"
+
+
+def test_save_and_load(tmp_path: Path):
+    path = tmp_path / "dedup.npz"
+    idx = NearDupIndex(path, threshold=0.85)
+    idx.check("a.pdf-p1-c0", BOILERPLATE, "a.pdf p.1")
+    idx.check("b.pdf-p1-c0", BOILERPLATE, "b.pdf p.1")
+    idx.save()
+
+    # 증분 색인: 다음 실행에서도 이전 청크와 비교
+    loaded = NearDupIndex(path, threshold=0.85)
+    assert loaded.duplicate_labels("a.pdf-p1-c0") == ["b.pdf p.1"]
+    assert loaded.check("c.pdf-p1-c0", BOILERPLATE, "c.pdf p.1") == "a.pdf-p1-c0"
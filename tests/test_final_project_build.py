@@ -0,0 +1,122 @@
+# tests/test_final_project_build.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+# final_project는 자기 디렉토리 기준 import (rag.*)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "final_project"))
+
+from rag import vectordb  # noqa: E402
+from rag.loader import TextChunk  # noqa: E402
+from rag.vectordb import RAGVectorStore  # noqa: E402
+
+DIM = 16
+
+
+class FakeSTModel:
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIM
+
+
+class FakeEmbedder:
+    """단어 해시로 만든 결정적 벡터 (같은 텍스트 → 같은 벡터)"""
+
+    tokenizer = None
+
+    def __init__(self) -> None:
+        self.model = FakeSTModel()
+        self.embedded: List[str] = []
+
+    def token_budget(self) -> int:
+        return 128
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        out = np.zeros((len(texts), DIM), dtype=np.float32)
+        for i, t in enumerate(texts):
+            for w in t.split():
+                out[i, sum(map(ord, w)) % DIM] += 1.0
+        out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out.tolist()
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        return self.embed(texts)
+
+
+class ChromaLikeStore:
+    """빈 ids로 get을 부르면 chroma처럼 에러를 내는 래퍼"""
+
+    def __init__(self, inner) -> None:
+        self.inner = inner
+        self.get_calls: List[List[str]] = []
+
+    def get(self, ids=None, **kwargs):
+        if ids is not None:
+            ids = list(ids)
+            self.get_calls.append(ids)
+            if not ids:
+                raise ValueError("Expected IDs to be a non-empty list, got 0 IDs")
+        return self.inner.get(ids=ids, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def make_chunks(texts: List[str], source: str = "doc.pdf") -> List[TextChunk]:
+    return [
+        TextChunk(id=f"{source}-p{i}-c0", text=t, metadata={"source": source, "page": i})
+        for i, t in enumerate(texts, start=1)
+    ]
+
+
+@pytest.fixture
+def rag_store(tmp_path: Path):
+    store = RAGVectorStore(db_dir=tmp_path / "db", embedding_model=FakeEmbedder(), backend="numpy")
+    store.store = ChromaLikeStore(store.store)
+    return store
+
+
+def build(rag_store: RAGVectorStore, monkeypatch, chunks: List[TextChunk], tmp_path: Path) -> int:
+    monkeypatch.setattr(vectordb, "iter_pdf_chunks", lambda *a, **kw: iter(chunks))
+    return rag_store.build_from_pdf_dir(tmp_path, reset=True, batch_size=2, dedup_threshold=0.85)
+
+
+def test_build_without_duplicates(rag_store, monkeypatch, tmp_path):
+    # 중복이 하나도 없으면 linked_ids()가 비어 있음 → 빈 ids로 get을 부르면 안 됨
+    chunks = make_chunks([
+        "alpha beta gamma delta epsilon zeta eta theta",
+        "iota kappa lambda mu nu xi omicron pi",
+        "rho sigma tau upsilon phi chi psi omega",
+    ])
+    total = build(rag_store, monkeypatch, chunks, tmp_path)
+
+    assert total == 3
+    assert rag_store.store.get_calls == []
+    assert rag_store.store.count() == 3
+    for h in rag_store.store.get(ids=[c.id for c in chunks]):
+        assert "dup_sources" not in h.metadata
+
+
+def test_build_links_duplicates_to_kept_chunk(rag_store, monkeypatch, tmp_path):
+    text = "the quick brown fox jumps over the lazy dog near the river bank today"
+    chunks = make_chunks([text, "completely different words about vector search indexes", text], source="a.pdf")
+    total = build(rag_store, monkeypatch, chunks, tmp_path)
+
+    # 세 번째 청크는 첫 번째와 같은 텍스트 → 임베딩/저장하지 않고 출처만 링크
+    assert total == 2
+    assert rag_store.embedding_model.embedded.count(text) == 1
+    kept = rag_store.store.get(ids=[chunks[0].id])[0]
+    assert kept.metadata["dup_count"] == 1
+    assert kept.metadata["dup_sources"] == "a.pdf p.3"
+    assert rag_store.store.get(ids=[chunks[2].id]) == []
+
+
+def test_chroma_get_empty_ids(tmp_path):
+    from src.app.vectorstore.chroma_store import ChromaVectorStore
+
+    assert ChromaVectorStore(tmp_path / "chroma", "empty", space="l2").get(ids=[]) == []
@@ -0,0 +1,120 @@
+# tests/test_hybrid_search.py
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# settings는 import 시점에 API 키를 요구함 (실제 요청은 보내지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.app.rag import pipeline  # noqa: E402
+from src.app.rag.bm25 import BM25Index, reciprocal_rank_fusion, tokenize  # noqa: E402
+from src.app.vectorstore.numpy_store import NumpyVectorStore  # noqa: E402
+
+DIM = 8
+
+DOCS = [
+    ("a", "BIG_SALES 테이블에 일자별 매출이 저장됩니다"),
+    ("b", "F함수는 문자열을 숫자로 바꿉니다"),
+    ("c", "ERR_4012 오류는 로그인 세션이 만료되었을 때 발생합니다"),
+    ("d", "오류가 나면 관리자에게 문의하세요"),
+]
+
+
+def test_tokenize_keeps_identifiers_and_bigrams():
+    toks = tokenize("F함수를 ERR_4012")
+    # 조사가 붙어도 '함수' bigram이 남고, 영문/숫자 식별자는 단어 전체도 들어감
+    assert "함수" in toks
+    assert "err_4012" in toks
+
+
+def test_bm25_exact_identifier_ranks_first():
+    index = BM25Index.build(DOCS)
+    hits = index.search("ERR_4012 오류", top_k=3)
+    assert [cid for cid, _ in hits][:2] == ["c", "d"]
+    assert index.search("없는단어xyz", top_k=3) == []
+
+
+def test_bm25_save_load_round_trip(tmp_path: Path):
+    index = BM25Index.build(DOCS)
+    index.save(tmp_path / "bm25.npz")
+    loaded = BM25Index.load(tmp_path / "bm25.npz")
+
+    assert loaded.ids == index.ids
+    for q in ("F함수 사용법", "매출 테이블", "ERR_4012"):
+        assert loaded.search(q, 4) == index.search(q, 4)
+
+
+def test_rrf_prefers_chunks_found_by_both():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]], k=60)
+    assert [cid for cid, _ in fused] == ["a", "c", "b", "d"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+    assert [cid for cid, _ in reciprocal_rank_fusion([["a", "b"], ["b"]], k=60, top_k=1)] == ["b"]
+
+
+class FakeEmbedder:
+    """모든 질의를 e0 방향으로 인코딩"""
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        out = np.zeros((len(texts), DIM), dtype=np.float32)
+        out[:, 0] = 1.0
+        return out
+
+
+def unit(i: int, lean: float = 0.0) -> np.ndarray:
+    v = np.zeros(DIM, dtype=np.float32)
+    v[i] = 1.0
+    v[1] += lean
+    return v
+
+
+@pytest.fixture
+def hybrid_index(tmp_path: Path, monkeypatch):
+    """
+    벡터 순위: vec-only(1위), both(2위), filler 25개 … lex-only(e7 방향이라 후보 20개 밖)
+    BM25 순위: lex-only(ERR_4012 정확 매칭 1위), both('오류'만 매칭 2위)
+    """
+    docs = [
+        ("vec-only", "세션 관리 개요", unit(0)),
+        ("both", "오류 처리 안내", unit(0, 0.1)),
+        ("lex-only", "ERR_4012 오류 코드 설명", unit(7)),
+    ]
+    docs += [(f"filler-{i}", "부록 참고 자료", unit(0, 0.2 + 0.01 * i)) for i in range(25)]
+
+    store = NumpyVectorStore(tmp_path / "db", "rag")
+    store.upsert_batch(
+        ids=[cid for cid, _, _ in docs],
+        embeddings=np.stack([v for _, _, v in docs]),
+        documents=[text for _, text, _ in docs],
+        metadatas=[{"source": f"{cid}.pdf", "chunk_index": 0} for cid, _, _ in docs],
+    )
+    bm25 = BM25Index.build((cid, text) for cid, text, _ in docs)
+
+    monkeypatch.setattr(pipeline, "get_rag_store", lambda: store)
+    monkeypatch.setattr(pipeline, "get_rag_bm25", lambda: bm25)
+    monkeypatch.setattr(pipeline, "get_rag_embedder", lambda: FakeEmbedder())
+    monkeypatch.setattr(pipeline, "get_rag_embedder_key", lambda: "fake")
+    monkeypatch.setattr(pipeline.settings, "rag_rerank", False)
+    monkeypatch.setattr(pipeline.settings, "query_embed_cache", False)
+    return store
+
+
+def test_hybrid_query_fuses_vector_and_lexical(hybrid_index):
+    hybrid = pipeline.query_rag("ERR_4012 오류", top_k=3, mode="hybrid")
+    sources = [h["source"] for h in hybrid["hits"]]
+
+    assert hybrid["mode"] == "hybrid"
+    # 양쪽에서 모두 2위인 청크가 한쪽 1위보다 앞
+    assert sources[0] == "both.pdf"
+    assert set(sources[1:]) == {"vec-only.pdf", "lex-only.pdf"}
+    # 벡터 후보에 없던 청크는 store.get으로 본문을 채움 (distance 없음)
+    lex = next(h for h in hybrid["hits"] if h["source"] == "lex-only.pdf")
+    assert lex["text"] == "ERR_4012 오류 코드 설명"
+    assert lex["distance"] is None
+    assert hybrid["hits"][0]["score"] == pytest.approx(2 / 62)
+
+    vector = pipeline.query_rag("ERR_4012 오류", top_k=3, mode="vector")
+    assert [h["source"] for h in vector["hits"]] == ["vec-only.pdf", "both.pdf", "filler-0.pdf"]
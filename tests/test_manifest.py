@@ -0,0 +1,62 @@
+# tests/test_manifest.py
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from src.app.rag.manifest import IndexManifest, file_sha256
+
+PARAMS = {"chunker": "chars", "chunk_size": 800, "embedder": "fake"}
+
+
+def write_pdf(path: Path, data: bytes) -> os.stat_result:
+    path.write_bytes(data)
+    return path.stat()
+
+
+def test_round_trip(tmp_path: Path):
+    pdf = tmp_path / "a.pdf"
+    st = write_pdf(pdf, b"%PDF-1.4 first")
+    m = IndexManifest.load(tmp_path / "manifest.json")
+    m.reset(PARAMS)
+    m.set_file("a.pdf", file_sha256(pdf), st, ["a.pdf-p1-c0", "a.pdf-p1-c1"])
+    m.save()
+
+    loaded = IndexManifest.load(tmp_path / "manifest.json")
+    assert loaded.params == PARAMS
+    assert loaded.names() == ["a.pdf"]
+    assert loaded.chunk_ids("a.pdf") == ["a.pdf-p1-c0", "a.pdf-p1-c1"]
+    assert loaded.stat_matches("a.pdf", st)
+    assert loaded.hash_matches("a.pdf", file_sha256(pdf))
+
+
+def test_change_detection(tmp_path: Path):
+    pdf = tmp_path / "a.pdf"
+    st = write_pdf(pdf, b"%PDF-1.4 first")
+    m = IndexManifest(tmp_path / "manifest.json")
+    m.set_file("a.pdf", file_sha256(pdf), st, ["a.pdf-p1-c0"])
+
+    # 같은 내용을 다시 쓰면 mtime만 바뀜 → stat은 다르지만 해시는 같음 (touch로 재색인 생략)
+    os.utime(pdf, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    st2 = pdf.stat()
+    assert not m.stat_matches("a.pdf", st2)
+    assert m.hash_matches("a.pdf", file_sha256(pdf))
+    m.touch("a.pdf", st2)
+    assert m.stat_matches("a.pdf", st2)
+
+    write_pdf(pdf, b"%PDF-1.4 second version")
+    assert not m.hash_matches("a.pdf", file_sha256(pdf))
+    assert m.remove_file("a.pdf") == ["a.pdf-p1-c0"]
+    assert m.names() == []
+    assert not m.stat_matches("missing.pdf", st2)
+
+
+def test_broken_or_old_manifest_loads_empty(tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert IndexManifest.load(path).files == {}
+
+    path.write_text(json.dumps({"version": -1, "params": PARAMS, "files": {"a.pdf": {}}}), encoding="utf-8")
+    old = IndexManifest.load(path)
+    assert old.params == {} and old.files == {}
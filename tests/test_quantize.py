@@ -0,0 +1,76 @@
+# tests/test_quantize.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.app.embedding.quantize import cache_model_name, quantize_int8  # noqa: E402
+
+
+class FakeTransformer:
+    def __init__(self, auto_model) -> None:
+        self.auto_model = auto_model
+
+
+class FakeSentenceModel:
+    """SentenceTransformer처럼 model[0].auto_model로 HF 모델을 감싼 객체"""
+
+    def __init__(self, auto_model) -> None:
+        self.modules = [FakeTransformer(auto_model)]
+
+    def __getitem__(self, i: int):
+        return self.modules[i]
+
+
+def tiny_model(seed: int = 0, hidden: int = 16):
+    torch.manual_seed(seed)
+    return torch.nn.Sequential(torch.nn.Linear(8, hidden), torch.nn.ReLU(), torch.nn.Linear(hidden, 4))
+
+
+def run(model: FakeSentenceModel, x):
+    with torch.no_grad():
+        return model[0].auto_model(x)
+
+
+def is_int8(module) -> bool:
+    return not any(type(m) is torch.nn.Linear for m in module.modules())
+
+
+def test_cache_model_name():
+    # int8 벡터는 fp32와 다르므로 임베딩 캐시 키를 나눔
+    assert cache_model_name("bge-m3") == "bge-m3"
+    assert cache_model_name("bge-m3", "int8") == "bge-m3@int8"
+
+
+def test_int8_close_to_fp32_and_cached(tmp_path: Path):
+    x = torch.randn(5, 8)
+    fp32 = run(FakeSentenceModel(tiny_model()), x)
+
+    first = quantize_int8(FakeSentenceModel(tiny_model()), "org/tiny", cache_dir=tmp_path)
+    out1 = run(first, x)
+    assert is_int8(first[0].auto_model)
+    assert torch.allclose(out1, fp32, atol=0.05)
+    cached = list(tmp_path.glob("org_tiny.int8.torch*.pt"))
+    assert len(cached) == 1
+
+    # 두 번째 로드는 quantize_dynamic 없이 캐시 값을 그대로 사용 → 첫 번째와 같은 출력
+    second = quantize_int8(FakeSentenceModel(tiny_model()), "org/tiny", cache_dir=tmp_path)
+    assert is_int8(second[0].auto_model)
+    assert torch.equal(run(second, x), out1)
+
+
+def test_mismatched_cache_requantizes(tmp_path: Path):
+    quantize_int8(FakeSentenceModel(tiny_model(hidden=16)), "org/tiny", cache_dir=tmp_path)
+
+    # 같은 이름인데 구조가 다른 모델 → 캐시를 버리고 다시 양자화해서 덮어씀
+    x = torch.randn(3, 8)
+    fp32 = run(FakeSentenceModel(tiny_model(seed=1, hidden=32)), x)
+    model = quantize_int8(FakeSentenceModel(tiny_model(seed=1, hidden=32)), "org/tiny", cache_dir=tmp_path)
+    assert is_int8(model[0].auto_model)
+    assert torch.allclose(run(model, x), fp32, atol=0.05)
+
+    again = quantize_int8(FakeSentenceModel(tiny_model(seed=1, hidden=32)), "org/tiny", cache_dir=tmp_path)
+    assert torch.equal(run(again, x), run(model, x))
@@ -0,0 +1,203 @@
+# tests/test_resilience.py
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import List
+
+import httpx
+import openai
+import pytest
+
+# settings는 import 시점에 API 키를 요구함 (실제 요청은 보내지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from src.app.llm import resilience  # noqa: E402
+from src.app.llm.resilience import (  # noqa: E402
+    LLMDeadlineExceeded,
+    acall_with_policy,
+    attempt_timeout,
+    call_with_policy,
+    get_llm_metrics,
+    retry_after_s,
+    turn_deadline,
+)
+
+_REQ = httpx.Request("POST", "http://llm.test/v1/chat/completions")
+
+
+def connection_error() -> openai.APIConnectionError:
+    return openai.APIConnectionError(request=_REQ)
+
+
+def rate_limited(retry_after: str) -> openai.RateLimitError:
+    resp = httpx.Response(429, request=_REQ, headers={"retry-after": retry_after})
+    return openai.RateLimitError("rate limited", response=resp, body=None)
+
+
+def bad_request() -> openai.BadRequestError:
+    return openai.BadRequestError("bad request", response=httpx.Response(400, request=_REQ), body=None)
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch):
+    # 테스트마다 메트릭을 새로 만들고, 재시도 대기는 ms 단위로 짧게
+    s = resilience.settings
+    monkeypatch.setattr(s, "llm_hedge", False)
+    monkeypatch.setattr(s, "llm_hedge_delay_ms", 50)
+    monkeypatch.setattr(s, "llm_max_retries", 2)
+    monkeypatch.setattr(s, "llm_retry_base_ms", 1)
+    monkeypatch.setattr(s, "llm_retry_max_ms", 5)
+    monkeypatch.setattr(s, "llm_request_timeout_s", 10.0)
+    monkeypatch.setattr(resilience, "_metrics", None)
+    return s
+
+
+# ---------- 턴 예산 ----------
+def test_turn_deadline_disabled_by_zero_budget():
+    assert turn_deadline(0) is None
+    deadline = turn_deadline(5)
+    assert deadline is not None and 4.0 < deadline - time.time() <= 5.0
+
+
+def test_attempt_timeout_capped_by_remaining_budget():
+    assert attempt_timeout(None) == 10.0
+    assert attempt_timeout(time.time() + 1.0) <= 1.0
+
+
+def test_expired_deadline_skips_the_call():
+    calls: List[float] = []
+    with pytest.raises(LLMDeadlineExceeded):
+        call_with_policy(calls.append, kind="complete", deadline=time.time() - 1.0)
+    assert calls == []
+    assert get_llm_metrics().stats()["deadline_exceeded"] == 1
+
+
+# ---------- 재시도 ----------
+def test_retryable_error_is_retried():
+    errors = [connection_error(), connection_error()]
+
+    def fn(timeout: float) -> str:
+        if errors:
+            raise errors.pop()
+        return "ok"
+
+    assert call_with_policy(fn, kind="complete") == "ok"
+    stats = get_llm_metrics().stats()
+    assert stats["attempts"] == 3 and stats["retries"] == 2 and stats["failures"] == 0
+
+
+def test_non_retryable_error_fails_immediately():
+    calls: List[float] = []
+
+    def fn(timeout: float) -> str:
+        calls.append(timeout)
+        raise bad_request()
+
+    with pytest.raises(openai.BadRequestError):
+        call_with_policy(fn, kind="complete")
+    assert len(calls) == 1
+    assert get_llm_metrics().stats()["failures"] == 1
+
+
+def test_retry_after_longer_than_budget_raises_deadline():
+    # Retry-After 2초를 기다리면 남은 예산(0.5초)을 넘김 → 기다리지 않고 바로 예산 초과
+    calls: List[float] = []
+
+    def fn(timeout: float) -> str:
+        calls.append(timeout)
+        raise rate_limited("2")
+
+    t0 = time.perf_counter()
+    with pytest.raises(LLMDeadlineExceeded):
+        call_with_policy(fn, kind="complete", deadline=time.time() + 0.5)
+    assert len(calls) == 1
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_retry_after_header():
+    assert retry_after_s(rate_limited("3")) == 3.0
+    assert retry_after_s(connection_error()) is None
+
+
+# ---------- hedge ----------
+def slow_then_fast(slow_s: float = 0.5):
+    """첫 호출은 slow_s 뒤 "slow", 두 번째 호출은 바로 "fast" """
+    lock = threading.Lock()
+    n = [0]
+
+    def fn(timeout: float) -> str:
+        with lock:
+            n[0] += 1
+            i = n[0]
+        if i == 1:
+            time.sleep(slow_s)
+            return "slow"
+        return "fast"
+
+    return fn
+
+
+def wait_for(cond, timeout_s: float = 3.0) -> bool:
+    end = time.time() + timeout_s
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return cond()
+
+
+def test_hedge_wins_and_uncancellable_loser_is_counted(policy, monkeypatch):
+    monkeypatch.setattr(policy, "llm_hedge", True)
+
+    assert call_with_policy(slow_then_fast(), kind="complete") == "fast"
+    stats = get_llm_metrics().stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    # 동기 non-stream 요청은 이미 돌고 있으면 끊을 수 없음 → 취소로 세지 않음
+    assert stats["hedge_uncancelled"] == 1
+    assert stats["hedge_cancelled"] == 0
+
+
+def test_hedge_loser_stream_is_closed(policy, monkeypatch):
+    monkeypatch.setattr(policy, "llm_hedge", True)
+    closed: List[str] = []
+
+    assert call_with_policy(slow_then_fast(), kind="first_chunk", close_loser=closed.append) == "fast"
+    assert get_llm_metrics().stats()["hedge_closed"] == 1
+    # 진 요청은 끝나는 대로 close_loser로 닫힘
+    assert wait_for(lambda: closed == ["slow"])
+
+
+def test_no_hedge_when_first_call_is_fast(policy, monkeypatch):
+    monkeypatch.setattr(policy, "llm_hedge", True)
+
+    assert call_with_policy(lambda timeout: "ok", kind="complete") == "ok"
+    stats = get_llm_metrics().stats()
+    assert stats["hedges"] == 0 and stats["attempts"] == 1
+
+
+def test_async_hedge_cancels_loser(policy, monkeypatch):
+    monkeypatch.setattr(policy, "llm_hedge", True)
+    cancelled: List[int] = []
+    n = [0]
+
+    async def fn(timeout: float) -> str:
+        n[0] += 1
+        i = n[0]
+        if i == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(i)
+                raise
+            return "slow"
+        return "fast"
+
+    t0 = time.perf_counter()
+    assert asyncio.run(acall_with_policy(fn, kind="complete")) == "fast"
+    assert time.perf_counter() - t0 < 2.0
+    assert cancelled == [1]
+    stats = get_llm_metrics().stats()
+    assert stats["hedge_wins"] == 1 and stats["hedge_cancelled"] == 1
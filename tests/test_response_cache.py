@@ -0,0 +1,99 @@
+# tests/test_response_cache.py
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.app.llm import response_cache
+from src.app.llm.response_cache import LLMResponseCache, request_key
+
+MESSAGES = [{"role": "user", "content": "F함수 사용법"}]
+PAYLOAD = {"id": "chatcmpl-1", "choices": [{"message": {"role": "assistant", "content": "답변"}}]}
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    c = LLMResponseCache(tmp_path / "llm.sqlite", ttl_s=60)
+    yield c
+    c._conn.close()
+
+
+def test_request_key_is_canonical():
+    a = request_key({"model": "m", "messages": MESSAGES, "temperature": 0})
+    b = request_key({"temperature": 0, "messages": MESSAGES, "model": "m", "stream": True})
+    assert a == b
+    assert a != request_key({"model": "m", "messages": MESSAGES, "temperature": 0.7})
+    assert a != request_key({"model": "other", "messages": MESSAGES, "temperature": 0})
+
+
+def test_get_put_and_ttl(cache, monkeypatch):
+    key = request_key({"model": "m", "messages": MESSAGES})
+    assert cache.get(key) is None
+    cache.put(key, PAYLOAD, model="m")
+    assert cache.get(key) == PAYLOAD
+
+    now = time.time()
+    monkeypatch.setattr(response_cache.time, "time", lambda: now + 61)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", ttl_s=60, max_entries=3)
+    for i in range(4):
+        cache.put(f"k{i}", {"i": i})
+        time.sleep(0.002)
+    # 한도(3) 초과 → 90%(2개)까지 줄임, 최근에 쓴 것만 남음
+    assert cache.stats()["entries"] == 2
+    assert cache.get("k0") is None and cache.get("k3") == {"i": 3}
+    cache._conn.close()
+
+
+def test_call_coalesces_concurrent_requests(cache):
+    key = request_key({"model": "m", "messages": MESSAGES})
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return PAYLOAD
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.call(key, fn, model="m")))
+    owner.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.call(key, fn, model="m"))) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    # 대기 스레드가 모두 in-flight Future에 붙을 때까지
+    deadline = time.time() + 5
+    while cache.stats()["coalesced"] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in [owner, *waiters]:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert results == [PAYLOAD] * 4
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 3 and stats["inflight"] == 0
+    # 이후 호출은 저장된 값으로 hit
+    assert cache.call(key, fn) == PAYLOAD and len(calls) == 1
+
+
+def test_failed_call_is_not_cached(cache):
+    key = request_key({"model": "m", "messages": MESSAGES})
+
+    def boom():
+        raise RuntimeError("api down")
+
+    with pytest.raises(RuntimeError):
+        cache.call(key, boom)
+    assert cache.get(key) is None
+    assert cache.call(key, lambda: PAYLOAD) == PAYLOAD
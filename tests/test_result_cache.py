@@ -0,0 +1,68 @@
+# tests/test_result_cache.py
+from __future__ import annotations
+
+import numpy as np
+
+from src.app.rag import result_cache
+from src.app.rag.result_cache import SemanticResultCache
+
+KEY = (5, "hybrid", False)
+
+
+def vec(*xs: float) -> np.ndarray:
+    return np.asarray(xs, dtype=np.float32)
+
+
+def result(text: str) -> dict:
+    return {"query": text, "hits": [{"text": text, "score": 1.0}]}
+
+
+def test_near_query_hits_far_query_misses():
+    cache = SemanticResultCache(max_items=8, ttl_s=0, max_distance=0.05)
+    cache.store(vec(1, 0, 0), KEY, 1, result("F함수 사용법"))
+
+    # 크기만 다른 벡터 / 아주 가까운 벡터는 hit, 직교 벡터는 miss
+    assert cache.lookup(vec(2, 0, 0), KEY, 1) == result("F함수 사용법")
+    assert cache.lookup(vec(1, 0.1, 0), KEY, 1) is not None
+    assert cache.lookup(vec(0, 1, 0), KEY, 1) is None
+    # 검색 조건(top_k, mode 등)이 다르면 miss
+    assert cache.lookup(vec(1, 0, 0), (3, "vector", False), 1) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+
+def test_returned_result_is_a_copy():
+    cache = SemanticResultCache(max_items=8, ttl_s=0)
+    cache.store(vec(1, 0), KEY, 1, result("q"))
+    got = cache.lookup(vec(1, 0), KEY, 1)
+    got["hits"].clear()
+    assert cache.lookup(vec(1, 0), KEY, 1) == result("q")
+
+
+def test_new_index_generation_invalidates():
+    cache = SemanticResultCache(max_items=8, ttl_s=0)
+    cache.store(vec(1, 0), KEY, 1, result("q"))
+    assert cache.lookup(vec(1, 0), KEY, 1) is not None
+
+    # index_pdfs가 세대를 올리면 이전 결과는 전부 폐기
+    assert cache.lookup(vec(1, 0), KEY, 2) is None
+    stats = cache.stats()
+    assert stats["invalidations"] == 1 and stats["size"] == 0 and stats["generation"] == 2
+
+
+def test_ttl_and_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+
+    cache = SemanticResultCache(max_items=2, ttl_s=10)
+    cache.store(vec(1, 0, 0), KEY, 1, result("a"))
+    cache.store(vec(0, 1, 0), KEY, 1, result("b"))
+    assert cache.lookup(vec(1, 0, 0), KEY, 1) is not None  # a를 최근 사용으로
+    cache.store(vec(0, 0, 1), KEY, 1, result("c"))          # → 가장 오래된 b가 밀려남
+    assert cache.lookup(vec(0, 1, 0), KEY, 1) is None
+    assert cache.lookup(vec(0, 0, 1), KEY, 1) is not None
+
+    now[0] += 11
+    assert cache.lookup(vec(1, 0, 0), KEY, 1) is None
+    assert cache.stats()["size"] == 0
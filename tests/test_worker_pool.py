@@ -0,0 +1,116 @@
+# tests/test_worker_pool.py
+from __future__ import annotations
+
+import os
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.app.embedding.worker_pool import EmbeddingWorkerPool
+
+DIM = 8
+
+
+class FakeTokenizer:
+    def tokenize(self, text: str):
+        return text.split()
+
+
+class FakeModel:
+    """글자 코드 합으로 만든 결정적 벡터 + 특수 입력으로 worker 장애 흉내"""
+
+    max_seq_length = 32
+
+    def __init__(self, marker_dir: Path) -> None:
+        self.tokenizer = FakeTokenizer()
+        self.marker_dir = marker_dir
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIM
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        for t in texts:
+            if t == "__crash_once__":
+                marker = self.marker_dir / f"crashed-{os.getpid()}"
+                if not any(self.marker_dir.glob("crashed-*")):
+                    marker.touch()
+                    os._exit(1)
+            elif t == "__crash_always__":
+                os._exit(1)
+            elif t == "__hang__":
+                time.sleep(3)
+        return np.stack([fake_vector(t, normalize_embeddings) for t in texts])
+
+
+def fake_vector(text: str, normalize: bool = False) -> np.ndarray:
+    v = np.array([sum(ord(c) * (i + 1) for c in text) % 97 + 1 for i in range(DIM)], dtype=np.float32)
+    return v / np.linalg.norm(v) if normalize else v
+
+
+def load_fake(model_name, device=None, quantize="none", cache_dir=None):
+    # spawn된 worker에서 호출됨 (cache_dir를 장애 기록용 디렉터리로 사용)
+    return FakeModel(Path(cache_dir))
+
+
+def make_pool(tmp_path, task_timeout_s=60.0):
+    return EmbeddingWorkerPool(
+        "fake", cache_dir=tmp_path, workers=2, task_timeout_s=task_timeout_s, start_timeout_s=60, loader=load_fake,
+    )
+
+
+@pytest.fixture
+def pool(tmp_path):
+    p = make_pool(tmp_path)
+    yield p
+    p.close()
+
+
+def test_encode_matches_model_and_splits_across_workers(pool):
+    texts = [f"문장 {i}" for i in range(150)]  # _SPLIT_ITEMS(64)보다 커서 여러 작업으로 나뉨
+    out = pool.encode(texts, normalize_embeddings=True)
+    assert out.shape == (150, DIM)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out, np.stack([fake_vector(t, True) for t in texts]), rtol=1e-6)
+    np.testing.assert_allclose(pool.encode("하나"), fake_vector("하나"))
+    assert pool.encode([]).shape == (0, DIM)
+    assert pool.stats()["tasks"] >= 4
+
+
+def test_tokenizer_and_model_info(pool):
+    assert pool.get_sentence_embedding_dimension() == DIM
+    assert pool.max_seq_length == 32
+    assert pool.tokenizer.tokenize("a b c") == ["a", "b", "c"]
+    assert pickle.loads(pool.info["tokenizer"]).tokenize("x y") == ["x", "y"]
+
+
+def test_worker_crash_is_retried_on_restarted_worker(pool):
+    out = pool.encode(["앞", "__crash_once__", "뒤"])
+    np.testing.assert_allclose(out[1], fake_vector("__crash_once__"))
+    stats = pool.stats()
+    assert stats["restarts"] >= 1
+    assert stats["retried"] >= 1
+
+
+def test_poison_input_fails_instead_of_hanging(pool):
+    t0 = time.monotonic()
+    with pytest.raises((RuntimeError, TimeoutError)):
+        pool.encode(["__crash_always__"])
+    assert time.monotonic() - t0 < 60
+    # 풀은 계속 쓸 수 있음
+    np.testing.assert_allclose(pool.encode(["ok"])[0], fake_vector("ok"))
+
+
+def test_encode_times_out(tmp_path):
+    pool = make_pool(tmp_path, task_timeout_s=1.0)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.encode(["__hang__"])
+        assert pool.stats()["timeouts"] == 1
+        assert pool.stats()["pending"] == 0
+        # 멈춘 worker는 종료 후 다시 뜨고 풀은 계속 동작
+        np.testing.assert_allclose(pool.encode(["ok"])[0], fake_vector("ok"))
+    finally:
+        pool.close()